@@ -1,297 +1,452 @@
 document.addEventListener('DOMContentLoaded', () => {
   // 学者データの読み込み
   let scholars = [];
-  let drawnScholars = [];
   let activeFilter = 'all';
   
-  async function loadScholars() {
+  // タグ・レア度ごとの学者の位置の一覧（転置索引、scripts/build_site_data.pyで生成）
+  let scholarsByTag = {};
+  let scholarsByRarity = {};
+  // 絞り込みごとの、排出率（gacha_config.json）から作ったエイリアス表（scripts/gacha_rates.py）
+  let drawTables = {};
+  // 10連ガチャの保証枠（SR以上など）のレア度とエイリアス表
+  let guaranteed = null;
+  // 絞り込み・区分ごとのシャッフルバッグ（学者の位置の並びと、引いた数）
+  // 引いた学者はlocalStorageに保存し、再読み込みしても全員を引くまで同じ学者は出さない
+  const BAG_STORAGE_KEY = 'scholar-gacha-bags';
+  const shuffleBags = new Map();
+  let savedBags = {}; // 絞り込み・区分 -> 引いた学者のID（localStorageに保存したもの）
+  const dirtyBags = new Set();
+  let saveTimer = null;
+  let avatarVariants = {};
+  
+  // 学者の詳細（所属・貢献・豆知識など）の分割ファイル（scripts/build_site_data.pyで生成）
+  let detailShards = [];
+  let shardSize = 0;
+  const detailRequests = new Map(); // 分割ファイル -> 読み込み中・読み込み済みのPromise
+  const scholarPositions = new Map(); // 学者ID -> 索引での位置
+  let drawCount = 0;
+  
+  // 表示幅に応じたアバター画像（WebP/AVIF）のマニフェスト（scripts/build_avatar_variants.pyで生成）
+  async function loadAvatarVariants() {
     try {
-      const response = await fetch('scholars_enhanced_tavily.json');
-      scholars = await response.json();
-      console.log(`${scholars.length}人の学者データを読み込みました`);
+      const response = await fetch('avatars/variants/manifest.json');
+      if (!response.ok) return;
+      const manifest = await response.json();
+      avatarVariants = manifest.avatars || {};
     } catch (error) {
-      console.error('学者データの読み込みに失敗しました:', error);
+      console.warn('アバターのバリアントを読み込めませんでした。元の画像を使用します:', error);
     }
   }
   
-  // ガチャ処理
-  function drawScholar() {
-    if (scholars.length === 0) return null;
+  // カードの<picture>にアバター画像を設定（バリアントがあれば<source>でsrcsetを指定）
+  function renderAvatar(picture, scholar) {
+    // 画像パスの調整（nullの場合はプレースホルダー）
+    const img = picture.querySelector('img');
+    img.src = scholar.avatar
+      ? scholar.avatar.replace(/\\/g, '/')
+      : 'https://via.placeholder.com/300x300?text=No+Image';
+    img.alt = scholar.name.ja;
     
-    // フィルター適用
-    let availableScholars = scholars;
-    if (activeFilter !== 'all') {
-      availableScholars = scholars.filter(s => 
-        s.tags.some(tag => tag === activeFilter)
-      );
-      
-      if (availableScholars.length === 0) {
-        alert(`${activeFilter}のカテゴリに該当する学者がいません。`);
-        return null;
+    const variant = scholar.avatar && avatarVariants[scholar.id];
+    if (!variant) return;
+    
+    Object.entries(variant.srcset).forEach(([format, srcset]) => {
+      const source = document.createElement('source');
+      source.type = `image/${format}`;
+      source.srcset = srcset;
+      source.sizes = '(max-width: 768px) 350px, 400px';
+      picture.insertBefore(source, img);
+    });
+  }
+  
+  // 学者データの索引（ID・名前・レア度・タグ・アバター）を読み込む
+  // 索引がまだ生成されていない場合は、元の学者データ全体を読み込む
+  async function loadScholars() {
+    try {
+      const response = await fetch('data/index.json');
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      const index = await response.json();
+      scholars = index.scholars;
+      detailShards = index.shards;
+      shardSize = index.shardSize;
+      scholarsByTag = index.byTag;
+      scholarsByRarity = index.byRarity;
+      drawTables = index.draw || {};
+      guaranteed = index.guaranteed || null;
+      console.log(`${scholars.length}人の学者データ（索引）を読み込みました`);
+    } catch (indexError) {
+      console.warn('学者データの索引を読み込めませんでした。学者データ全体を読み込みます:', indexError);
+      try {
+        const response = await fetch('scholars_enhanced_tavily.json');
+        scholars = await response.json();
+        buildInvertedIndexes();
+        console.log(`${scholars.length}人の学者データを読み込みました`);
+      } catch (error) {
+        console.error('学者データの読み込みに失敗しました:', error);
       }
     }
+    scholars.forEach((scholar, position) => scholarPositions.set(scholar.id, position));
+  }
+  
+  // カードの表示に必要な詳細を、その学者を含む分割ファイルから読み込んで学者データに追加
+  async function loadDetails(scholar) {
+    if (scholar.contribution || detailShards.length === 0) return scholar;
+    const file = detailShards[Math.floor(scholarPositions.get(scholar.id) / shardSize)];
+    if (!detailRequests.has(file)) {
+      const request = fetch(`data/${file}`).then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+      });
+      // 失敗した場合は次に引いたときに読み込み直す
+      request.catch(() => detailRequests.delete(file));
+      detailRequests.set(file, request);
+    }
+    return Object.assign(scholar, (await detailRequests.get(file))[scholar.id]);
+  }
+  
+  // 索引がない場合（学者データ全体を読み込んだ場合）に転置索引を作る
+  function buildInvertedIndexes() {
+    scholarsByTag = {};
+    scholarsByRarity = {};
+    scholars.forEach((scholar, position) => {
+      new Set(scholar.tags || []).forEach(tag => (scholarsByTag[tag] ||= []).push(position));
+      (scholarsByRarity[scholar.rarity] ||= []).push(position);
+    });
+  }
+  
+  // 絞り込み（タグまたはレア度）に該当する学者の位置の一覧
+  function filterPositions(filter) {
+    if (filter === 'all') return scholars.map((_, position) => position);
+    return scholarsByRarity[filter] || scholarsByTag[filter] || [];
+  }
+  
+  // エイリアス表から区分（レア度・ピックアップ）を選ぶ（O(1)）
+  function sampleBucket(table) {
+    const column = Math.floor(Math.random() * table.prob.length);
+    return Math.random() < table.prob[column] ? column : table.alias[column];
+  }
+  
+  // 保存したシャッフルバッグ（引いた学者のID）を読み込む
+  function loadSavedBags() {
+    try {
+      savedBags = JSON.parse(localStorage.getItem(BAG_STORAGE_KEY)) || {};
+    } catch (error) {
+      savedBags = {};
+    }
+  }
+  
+  // 変更したシャッフルバッグをまとめて保存（引くたびには書き込まない）
+  function saveBags() {
+    clearTimeout(saveTimer);
+    saveTimer = null;
+    if (dirtyBags.size === 0) return;
+    dirtyBags.forEach(key => {
+      const bag = shuffleBags.get(key);
+      savedBags[key] = bag.order.slice(0, bag.cursor).map(position => scholars[position].id);
+    });
+    dirtyBags.clear();
+    try {
+      localStorage.setItem(BAG_STORAGE_KEY, JSON.stringify(savedBags));
+    } catch (error) {
+      console.warn('ガチャの状態を保存できませんでした:', error);
+    }
+  }
+  
+  function scheduleSaveBags(key) {
+    dirtyBags.add(key);
+    if (!saveTimer) saveTimer = setTimeout(saveBags, 1000);
+  }
+  
+  // シャッフルバッグを取得（初回は保存した引いた学者を先頭に並べて復元する）
+  // 学者データが更新されていても、まだ該当する学者だけを引いたものとして扱う
+  function getBag(key, getMembers) {
+    let bag = shuffleBags.get(key);
+    if (bag) return bag;
     
-    // 既に引いた学者を除外
-    availableScholars = availableScholars.filter(s => !drawnScholars.includes(s.id));
+    const memberSet = new Set(getMembers());
+    const drawn = (savedBags[key] || [])
+      .map(id => scholarPositions.get(id))
+      .filter(position => memberSet.delete(position));
+    bag = { order: drawn.concat([...memberSet]), cursor: drawn.length };
+    shuffleBags.set(key, bag);
+    return bag;
+  }
+  
+  // シャッフルバッグから1人引く（まだ引いていない部分から選んで先頭側と入れ替える、O(1)）
+  // すべて引いた場合は引いた数を0に戻すだけでリセットできる
+  function drawFromBag(bag) {
+    if (bag.cursor >= bag.order.length) bag.cursor = 0;
+    const i = bag.cursor + Math.floor(Math.random() * (bag.order.length - bag.cursor));
+    const position = bag.order[i];
+    bag.order[i] = bag.order[bag.cursor];
+    bag.order[bag.cursor++] = position;
+    return position;
+  }
+  
+  // ガチャ処理
+  // 排出率に従って区分を選び、区分の中では既に引いた学者を、区分の全員を引くまで出さない
+  // （表のない絞り込みは、該当する全員から均等に選ぶ）
+  function drawScholar(tables = drawTables) {
+    if (scholars.length === 0) return null;
     
-    // すべての学者を引いた場合はリセット
-    if (availableScholars.length === 0) {
-      drawnScholars = [];
-      return drawScholar();
+    const table = tables[activeFilter];
+    const bucket = table ? sampleBucket(table) : null;
+    const bagKey = table ? `${activeFilter}|${table.buckets[bucket]}` : activeFilter;
+    const bag = getBag(bagKey, () => (table ? table.members[bucket] : filterPositions(activeFilter)));
+    if (bag.order.length === 0) {
+      alert(`${activeFilter}のカテゴリに該当する学者がいません。`);
+      return null;
     }
     
-    const scholar = availableScholars[Math.floor(Math.random() * availableScholars.length)];
-    drawnScholars.push(scholar.id);
-    return scholar;
+    const position = drawFromBag(bag);
+    scheduleSaveBags(bagKey);
+    return scholars[position];
   }
   
-  // カード表示
+  // カード表示（<template>のひな形を複製して中身を入れる）
+  const cardTemplate = document.getElementById('card-template');
+  
   function renderCard(scholar) {
-    const cardElement = document.createElement('div');
-    cardElement.className = `card card-anim rarity-frame-${scholar.rarity}`;
+    const cardElement = cardTemplate.content.firstElementChild.cloneNode(true);
+    cardElement.classList.add(`rarity-frame-${scholar.rarity}`);
     
-    const rarityClass = `rarity-${scholar.rarity}`;
-    
-    // 画像パスの調整（nullの場合はプレースホルダー）
-    const avatarPath = scholar.avatar || 'https://via.placeholder.com/300x300?text=No+Image';
-    
-    // レア度に応じた背景エフェクトを追加
-    let backgroundEffect = '';
+    // レア度に応じた背景エフェクト（SSR・SRのみ）
+    const backgroundEffect = cardElement.querySelector('.card-background-effect');
     if (scholar.rarity === 'SSR' || scholar.rarity === 'SR') {
-      backgroundEffect = `<div class="card-background-effect background-${scholar.rarity}"></div>`;
+      backgroundEffect.classList.add(`background-${scholar.rarity}`);
+    } else {
+      backgroundEffect.remove();
     }
     
-    cardElement.innerHTML = `
-      ${backgroundEffect}
-      <img class="card-img" src="${avatarPath}" alt="${scholar.name.ja}">
-      <div class="card-rarity ${rarityClass}">${scholar.rarity}</div>
-      <div class="card-content">
-        <h3>${scholar.name.ja}</h3>
-        <div>${scholar.name.en}</div>
-        <div class="card-affiliation">${scholar.affiliation}</div>
-        
-        <!-- タグを非表示に変更 -->
-        
-        <!-- 貢献セクション -->
-        <div class="contribution-section">
-          <h4>貢献</h4>
-          <div class="contribution-text">${scholar.contribution.text}</div>
-          <!-- 出典の詳細リンクを非表示に変更 -->
-        </div>
-        
-        <!-- 豆知識セクション -->
-        <div class="trivia-section">
-          <h4>豆知識</h4>
-          <div class="trivia-text">${scholar.trivia}</div>
-          <!-- 出典の詳細リンクを非表示に変更 -->
-        </div>
-      </div>
-    `;
+    renderAvatar(cardElement.querySelector('picture'), scholar);
+    
+    const rarity = cardElement.querySelector('.card-rarity');
+    rarity.classList.add(`rarity-${scholar.rarity}`);
+    rarity.textContent = scholar.rarity;
+    
+    cardElement.querySelector('.card-name-ja').textContent = scholar.name.ja;
+    cardElement.querySelector('.card-name-en').textContent = scholar.name.en;
+    cardElement.querySelector('.card-affiliation').textContent = scholar.affiliation || '';
+    cardElement.querySelector('.contribution-text').textContent = scholar.contribution ? scholar.contribution.text : '';
+    cardElement.querySelector('.trivia-text').textContent = scholar.trivia || '';
     
     return cardElement;
   }
   
   // ガチャ演出（カードが順番にスライドイン）
-  function gachaAnimation(cardElement, delay = 0) {
-    cardElement.style.opacity = '0';
-    cardElement.style.transform = 'translateY(50px)';
+  // 1つのrequestAnimationFrameのループで、時間になったカードから表示する
+  function revealCards(cards, interval = 150) {
+    const startTime = performance.now();
+    let next = 0;
+    
+    function step(now) {
+      while (next < cards.length && now - startTime >= next * interval) {
+        cards[next].classList.replace('card-pending', 'card-anim');
+        next++;
+      }
+      if (next < cards.length) requestAnimationFrame(step);
+    }
     
-    setTimeout(() => {
-      cardElement.style.opacity = '1';
-      cardElement.style.transform = 'translateY(0)';
-    }, delay);
+    requestAnimationFrame(step);
   }
   
-  // ガチャボタン処理
-  document.getElementById('pull-one').addEventListener('click', () => {
-    const resultArea = document.getElementById('gacha-result');
-    resultArea.innerHTML = '';
-    
-    const scholar = drawScholar();
-    if (scholar) {
-      const cardElement = renderCard(scholar);
-      resultArea.appendChild(cardElement);
-      gachaAnimation(cardElement);
-      
-      // レア度に応じたエフェクト
-      if (scholar.rarity === 'SSR') {
-        playSSREffect();
-      } else if (scholar.rarity === 'SR') {
-        playSREffect();
-      }
+  // count回引く（10連ガチャでは、最後までに保証枠のレア度が出なければ最後の1枠を保証枠の表から引く）
+  function drawScholars(count) {
+    const drawn = [];
+    for (let i = 0; i < count; i++) {
+      const isLast = i === count - 1;
+      const guaranteedTable = guaranteed && guaranteed.draw[activeFilter];
+      const needsGuarantee = count > 1 && isLast && guaranteedTable &&
+        !drawn.some(scholar => guaranteed.rarities.includes(scholar.rarity));
+      const scholar = needsGuarantee ? drawScholar(guaranteed.draw) : drawScholar();
+      if (!scholar) break;
+      drawn.push(scholar);
     }
-  });
+    return drawn;
+  }
   
-  // SSR演出
-  function playSSREffect() {
-    const body = document.querySelector('body');
-    
-    // フラッシュエフェクト
-    const overlay = document.createElement('div');
-    overlay.style.position = 'fixed';
-    overlay.style.top = '0';
-    overlay.style.left = '0';
-    overlay.style.width = '100%';
-    overlay.style.height = '100%';
-    overlay.style.background = 'radial-gradient(circle, rgba(255,215,0,0.8) 0%, rgba(255,255,255,0) 70%)';
-    overlay.style.pointerEvents = 'none';
-    overlay.style.zIndex = '999';
-    overlay.style.opacity = '0';
-    overlay.style.transition = 'opacity 0.3s ease';
+  // 引いた学者の詳細を読み込み、カードをまとめて表示
+  async function showResults(drawn) {
+    if (drawn.length === 0) return;
+    const resultArea = document.getElementById('gacha-result');
+    resultArea.innerHTML = '';
     
-    body.appendChild(overlay);
+    // 詳細を読み込んでから表示（読み込み中に次を引いた場合は古い結果を表示しない）
+    const drawId = ++drawCount;
+    await Promise.all(drawn.map(scholar => loadDetails(scholar).catch(error => {
+      console.error('学者の詳細の読み込みに失敗しました:', error);
+    })));
+    if (drawId !== drawCount) return;
     
-    // キラキラエフェクト（パーティクル）
-    const particles = document.createElement('div');
-    particles.style.position = 'fixed';
-    particles.style.top = '0';
-    particles.style.left = '0';
-    particles.style.width = '100%';
-    particles.style.height = '100%';
-    particles.style.pointerEvents = 'none';
-    particles.style.zIndex = '998';
-    body.appendChild(particles);
+    // すべてのカードを1つのDocumentFragmentにまとめて、1回で追加する
+    const fragment = document.createDocumentFragment();
+    const cards = drawn.map(scholar => fragment.appendChild(renderCard(scholar)));
+    resultArea.appendChild(fragment);
+    revealCards(cards);
     
-    // 20個のパーティクルを生成
-    for (let i = 0; i < 20; i++) {
-      createParticle(particles);
+    // 最も高いレア度に応じたエフェクト
+    if (drawn.some(scholar => scholar.rarity === 'SSR')) {
+      playRarityEffect('SSR');
+    } else if (drawn.some(scholar => scholar.rarity === 'SR')) {
+      playRarityEffect('SR');
     }
-    
-    // SSRテキスト演出
-    const ssrText = document.createElement('div');
-    ssrText.textContent = 'SSR GET!!';
-    ssrText.style.position = 'fixed';
-    ssrText.style.top = '50%';
-    ssrText.style.left = '50%';
-    ssrText.style.transform = 'translate(-50%, -50%) scale(0)';
-    ssrText.style.fontSize = '5rem';
-    ssrText.style.fontWeight = 'bold';
-    ssrText.style.color = 'gold';
-    ssrText.style.textShadow = '0 0 10px rgba(255,215,0,0.8), 0 0 20px rgba(255,215,0,0.5)';
-    ssrText.style.zIndex = '1000';
-    ssrText.style.transition = 'transform 0.5s cubic-bezier(0.175, 0.885, 0.32, 1.275)';
-    body.appendChild(ssrText);
-    
-    // アニメーション実行
-    setTimeout(() => {
-      overlay.style.opacity = '1';
-      ssrText.style.transform = 'translate(-50%, -50%) scale(1)';
-      
-      setTimeout(() => {
-        overlay.style.opacity = '0';
-        ssrText.style.transform = 'translate(-50%, -50%) scale(0)';
-        
-        setTimeout(() => {
-          body.removeChild(overlay);
-          body.removeChild(ssrText);
-          body.removeChild(particles);
-        }, 500);
-      }, 1000);
-    }, 10);
   }
   
-  // キラキラパーティクル生成
-  function createParticle(container) {
-    const particle = document.createElement('div');
-    const size = Math.random() * 15 + 5;
-    
-    particle.style.position = 'absolute';
-    particle.style.width = `${size}px`;
-    particle.style.height = `${size}px`;
-    particle.style.background = 'gold';
-    particle.style.borderRadius = '50%';
-    particle.style.boxShadow = '0 0 10px rgba(255,215,0,0.8)';
+  // ガチャボタン処理
+  document.getElementById('pull-one').addEventListener('click', () => showResults(drawScholars(1)));
+  document.getElementById('pull-ten').addEventListener('click', () => showResults(drawScholars(10)));
+  
+  // SSR・SRの演出
+  // フラッシュ・文字・パーティクルのcanvasは最初の演出で1回だけ作り、以降は使い回す
+  // （opacityとtransformだけを変化させ、レイアウトの再計算を起こさない）
+  const RARITY_EFFECTS = {
+    SSR: { text: 'SSR GET!!', particles: 24, duration: 1000 },
+    SR: { text: 'SR!', particles: 0, duration: 800 },
+  };
+  let effectLayer = null;
+  let effectTimer = null;
+  
+  function getEffectLayer() {
+    if (effectLayer) return effectLayer;
+    const flash = document.createElement('div');
+    const canvas = document.createElement('canvas');
+    const text = document.createElement('div');
+    canvas.className = 'effect-canvas';
+    document.body.append(flash, canvas, text);
+    effectLayer = { flash, text, particles: createParticleEngine(canvas) };
+    return effectLayer;
+  }
+  
+  function playRarityEffect(rarity) {
+    const effect = RARITY_EFFECTS[rarity];
+    const layer = getEffectLayer();
     
-    // ランダムな位置と動き
-    const startX = Math.random() * window.innerWidth;
-    const startY = Math.random() * window.innerHeight;
-    const angle = Math.random() * Math.PI * 2;
-    const speed = Math.random() * 100 + 50;
+    // 前の演出が残っていれば最初からやり直す
+    clearTimeout(effectTimer);
+    layer.flash.className = `effect-flash effect-${rarity}`;
+    layer.text.className = `effect-text effect-${rarity}`;
+    layer.text.textContent = effect.text;
+    if (effect.particles) layer.particles.burst(effect.particles);
     
-    particle.style.left = `${startX}px`;
-    particle.style.top = `${startY}px`;
+    // 非表示の状態が描画されてから表示に切り替える（トランジションを開始するため）
+    requestAnimationFrame(() => requestAnimationFrame(() => {
+      layer.flash.classList.add('is-active');
+      layer.text.classList.add('is-active');
+      effectTimer = setTimeout(() => {
+        layer.flash.classList.remove('is-active');
+        layer.text.classList.remove('is-active');
+      }, effect.duration);
+    }));
+  }
+  
+  // キラキラパーティクル（1枚のcanvasに描く）
+  // 粒子の状態は事前に確保した配列に持ち、消えた粒子は末尾の粒子と入れ替えて取り除く（DOM要素は作らない）
+  const MAX_PARTICLES = 64;
+  const PARTICLE_STRIDE = 7; // x, y, vx, vy, 大きさ, 開始時刻, 表示時間
+  
+  function createParticleEngine(canvas) {
+    const context = canvas.getContext('2d');
+    const particles = new Float64Array(MAX_PARTICLES * PARTICLE_STRIDE);
+    const sprite = createParticleSprite();
+    let count = 0;
+    let running = false;
+    let width = 0;
+    let height = 0;
     
-    container.appendChild(particle);
+    function resize() {
+      const ratio = Math.min(window.devicePixelRatio || 1, 2);
+      width = window.innerWidth;
+      height = window.innerHeight;
+      canvas.width = Math.round(width * ratio);
+      canvas.height = Math.round(height * ratio);
+      context.setTransform(ratio, 0, 0, ratio, 0, 0);
+    }
     
-    // パーティクルのアニメーション
-    const startTime = Date.now();
-    const duration = Math.random() * 1000 + 1000;
+    // ランダムな位置と動きの粒子をn個追加
+    function burst(n) {
+      if (!running) resize();
+      const now = performance.now();
+      for (let i = 0; i < n && count < MAX_PARTICLES; i++, count++) {
+        const angle = Math.random() * Math.PI * 2;
+        const speed = Math.random() * 100 + 50;
+        const offset = count * PARTICLE_STRIDE;
+        particles[offset] = Math.random() * width;
+        particles[offset + 1] = Math.random() * height;
+        particles[offset + 2] = Math.cos(angle) * speed;
+        particles[offset + 3] = Math.sin(angle) * speed;
+        particles[offset + 4] = Math.random() * 15 + 5;
+        particles[offset + 5] = now;
+        particles[offset + 6] = Math.random() * 1000 + 1000;
+      }
+      if (!running) {
+        running = true;
+        canvas.classList.add('is-active');
+        requestAnimationFrame(frame);
+      }
+    }
     
-    function animate() {
-      const elapsed = Date.now() - startTime;
-      const progress = elapsed / duration;
-      
-      if (progress >= 1) {
-        container.removeChild(particle);
-        return;
+    function frame(now) {
+      context.clearRect(0, 0, width, height);
+      for (let i = 0; i < count;) {
+        const offset = i * PARTICLE_STRIDE;
+        const progress = Math.max(0, (now - particles[offset + 5]) / particles[offset + 6]);
+        if (progress >= 1) {
+          count--;
+          particles.copyWithin(offset, count * PARTICLE_STRIDE, (count + 1) * PARTICLE_STRIDE);
+          continue;
+        }
+        
+        // 光のにじみを含めて粒子の2倍の大きさで描く
+        const scale = 1 - progress;
+        const size = particles[offset + 4] * scale * 2;
+        context.globalAlpha = scale;
+        context.drawImage(
+          sprite,
+          particles[offset] + particles[offset + 2] * progress - size / 2,
+          particles[offset + 1] + particles[offset + 3] * progress - size / 2,
+          size,
+          size
+        );
+        i++;
       }
+      context.globalAlpha = 1;
       
-      const x = startX + Math.cos(angle) * speed * progress;
-      const y = startY + Math.sin(angle) * speed * progress;
-      const scale = 1 - progress;
-      
-      particle.style.left = `${x}px`;
-      particle.style.top = `${y}px`;
-      particle.style.opacity = scale.toString();
-      particle.style.transform = `scale(${scale})`;
-      
-      requestAnimationFrame(animate);
+      if (count > 0) {
+        requestAnimationFrame(frame);
+      } else {
+        running = false;
+        canvas.classList.remove('is-active');
+      }
     }
     
-    requestAnimationFrame(animate);
+    return { burst };
   }
   
-  // SR演出
-  function playSREffect() {
-    const body = document.querySelector('body');
-    
-    // フラッシュエフェクト
-    const overlay = document.createElement('div');
-    overlay.style.position = 'fixed';
-    overlay.style.top = '0';
-    overlay.style.left = '0';
-    overlay.style.width = '100%';
-    overlay.style.height = '100%';
-    overlay.style.background = 'radial-gradient(circle, rgba(192,192,192,0.6) 0%, rgba(255,255,255,0) 70%)';
-    overlay.style.pointerEvents = 'none';
-    overlay.style.zIndex = '999';
-    overlay.style.opacity = '0';
-    overlay.style.transition = 'opacity 0.3s ease';
-    
-    body.appendChild(overlay);
-    
-    // SRテキスト演出
-    const srText = document.createElement('div');
-    srText.textContent = 'SR!';
-    srText.style.position = 'fixed';
-    srText.style.top = '50%';
-    srText.style.left = '50%';
-    srText.style.transform = 'translate(-50%, -50%) scale(0)';
-    srText.style.fontSize = '4rem';
-    srText.style.fontWeight = 'bold';
-    srText.style.color = 'silver';
-    srText.style.textShadow = '0 0 8px rgba(192,192,192,0.6)';
-    srText.style.zIndex = '1000';
-    srText.style.transition = 'transform 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275)';
-    body.appendChild(srText);
-    
-    // アニメーション実行
-    setTimeout(() => {
-      overlay.style.opacity = '1';
-      srText.style.transform = 'translate(-50%, -50%) scale(1)';
-      
-      setTimeout(() => {
-        overlay.style.opacity = '0';
-        srText.style.transform = 'translate(-50%, -50%) scale(0)';
-        
-        setTimeout(() => {
-          body.removeChild(overlay);
-          body.removeChild(srText);
-        }, 300);
-      }, 800);
-    }, 10);
+  // 光る金色の粒子の画像（1回だけ描いて使い回す。描くたびにshadowBlurを使うと重いため）
+  function createParticleSprite() {
+    const sprite = document.createElement('canvas');
+    sprite.width = sprite.height = 64;
+    const context = sprite.getContext('2d');
+    const gradient = context.createRadialGradient(32, 32, 0, 32, 32, 32);
+    gradient.addColorStop(0, 'rgba(255, 215, 0, 1)');
+    gradient.addColorStop(0.5, 'rgba(255, 215, 0, 1)');
+    gradient.addColorStop(0.55, 'rgba(255, 215, 0, 0.6)');
+    gradient.addColorStop(1, 'rgba(255, 215, 0, 0)');
+    context.fillStyle = gradient;
+    context.fillRect(0, 0, 64, 64);
+    return sprite;
+  }
+  
+  // サービスワーカー（2回目以降の訪問ではデータ・画像をキャッシュから読み込む）
+  if ('serviceWorker' in navigator) {
+    navigator.serviceWorker.register('sw.js').catch(error => {
+      console.warn('サービスワーカーを登録できませんでした:', error);
+    });
   }
   
   // 初期化
+  loadSavedBags();
+  window.addEventListener('pagehide', saveBags);
   loadScholars();
+  loadAvatarVariants();
 });
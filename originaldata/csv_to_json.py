@@ -1,7 +1,18 @@
-import pandas as pd
+import argparse
+import hashlib
 import json
 import os
+import sys
+import time
 from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 学者データのスキーマ（scripts/scholar_schema.py）を参照するため、プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import scholar_schema
 
 # レア度の変換マッピング
 rarity_mapping = {
@@ -11,79 +22,94 @@ rarity_mapping = {
     4: "SSR"
 }
 
-# 現在のscholars.jsonを読み込む
+# 入出力ファイル
 scholars_file = 'scholars.json'
-with open(scholars_file, 'r', encoding='utf-8') as f:
-    scholars_data = json.load(f)
+output_file = 'scholars_updated.json'
 
-# 既存のIDを取得して重複しないようにする
-existing_ids = [scholar['id'] for scholar in scholars_data]
-
-# CSVファイルを読み込む
+# CSVファイル
 sheet1_file = 'リスト_Sheet1.csv'
 sheet2_file = 'リスト_第二弾.csv'
 
-# 両方のCSVファイルを処理
-new_scholars = []
+# 列の並び（レア度・人名・リンク・4列目は写真へのリンクなど）
+COLUMNS = ['rarity', 'name', 'link']
 
-def process_csv(csv_file):
-    scholars_list = []
-    if not os.path.exists(csv_file):
-        print(f"ファイル {csv_file} が見つかりません。")
-        return []
-    
-    df = pd.read_csv(csv_file)
-    
-    # カラム名を修正（CSVファイルの最初の行が空白または不適切な場合）
-    if df.columns[0] == '1' or df.columns[0] == '':
-        # 第二弾.csvの場合（または適切なカラム名がない場合）
-        df.columns = ['rarity', 'name', 'link', 'extra']
-    else:
-        # Sheet1.csvの場合
-        df.columns = ['rarity', 'name', 'link', 'image_link']
-    
-    for _, row in df.iterrows():
-        # 空行または必要な情報がない行はスキップ
-        if pd.isna(row['name']) or str(row['name']).strip() == '':
-            continue
-        
-        # 名前から簡単なIDを生成
-        name_romaji = ""
-        try:
-            # ここでは簡易的にローマ字変換を行わず、名前の最初の部分を使用
-            name_parts = str(row['name']).split()
-            name_romaji = name_parts[0].lower() if name_parts else "unknown"
-        except:
-            name_romaji = "unknown"
-        
-        # 現在の年を取得
-        current_year = datetime.now().year
-        
-        # IDを生成（名前のローマ字 + 年）
-        scholar_id = f"{name_romaji}{current_year}"
-        
-        # IDが既に存在する場合は、連番を付ける
-        original_id = scholar_id
-        counter = 1
-        while scholar_id in existing_ids:
-            scholar_id = f"{original_id}_{counter}"
+# 差分取り込みの対応表（行のハッシュ -> 学者ID）
+ingest_index_file = 'ingest_index.json'
+
+def read_csv(csv_file):
+    """CSVを読み込み、rarity / name / link の列にそろえたDataFrameを返す
+
+    第二弾のCSVのように見出し行がない（1行目がデータの）場合は、1行目もデータとして読む。
+    """
+    df = pd.read_csv(csv_file, dtype=str, keep_default_na=False, na_values=[''])
+    header_is_data = pd.notna(pd.to_numeric(pd.Series([df.columns[0]]), errors='coerce')[0])
+    if header_is_data or df.columns[0] == '':
+        df = pd.read_csv(csv_file, dtype=str, keep_default_na=False, na_values=[''], header=None)
+
+    df = df.iloc[:, :len(COLUMNS)]
+    df.columns = COLUMNS[:df.shape[1]]
+    for column in COLUMNS:
+        if column not in df:
+            df[column] = np.nan
+    return df
+
+def make_base_ids(names, year):
+    """名前からIDの元（名前の最初の部分を小文字にしたもの + 年）を列ごとにまとめて作る"""
+    # ここでは簡易的にローマ字変換を行わず、名前の最初の部分を使用
+    first = names.str.split().str[0].str.lower().fillna('unknown')
+    return first + str(year)
+
+def resolve_ids(base_ids, taken):
+    """IDの重複を解消する（既に使われている場合は _1, _2 ... を付ける）
+
+    taken は既存のIDの集合で、割り当てたIDも追加される。基本IDごとに次に試す連番を
+    覚えておくため、同じ名前が何度出てきても先頭から探し直さない。
+    """
+    next_suffix = {}
+    resolved = []
+    for base in base_ids:
+        counter = next_suffix.get(base, 0)
+        scholar_id = f"{base}_{counter}" if counter else base
+        while scholar_id in taken:
             counter += 1
-        
-        # レア度の変換
-        rarity_value = row['rarity']
-        try:
-            rarity_value = int(rarity_value)
-        except:
-            rarity_value = 1  # デフォルトはN
-        
-        rarity = rarity_mapping.get(rarity_value, "N")
-        
-        # 新しい学者データを作成
-        scholar = {
+            scholar_id = f"{base}_{counter}"
+        next_suffix[base] = counter + 1
+        taken.add(scholar_id)
+        resolved.append(scholar_id)
+    return resolved
+
+def normalize_rows(df):
+    """空行・名前のない行を除き、name / rarity（N〜SSR）/ link（なければ空文字）の列にそろえる"""
+    names = df['name'].astype('string').str.strip()
+    df = df[names.notna() & (names != '')]
+
+    # レア度の変換（数値にできない値はN）
+    rarity_values = pd.to_numeric(df['rarity'], errors='coerce').fillna(1).astype(int)
+    return pd.DataFrame({
+        'name': df['name'].astype(str),
+        'rarity': rarity_values.map(rarity_mapping).fillna("N"),
+        'link': df['link'].where(df['link'].notna(), "").astype(str),
+    })
+
+def build_scholar_records(df, taken, created_at=None, normalized=False):
+    """rarity / name / link の列を持つDataFrameから学者データをまとめて作る
+
+    空行または名前のない行は除く。taken には割り当てたIDが追加される。
+    """
+    created_at = created_at or datetime.now().strftime("%Y-%m-%d")
+
+    rows = df if normalized else normalize_rows(df)
+    if rows.empty:
+        return []
+    names, rarities, links = rows['name'], rows['rarity'], rows['link']
+    ids = resolve_ids(make_base_ids(names, datetime.now().year).tolist(), taken)
+
+    return [
+        {
             "id": scholar_id,
             "name": {
                 "en": "",  # 英語名はここでは空欄
-                "ja": str(row['name'])
+                "ja": name
             },
             "affiliation": "",  # 所属情報はCSVにないため空欄
             "tags": [],  # タグ情報はCSVにないため空配列
@@ -92,35 +118,266 @@ def process_csv(csv_file):
             "highlights": [],
             "contribution": {
                 "text": "",
-                "source": row['link'] if not pd.isna(row['link']) else ""
+                "source": link
             },
             "trivia": "",
             "triviaSource": "",
-            "sources": [
-                row['link'] if not pd.isna(row['link']) else ""
-            ],
-            "created_at": datetime.now().strftime("%Y-%m-%d")
+            "sources": [link],
+            "created_at": created_at
         }
-        
-        # 既存のIDリストに追加して重複を防ぐ
-        existing_ids.append(scholar_id)
-        
-        scholars_list.append(scholar)
-        
-    return scholars_list
-
-# 両方のCSVファイルを処理
-new_scholars = process_csv(sheet1_file) + process_csv(sheet2_file)
-
-# 新しい学者データを既存のデータに追加
-scholars_data.extend(new_scholars)
-
-# 更新したデータをJSONファイルに書き込む
-with open('scholars_updated.json', 'w', encoding='utf-8') as f:
-    json.dump(scholars_data, f, indent=2, ensure_ascii=False)
-
-print(f"変換が完了しました。{len(new_scholars)}名の新しい学者データが追加されました。")
-print("新しいファイル 'scholars_updated.json' が作成されました。")
-print("新しく追加された学者のID一覧:")
-for scholar in new_scholars:
-    print(f"- {scholar['id']}: {scholar['name']['ja']} ({scholar['rarity']})")
+        for scholar_id, name, rarity, link in zip(ids, names.tolist(), rarities.tolist(), links.tolist())
+    ]
+
+def row_key(name):
+    """同じ学者の行とみなすキー（前後の空白を除いた人名）"""
+    return name.strip()
+
+def row_hashes(rows):
+    """正規化した行の内容（人名・レア度・リンク）のハッシュ"""
+    return [
+        hashlib.sha256(f"{name.strip()}\x1f{rarity}\x1f{link}".encode('utf-8')).hexdigest()
+        for name, rarity, link in zip(rows['name'].tolist(), rows['rarity'].tolist(), rows['link'].tolist())
+    ]
+
+def load_ingest_index(path=ingest_index_file):
+    """差分取り込みの対応表を読み込む
+
+    rows: 行のハッシュ -> 学者ID
+    scholars: 学者ID -> 前回取り込んだ行の内容（key / hash / rarity / link）
+    """
+    if not os.path.exists(path):
+        return {"rows": {}, "scholars": {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_ingest_index(index, path=ingest_index_file):
+    """差分取り込みの対応表を書き出す（一時ファイル経由で置き換え）"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def start_incremental(scholars_data, index):
+    """差分取り込みの作業状態（学者ID -> 学者データ、人名のキー -> 学者ID、今回取り込んだ学者ID）を作る
+
+    対応表にない既存の学者（差分取り込み導入前に追加したもの）は日本語名で対応付ける。
+    """
+    key_to_id = {}
+    for scholar in scholars_data:
+        name_ja = (scholar.get('name') or {}).get('ja')
+        if name_ja:
+            key_to_id.setdefault(row_key(name_ja), scholar['id'])
+    for scholar_id, entry in index["scholars"].items():
+        key_to_id[entry["key"]] = scholar_id
+    return {
+        'by_id': {scholar['id']: scholar for scholar in scholars_data},
+        'key_to_id': key_to_id,
+        'seen': set(),
+    }
+
+def record_row(index, scholar_id, key, row_hash, rarity, link):
+    """取り込んだ行を対応表に記録（同じ学者の前回のハッシュは除く）"""
+    previous = index["scholars"].get(scholar_id)
+    if previous:
+        index["rows"].pop(previous["hash"], None)
+    index["rows"][row_hash] = scholar_id
+    index["scholars"][scholar_id] = {"key": key, "hash": row_hash, "rarity": rarity, "link": link}
+
+def apply_incremental(df, scholars_data, index, taken, created_at=None, state=None):
+    """前回から追加・変更された行だけを学者データに反映する
+
+    行のハッシュが対応表にある行は読み飛ばす。人名が既存の学者と一致する行は、前回の取り込みから
+    スプレッドシート上で変わった項目（レア度・リンク）だけを更新し、それ以外の行は新しい学者として追加する。
+    対応表にない既存の学者は、その行の内容を次回以降の比較の基準として記録するだけにする。
+    同じ人名の行が複数ある場合は最初の行を使い、残りの行はハッシュだけを記録する。
+
+    state は start_incremental() の作業状態（複数のシート・チャンクに分けて呼び出す場合に使い回す）。
+
+    Returns:
+        (追加した学者データのリスト, 更新した学者データのリスト, 変更のなかった行数)
+        （更新した学者データは scholars_data の中のものをそのまま変更している。書き出す前に検証すること）
+    """
+    rows = normalize_rows(df)
+    if rows.empty:
+        return [], [], 0
+    hashes = pd.Series(row_hashes(rows), index=rows.index)
+
+    # 前回と同じ内容の行は読み飛ばす
+    known = hashes.isin(index["rows"].keys())
+    unchanged = int(known.sum())
+    if state is None:
+        state = start_incremental(scholars_data, index)
+    by_id, key_to_id, seen = state['by_id'], state['key_to_id'], state['seen']
+    # 変更のない行の学者も今回取り込んだものとする（同じ人名の別の行で上書きしない）
+    seen.update(index["rows"][row_hash] for row_hash in hashes[known].tolist())
+
+    rows, hashes = rows[~known], hashes[~known]
+    if rows.empty:
+        return [], [], unchanged
+
+    updated = []
+    insert_positions = []
+    pending = {}  # 追加する人名のキー -> 同じ人名の後続の行のハッシュ
+    for position, (name, rarity, link, row_hash) in enumerate(zip(
+            rows['name'].tolist(), rows['rarity'].tolist(), rows['link'].tolist(), hashes.tolist())):
+        key = row_key(name)
+        if key in pending:
+            pending[key].append(row_hash)
+            unchanged += 1
+            continue
+        scholar_id = key_to_id.get(key)
+        scholar = by_id.get(scholar_id)
+        if scholar is None:
+            insert_positions.append(position)
+            pending[key] = []
+            continue
+        if scholar_id in seen:
+            index["rows"][row_hash] = scholar_id
+            unchanged += 1
+            continue
+
+        # 前回取り込んだ値から変わった項目だけを更新（手作業・エンリッチで直した値を上書きしない）
+        # 対応表にない学者は、今回の行を基準として記録するだけにする
+        previous = index["scholars"].get(scholar_id) or {"rarity": rarity, "link": link}
+        changed = False
+        if rarity != previous["rarity"]:
+            scholar["rarity"] = rarity
+            changed = True
+        if link != previous["link"]:
+            scholar.setdefault("contribution", {})["source"] = link
+            scholar["sources"] = [link] + [s for s in scholar.get("sources", [])[1:] if s != link]
+            changed = True
+        if changed:
+            updated.append(scholar)
+        else:
+            unchanged += 1
+        record_row(index, scholar_id, key, row_hash, rarity, link)
+        seen.add(scholar_id)
+
+    inserted = []
+    if insert_positions:
+        inserted = build_scholar_records(rows.iloc[insert_positions], taken, created_at, normalized=True)
+        for record, row_hash in zip(inserted, hashes.iloc[insert_positions].tolist()):
+            key = row_key(record['name']['ja'])
+            record_row(index, record['id'], key, row_hash, record['rarity'], record['sources'][0])
+            for duplicate_hash in pending[key]:
+                index["rows"][duplicate_hash] = record['id']
+            by_id[record['id']] = record
+            key_to_id[key] = record['id']
+            seen.add(record['id'])
+        scholars_data.extend(inserted)
+
+    return inserted, updated, unchanged
+
+def process_csv(csv_file, taken):
+    """CSVファイル1つ分の学者データを作る"""
+    if not os.path.exists(csv_file):
+        print(f"ファイル {csv_file} が見つかりません。")
+        return [], 0
+
+    df = read_csv(csv_file)
+    return build_scholar_records(df, taken), len(df)
+
+def make_benchmark_frame(rows, seed=0):
+    """計測用の候補者リスト（同姓の重複を多く含む）を作る"""
+    rng = np.random.default_rng(seed)
+    surnames = np.array([f"Scholar{i}" for i in range(max(1, rows // 20))])
+    return pd.DataFrame({
+        'rarity': rng.integers(1, 5, rows).astype(str),
+        'name': pd.Series(rng.choice(surnames, rows)) + " " + pd.Series(np.arange(rows)).astype(str),
+        'link': [f"https://en.wikipedia.org/wiki/Bench_{i}" for i in range(rows)],
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description="候補者リストのCSVを学者データ（JSON）に変換")
+    parser.add_argument("csv_files", nargs="*", default=[sheet1_file, sheet2_file],
+                        help=f"変換するCSVファイル（既定: {sheet1_file} {sheet2_file}）")
+    parser.add_argument("--scholars", default=scholars_file, help=f"既存の学者データ（既定: {scholars_file}）")
+    parser.add_argument("--output", default=output_file, help=f"出力ファイル（既定: {output_file}）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="前回から追加・変更された行だけを反映する（同じ学者を重複して追加しない）")
+    parser.add_argument("--index", default=ingest_index_file,
+                        help=f"差分取り込みの対応表（既定: {ingest_index_file}）")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS",
+                        help="指定した行数の架空のリストで変換速度を計測する（ファイルは書き出さない）")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        df = make_benchmark_frame(args.benchmark)
+        start_time = time.perf_counter()
+        records = build_scholar_records(df, set())
+        elapsed = time.perf_counter() - start_time
+        print(f"{len(records)}行を{elapsed:.2f}秒で変換しました（{len(records) / elapsed:,.0f}行/秒）")
+        return
+
+    # 現在の学者データを読み込む（差分取り込みでは前回の出力ファイルを更新する）
+    scholars_path = args.scholars
+    if args.incremental and os.path.exists(args.output):
+        scholars_path = args.output
+    with open(scholars_path, 'r', encoding='utf-8') as f:
+        scholars_data = json.load(f)
+
+    # 既存のIDを取得して重複しないようにする
+    taken = {scholar['id'] for scholar in scholars_data}
+
+    start_time = time.perf_counter()
+    new_scholars = []
+    updated_scholars = []
+    total_rows = 0
+    index = None
+    if args.incremental:
+        index = load_ingest_index(args.index)
+        # 作業状態はCSVをまたいで使い回す（同じ人名が複数のCSVにある場合は excel_to_json.py と同じく最初の行を使う）
+        state = start_incremental(scholars_data, index)
+        unchanged = 0
+        for csv_file in args.csv_files:
+            if not os.path.exists(csv_file):
+                print(f"ファイル {csv_file} が見つかりません。")
+                continue
+            df = read_csv(csv_file)
+            records, file_updated, file_unchanged = apply_incremental(df, scholars_data, index, taken, state=state)
+            new_scholars.extend(records)
+            updated_scholars.extend(file_updated)
+            unchanged += file_unchanged
+            total_rows += len(df)
+        print(f"差分取り込み: 追加 {len(new_scholars)}名, 更新 {len(updated_scholars)}名, 変更なし {unchanged}行")
+    else:
+        for csv_file in args.csv_files:
+            records, rows = process_csv(csv_file, taken)
+            new_scholars.extend(records)
+            total_rows += rows
+
+        # 新しい学者データを既存のデータに追加
+        scholars_data.extend(new_scholars)
+    elapsed = time.perf_counter() - start_time
+
+    # 追加・更新した学者データを検証（エラーがあれば書き込まない）
+    errors = scholar_schema.validate_records(new_scholars + updated_scholars)
+    if errors:
+        raise scholar_schema.SchemaError(errors)
+
+    # 更新したデータをJSONファイルに書き込む（一時ファイル経由で置き換え）
+    # 差分取り込みでは入力と出力が同じファイルのため、書き込み途中で失敗しても学者データを壊さない
+    temp_path = f"{args.output}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(scholars_data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, args.output)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    # 学者データを書き込めた場合だけ対応表を更新する
+    if index is not None:
+        save_ingest_index(index, args.index)
+
+    print(f"変換が完了しました。{len(new_scholars)}名の新しい学者データが追加されました。")
+    print(f"新しいファイル '{args.output}' が作成されました。")
+    if elapsed > 0:
+        print(f"{total_rows}行を{elapsed:.2f}秒で処理しました（{total_rows / elapsed:,.0f}行/秒）")
+    print("新しく追加された学者のID一覧:")
+    for scholar in new_scholars:
+        print(f"- {scholar['id']}: {scholar['name']['ja']} ({scholar['rarity']})")
+
+if __name__ == "__main__":
+    main()
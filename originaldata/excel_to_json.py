@@ -0,0 +1,244 @@
+"""
+候補者リスト（リスト.xlsx）から学者データ（JSON）を直接作成する
+
+convert_excel_to_csv.py → csv_to_json.py の2段階（全シートをpandasで読み込んでCSVに書き出し、
+見出しから列の並びを推測して読み直す）の代わりに、openpyxlの読み取り専用モードで
+シートを1行ずつ読み、シートごとに設定した列の対応で学者データを作る。
+
+- 一定行数ごとに学者データを作成して出力ファイルに書き足すため、メモリ使用量はリストの大きさによらない
+- 設定にないシートは読み込まない（列の並びを推測しない）
+
+使い方:
+python excel_to_json.py                       # リスト.xlsx → scholars_updated.json
+python excel_to_json.py --sheets 第二弾       # 指定したシートのみ
+python excel_to_json.py --incremental         # 前回から追加・変更された行だけを反映
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# 同じディレクトリの csv_to_json の変換処理を使う
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from csv_to_json import (
+    build_scholar_records, apply_incremental, start_incremental, load_ingest_index, save_ingest_index,
+    COLUMNS, scholars_file, output_file, ingest_index_file,
+)
+from scripts import scholar_schema  # csv_to_json がプロジェクトルートをパスに追加している
+
+# 入力ファイル
+excel_file = 'リスト.xlsx'
+
+# シートごとの列の対応
+# header_row: 見出しの行番号（見出しがないシートはNone）
+# columns: 項目 -> 見出しの文字列（見出しがある場合）または列番号（1始まり、見出しがない場合）
+SHEET_CONFIG = {
+    'Sheet1': {
+        'header_row': 1,
+        'columns': {'rarity': 'レア度', 'name': '人名', 'link': '説明文'},
+    },
+    '第二弾': {
+        'header_row': None,
+        'columns': {'rarity': 1, 'name': 2, 'link': 3},
+    },
+}
+
+# 一度に学者データを作る行数
+CHUNK_ROWS = 5000
+
+def resolve_columns(sheet_name, config, header):
+    """項目 -> 列の位置（0始まり）を求める"""
+    positions = {}
+    for field, column in config['columns'].items():
+        if config['header_row'] is None:
+            positions[field] = column - 1
+            continue
+        try:
+            positions[field] = header.index(column)
+        except ValueError:
+            raise ValueError(f"シート '{sheet_name}' に見出し '{column}' がありません（見出し: {header}）")
+    return positions
+
+def iter_sheet_chunks(ws, sheet_name, config):
+    """シートを1行ずつ読み、rarity / name / link の列を持つDataFrameを CHUNK_ROWS 行ごとに返す"""
+    header_row = config['header_row']
+    rows = ws.iter_rows(values_only=True)
+    header = None
+    if header_row is not None:
+        for _ in range(header_row):
+            header = next(rows, ())
+        header = [str(value).strip() if value is not None else '' for value in header]
+    positions = resolve_columns(sheet_name, config, header)
+
+    chunk = []
+    for row in rows:
+        chunk.append(tuple(row[positions[field]] if positions[field] < len(row) else None for field in COLUMNS))
+        if len(chunk) >= CHUNK_ROWS:
+            yield pd.DataFrame(chunk, columns=COLUMNS), len(chunk)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk, columns=COLUMNS), len(chunk)
+
+class JsonArrayWriter:
+    """JSON配列を1要素ずつ書き出す（json.dump(indent=2) と同じ形式）"""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+        self.f.write('[')
+
+    def write(self, item):
+        text = json.dumps(item, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+        self.f.write((',\n  ' if self.count else '\n  ') + text)
+        self.count += 1
+
+    def close(self):
+        self.f.write('\n]' if self.count else ']')
+
+def iter_sheets(wb, sheets):
+    """変換するシートとその列の設定を返す"""
+    for sheet_name in wb.sheetnames:
+        config = SHEET_CONFIG.get(sheet_name)
+        if sheets and sheet_name not in sheets:
+            continue
+        if config is None:
+            print(f"シート '{sheet_name}' は列の設定がないためスキップします（SHEET_CONFIGに追加してください）")
+            continue
+        yield sheet_name, config
+
+def convert(workbook_path, sheets, scholars_path, output_path):
+    """Excelの指定したシートから学者データを作り、既存のデータに追加して書き出す"""
+    with open(scholars_path, 'r', encoding='utf-8') as f:
+        scholars_data = json.load(f)
+
+    # 既存のIDを取得して重複しないようにする
+    taken = {scholar['id'] for scholar in scholars_data}
+    created_at = datetime.now().strftime("%Y-%m-%d")
+
+    stats = {'rows': 0, 'added': 0, 'sheets': 0}
+    # 一時ファイルに書き出し、最後まで変換できた場合だけ置き換える
+    # （途中で検証エラーなどが起きても、出力先（入力と同じ場合は学者データ）を壊さない）
+    temp_path = f"{output_path}.tmp"
+    wb = load_workbook(workbook_path, read_only=True, data_only=True)
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            writer = JsonArrayWriter(f)
+            for scholar in scholars_data:
+                writer.write(scholar)
+            del scholars_data
+
+            for sheet_name, config in iter_sheets(wb, sheets):
+                added = 0
+                for df, rows in iter_sheet_chunks(wb[sheet_name], sheet_name, config):
+                    records = build_scholar_records(df, taken, created_at)
+                    errors = scholar_schema.validate_records(records)
+                    if errors:
+                        raise scholar_schema.SchemaError(errors)
+                    for record in records:
+                        writer.write(record)
+                        print(f"- {record['id']}: {record['name']['ja']} ({record['rarity']})")
+                    stats['rows'] += rows
+                    added += len(records)
+                print(f"シート '{sheet_name}': {added}名を追加しました")
+                stats['added'] += added
+                stats['sheets'] += 1
+            writer.close()
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        wb.close()
+    return stats
+
+def convert_incremental(workbook_path, sheets, scholars_path, output_path, index_path):
+    """前回から追加・変更された行だけを学者データに反映して書き出す
+
+    行の対応表（csv_to_json.py と共通）で取り込み済みの行を読み飛ばす。既存の学者を更新するため、
+    学者データはすべて読み込んでから書き出す（追加分のみを書き足す通常のモードとは異なる）。
+    """
+    with open(scholars_path, 'r', encoding='utf-8') as f:
+        scholars_data = json.load(f)
+
+    taken = {scholar['id'] for scholar in scholars_data}
+    created_at = datetime.now().strftime("%Y-%m-%d")
+    index = load_ingest_index(index_path)
+    state = start_incremental(scholars_data, index)
+
+    stats = {'rows': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'sheets': 0}
+    wb = load_workbook(workbook_path, read_only=True, data_only=True)
+    try:
+        for sheet_name, config in iter_sheets(wb, sheets):
+            added = updated = 0
+            for df, rows in iter_sheet_chunks(wb[sheet_name], sheet_name, config):
+                records, chunk_updated, chunk_unchanged = apply_incremental(
+                    df, scholars_data, index, taken, created_at, state)
+                # 追加した学者と、既存の学者のうち更新したものを検証（エラーがあれば書き込まない）
+                errors = scholar_schema.validate_records(records + chunk_updated)
+                if errors:
+                    raise scholar_schema.SchemaError(errors)
+                for record in records:
+                    print(f"- {record['id']}: {record['name']['ja']} ({record['rarity']})")
+                stats['rows'] += rows
+                stats['unchanged'] += chunk_unchanged
+                added += len(records)
+                updated += len(chunk_updated)
+            print(f"シート '{sheet_name}': {added}名を追加、{updated}名を更新しました")
+            stats['added'] += added
+            stats['updated'] += updated
+            stats['sheets'] += 1
+    finally:
+        wb.close()
+
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        writer = JsonArrayWriter(f)
+        for scholar in scholars_data:
+            writer.write(scholar)
+        writer.close()
+    os.replace(temp_path, output_path)
+    save_ingest_index(index, index_path)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="候補者リスト（Excel）を学者データ（JSON）に変換")
+    parser.add_argument("--excel", default=excel_file, help=f"候補者リスト（既定: {excel_file}）")
+    parser.add_argument("--sheets", nargs="+", help="変換するシート（既定: SHEET_CONFIGにあるすべてのシート）")
+    parser.add_argument("--scholars", default=scholars_file, help=f"既存の学者データ（既定: {scholars_file}）")
+    parser.add_argument("--output", default=output_file, help=f"出力ファイル（既定: {output_file}）")
+    parser.add_argument("--incremental", action="store_true",
+                        help="前回から追加・変更された行だけを反映する（同じ学者を重複して追加しない）")
+    parser.add_argument("--index", default=ingest_index_file,
+                        help=f"差分取り込みの対応表（既定: {ingest_index_file}）")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    if args.incremental:
+        # 差分取り込みでは前回の出力ファイルを更新する
+        scholars_path = args.output if os.path.exists(args.output) else args.scholars
+        stats = convert_incremental(args.excel, args.sheets, scholars_path, args.output, args.index)
+    else:
+        stats = convert(args.excel, args.sheets, args.scholars, args.output)
+    elapsed = time.perf_counter() - start_time
+
+    print("\n===== 処理結果サマリー =====")
+    print(f"シート: {stats['sheets']}")
+    print(f"読み込んだ行: {stats['rows']}")
+    print(f"追加した学者: {stats['added']}")
+    if args.incremental:
+        print(f"更新した学者: {stats['updated']}")
+        print(f"変更のなかった行: {stats['unchanged']}")
+    print(f"出力ファイル: {args.output}")
+    if elapsed > 0:
+        print(f"所要時間: {elapsed:.2f}秒（{stats['rows'] / elapsed:,.0f}行/秒）")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,21 @@
 import json
 import os
-import requests
-from bs4 import BeautifulSoup
 import time
-from openai import OpenAI
 from dotenv import load_dotenv
 
 # .envファイルから環境変数をロード
 load_dotenv()
 
-# OpenAI APIキーを環境変数から取得
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI APIクライアント（get_client() の初回の呼び出し時に環境変数のAPIキーで作成）
+_client = None
+
+def get_client():
+    """OpenAI APIクライアントを返す（openaiは使うときに読み込む）"""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
 
 def load_scholars_data(file_path):
     """Scholarデータをロードする"""
@@ -19,6 +24,9 @@ def load_scholars_data(file_path):
 
 def fetch_webpage_text(url):
     """URLからウェブページのテキストを取得する"""
+    # requests・bs4は使うときに読み込む（起動を速くするため）
+    import requests
+    from bs4 import BeautifulSoup
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -130,7 +138,7 @@ def extract_scholar_info(url, webpage_text, current_data):
         """
         
         # OpenAI APIリクエスト
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="o4-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -1,15 +1,22 @@
 import json
 import os
 import time
-from openai import OpenAI
 from dotenv import load_dotenv
 from use_mcp_tool import use_mcp_tool
 
 # .envファイルから環境変数をロード
 load_dotenv()
 
-# OpenAI APIキーを環境変数から取得
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI APIクライアント（get_client() の初回の呼び出し時に環境変数のAPIキーで作成）
+_client = None
+
+def get_client():
+    """OpenAI APIクライアントを返す（openaiは使うときに読み込む）"""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
 
 def load_scholars_data(file_path):
     """Scholarデータをロードする"""
@@ -131,7 +138,7 @@ def extract_scholar_info_from_tavily(search_results, scholar_name, current_data)
             return current_data
         
         # OpenAI APIリクエスト
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="o4-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -0,0 +1,2 @@
+// scripts/build_precache_manifest.py で生成（編集しないこと）
+self.PRECACHE_MANIFEST = {"version":"6b3fccf62c9c46c3","assets":[{"url":"index.html","hash":"fd4f12dd0f6f35e6","precache":true},{"url":"style.css","hash":"c1a699401cede974","precache":true},{"url":"gacha.js","hash":"1c6b78026868d16f","precache":true},{"url":"data/index.json","hash":"f001f32a313b9d8c","precache":true},{"url":"avatars/variants/manifest.json","hash":"08cd3ed628a63df4","precache":true},{"url":"data/details/106f38329b5956aa.json","hash":"106f38329b5956aa","precache":true},{"url":"data/details/1c5a6865479a3613.json","hash":"1c5a6865479a3613","precache":true},{"url":"data/details/78206ce776c913a3.json","hash":"78206ce776c913a3","precache":true},{"url":"data/details/84373f4d5a17c215.json","hash":"84373f4d5a17c215","precache":true},{"url":"avatars/variants/rosenbaum2025-200.avif","hash":"e18cd0ee32b758bb","precache":false},{"url":"avatars/variants/rosenbaum2025-200.webp","hash":"eb2367fd03a590f7","precache":false},{"url":"avatars/variants/rosenbaum2025-400.avif","hash":"7fc0eda8de9ad1f1","precache":false},{"url":"avatars/variants/rosenbaum2025-400.webp","hash":"b2f41f8993a675a9","precache":false},{"url":"avatars/variants/rosenbaum2025-800.avif","hash":"3aeb4d94c9e03ce3","precache":false},{"url":"avatars/variants/rosenbaum2025-800.webp","hash":"7eb38be8043ab2d0","precache":false},{"url":"avatars/variants/アイザック・ニュートン2025-200.avif","hash":"983a144fabf1d963","precache":false},{"url":"avatars/variants/アイザック・ニュートン2025-200.webp","hash":"d9d07a66979f01de","precache":false},{"url":"avatars/variants/アイザック・ニュートン2025-400.avif","hash":"0e9e816570fb864a","precache":false},{"url":"avatars/variants/アイザック・ニュートン2025-400.webp","hash":"990ba675a12cf014","precache":false},{"url":"avatars/variants/アイザック・ニュートン2025-800.avif","hash":"68283d7eb6e9a4e8","precache":false},{"url":"avatars/variants/アイザック・ニュートン2025-800.webp","hash":"6f8d5701fb4d11ba","precache":false},{"url":"avatars/variants/アドリアン＝マリ・ルジャンドル2025-200.avif","hash":"8e5c899df1f7d7b8","precache":false},{"url":"avatars/variants/アドリアン＝マリ・ルジャンドル2025-200.webp","hash":"dda6b3f4eeafaf53","precache":false},{"url":"avatars/variants/アドリアン＝マリ・ルジャンドル2025-400.avif","hash":"21720e4b47241883","precache":false},{"url":"avatars/variants/アドリアン＝マリ・ルジャンドル2025-400.webp","hash":"fe6fdfd8ee6392fa","precache":false},{"url":"avatars/variants/アドリアン＝マリ・ルジャンドル2025-800.avif","hash":"7e92f4d75ce8c32a","precache":false},{"url":"avatars/variants/アドリアン＝マリ・ルジャンドル2025-800.webp","hash":"68d4b90632957da0","precache":false},{"url":"avatars/variants/アドルフ・ケトレー2025-200.avif","hash":"6e0ff9fbf0fe0049","precache":false},{"url":"avatars/variants/アドルフ・ケトレー2025-200.webp","hash":"e4a433d040f27693","precache":false},{"url":"avatars/variants/アドルフ・ケトレー2025-400.avif","hash":"2b8556235308a2e7","precache":false},{"url":"avatars/variants/アドルフ・ケトレー2025-400.webp","hash":"e21297ee2a504c03","precache":false},{"url":"avatars/variants/アドルフ・ケトレー2025-800.avif","hash":"f720902770756f05","precache":false},{"url":"avatars/variants/アドルフ・ケトレー2025-800.webp","hash":"3e623d57a62cca9a","precache":false},{"url":"avatars/variants/アブー・ユースフ・ヤアクーブ・イブン・イスハーク・アル＝キンディー2025-200.avif","hash":"6ce8acc97b2b2646","precache":false},{"url":"avatars/variants/アブー・ユースフ・ヤアクーブ・イブン・イスハーク・アル＝キンディー2025-200.webp","hash":"24fa698de02f13dc","precache":false},{"url":"avatars/variants/アブー・ユースフ・ヤアクーブ・イブン・イスハーク・アル＝キンディー2025-400.avif","hash":"43853a26726a6635","precache":false},{"url":"avatars/variants/アブー・ユースフ・ヤアクーブ・イブン・イスハーク・アル＝キンディー2025-400.webp","hash":"99a1d2c1b75089fa","precache":false},{"url":"avatars/variants/アブー・ユースフ・ヤアクーブ・イブン・イスハーク・アル＝キンディー2025-800.avif","hash":"970baf2a2f998b68","precache":false},{"url":"avatars/variants/アブー・ユースフ・ヤアクーブ・イブン・イスハーク・アル＝キンディー2025-800.webp","hash":"0cdbc8dc58060919","precache":false},{"url":"avatars/variants/アラン・チューリング2025-200.avif","hash":"b445d521afa0ed90","precache":false},{"url":"avatars/variants/アラン・チューリング2025-200.webp","hash":"e5e8f8be271d313c","precache":false},{"url":"avatars/variants/アラン・チューリング2025-400.avif","hash":"0e967e55b0eff0b3","precache":false},{"url":"avatars/variants/アラン・チューリング2025-400.webp","hash":"cf8208169d9b7561","precache":false},{"url":"avatars/variants/アラン・チューリング2025-766.avif","hash":"91c2f914c506e135","precache":false},{"url":"avatars/variants/アラン・チューリング2025-766.webp","hash":"32d79987ce64e392","precache":false},{"url":"avatars/variants/アーチボルド・コクラン2025-200.avif","hash":"71254e21b755124a","precache":false},{"url":"avatars/variants/アーチボルド・コクラン2025-200.webp","hash":"b5e36cf161bc23a3","precache":false},{"url":"avatars/variants/アーチボルド・コクラン2025-400.avif","hash":"582cfd6cac944e87","precache":false},{"url":"avatars/variants/アーチボルド・コクラン2025-400.webp","hash":"d69faf912c6e6c0f","precache":false},{"url":"avatars/variants/アーチボルド・コクラン2025-800.avif","hash":"cffc6416a465d2d7","precache":false},{"url":"avatars/variants/アーチボルド・コクラン2025-800.webp","hash":"db2ca8ae4d462de0","precache":false},{"url":"avatars/variants/イェジ・ネイマン2025-200.avif","hash":"28875d34bc156711","precache":false},{"url":"avatars/variants/イェジ・ネイマン2025-200.webp","hash":"725a85aede25dda0","precache":false},{"url":"avatars/variants/イェジ・ネイマン2025-400.avif","hash":"74a794895f0f11bf","precache":false},{"url":"avatars/variants/イェジ・ネイマン2025-400.webp","hash":"a3095c170e2063bf","precache":false},{"url":"avatars/variants/イェジ・ネイマン2025-800.avif","hash":"3ccbebd210fd928a","precache":false},{"url":"avatars/variants/イェジ・ネイマン2025-800.webp","hash":"c41fc05f1a83206f","precache":false},{"url":"avatars/variants/イェレミア・ストラマー2025-200.avif","hash":"f48f9d4737a28692","precache":false},{"url":"avatars/variants/イェレミア・ストラマー2025-200.webp","hash":"d5176dcd869a33fd","precache":false},{"url":"avatars/variants/イェレミア・ストラマー2025-400.avif","hash":"4671b9c45641cf94","precache":false},{"url":"avatars/variants/イェレミア・ストラマー2025-400.webp","hash":"fb755607d21326ac","precache":false},{"url":"avatars/variants/イェレミア・ストラマー2025-800.avif","hash":"486ca47a6cf48406","precache":false},{"url":"avatars/variants/イェレミア・ストラマー2025-800.webp","hash":"bbe2df5a8a6bb810","precache":false},{"url":"avatars/variants/ウィリアム・ゴセット2025-200.avif","hash":"7de0ce6f30312ded","precache":false},{"url":"avatars/variants/ウィリアム・ゴセット2025-200.webp","hash":"65788b9dd4e9fdea","precache":false},{"url":"avatars/variants/ウィリアム・ゴセット2025-400.avif","hash":"7cc623d9ef88a0cc","precache":false},{"url":"avatars/variants/ウィリアム・ゴセット2025-400.webp","hash":"fff9063e1ebc4378","precache":false},{"url":"avatars/variants/ウィリアム・ゴセット2025-800.avif","hash":"e42284e1bf702174","precache":false},{"url":"avatars/variants/ウィリアム・ゴセット2025-800.webp","hash":"844c7958c6131c04","precache":false},{"url":"avatars/variants/ウィリアム・ペティ2025-200.avif","hash":"4543d682bdc0a289","precache":false},{"url":"avatars/variants/ウィリアム・ペティ2025-200.webp","hash":"9ef889011a4bd022","precache":false},{"url":"avatars/variants/ウィリアム・ペティ2025-400.avif","hash":"f5d5ba49ba6b2b8b","precache":false},{"url":"avatars/variants/ウィリアム・ペティ2025-400.webp","hash":"679362726ed0584f","precache":false},{"url":"avatars/variants/ウィリアム・ペティ2025-800.avif","hash":"b5f5f193be9b8bdf","precache":false},{"url":"avatars/variants/ウィリアム・ペティ2025-800.webp","hash":"a9eab4c73af54841","precache":false},{"url":"avatars/variants/エゴン・ピアソン2025-200.avif","hash":"94b397f3a3670481","precache":false},{"url":"avatars/variants/エゴン・ピアソン2025-200.webp","hash":"3ceed801f24e589e","precache":false},{"url":"avatars/variants/エゴン・ピアソン2025-400.avif","hash":"aaf952b97b4cf4a3","precache":false},{"url":"avatars/variants/エゴン・ピアソン2025-400.webp","hash":"fe437b4fb016fb1d","precache":false},{"url":"avatars/variants/エゴン・ピアソン2025-785.avif","hash":"8a65eff469ae7907","precache":false},{"url":"avatars/variants/エゴン・ピアソン2025-785.webp","hash":"4db120ed05aa7cf3","precache":false},{"url":"avatars/variants/エドモンド・ハレー2025-200.avif","hash":"95a3d263ce2b466c","precache":false},{"url":"avatars/variants/エドモンド・ハレー2025-200.webp","hash":"89e7daff13bb7087","precache":false},{"url":"avatars/variants/エドモンド・ハレー2025-400.avif","hash":"1b317ab7fb8253ca","precache":false},{"url":"avatars/variants/エドモンド・ハレー2025-400.webp","hash":"7234f9b56851bc02","precache":false},{"url":"avatars/variants/エドモンド・ハレー2025-800.avif","hash":"1c10e0e1995a6ab0","precache":false},{"url":"avatars/variants/エドモンド・ハレー2025-800.webp","hash":"42c896826fae3fcb","precache":false},{"url":"avatars/variants/エミール・デュルケーム2025-200.avif","hash":"5e8d89ab99c02471","precache":false},{"url":"avatars/variants/エミール・デュルケーム2025-200.webp","hash":"c934eec520cb60d9","precache":false},{"url":"avatars/variants/エミール・デュルケーム2025-400.avif","hash":"853f359bdbbbd48a","precache":false},{"url":"avatars/variants/エミール・デュルケーム2025-400.webp","hash":"a7563d42562af0bc","precache":false},{"url":"avatars/variants/エミール・デュルケーム2025-800.avif","hash":"cbe083e9dfdbcd7c","precache":false},{"url":"avatars/variants/エミール・デュルケーム2025-800.webp","hash":"467b9fd68b90350d","precache":false},{"url":"avatars/variants/カール・ピアソン2025-200.avif","hash":"a72171ca4f38f96d","precache":false},{"url":"avatars/variants/カール・ピアソン2025-200.webp","hash":"da0de78ee82a1ce9","precache":false},{"url":"avatars/variants/カール・ピアソン2025-400.avif","hash":"5af6d33707ef6f9f","precache":false},{"url":"avatars/variants/カール・ピアソン2025-400.webp","hash":"e266d1e3d521803e","precache":false},{"url":"avatars/variants/カール・ピアソン2025-800.avif","hash":"4a8120dcc155457f","precache":false},{"url":"avatars/variants/カール・ピアソン2025-800.webp","hash":"c7519cf53551e579","precache":false},{"url":"avatars/variants/カール・フリードリヒ・ガウス2025-200.avif","hash":"040649eb06efc923","precache":false},{"url":"avatars/variants/カール・フリードリヒ・ガウス2025-200.webp","hash":"a7754736d805eae5","precache":false},{"url":"avatars/variants/カール・フリードリヒ・ガウス2025-400.avif","hash":"77189089059fa0f9","precache":false},{"url":"avatars/variants/カール・フリードリヒ・ガウス2025-400.webp","hash":"6782359b0c95f540","precache":false},{"url":"avatars/variants/カール・フリードリヒ・ガウス2025-800.avif","hash":"43c22a1f0e70dd55","precache":false},{"url":"avatars/variants/カール・フリードリヒ・ガウス2025-800.webp","hash":"a5b7f3eb1279a189","precache":false},{"url":"avatars/variants/ガリレオ・ガリレイ2025-200.avif","hash":"0ac15262c64222e8","precache":false},{"url":"avatars/variants/ガリレオ・ガリレイ2025-200.webp","hash":"e4b2e3752cdbde98","precache":false},{"url":"avatars/variants/ガリレオ・ガリレイ2025-400.avif","hash":"1c14003ac81c2694","precache":false},{"url":"avatars/variants/ガリレオ・ガリレイ2025-400.webp","hash":"aff2f5fda692a6e7","precache":false},{"url":"avatars/variants/ガリレオ・ガリレイ2025-800.avif","hash":"fd84bc27d07f3391","precache":false},{"url":"avatars/variants/ガリレオ・ガリレイ2025-800.webp","hash":"e2dc8c68d8affa7a","precache":false},{"url":"avatars/variants/ケネス・ロスマン2025-200.avif","hash":"f06b7a1c5aaa59bc","precache":false},{"url":"avatars/variants/ケネス・ロスマン2025-200.webp","hash":"448d9e210d753723","precache":false},{"url":"avatars/variants/ケネス・ロスマン2025-400.avif","hash":"5e5fe031ed1050a3","precache":false},{"url":"avatars/variants/ケネス・ロスマン2025-400.webp","hash":"adbd4971a9cd8a8a","precache":false},{"url":"avatars/variants/ケネス・ロスマン2025-800.avif","hash":"8a1c520fc56905ba","precache":false},{"url":"avatars/variants/ケネス・ロスマン2025-800.webp","hash":"92814e4540779d10","precache":false},{"url":"avatars/variants/ゴードン・ガイアット2025-200.avif","hash":"a9b63de5211ff94b","precache":false},{"url":"avatars/variants/ゴードン・ガイアット2025-200.webp","hash":"bb8c33ca595bf003","precache":false},{"url":"avatars/variants/ゴードン・ガイアット2025-400.avif","hash":"7ec6f3f6e6fc0e03","precache":false},{"url":"avatars/variants/ゴードン・ガイアット2025-400.webp","hash":"d5d2bb14e6297517","precache":false},{"url":"avatars/variants/ゴードン・ガイアット2025-800.avif","hash":"7c8ad1f48085362e","precache":false},{"url":"avatars/variants/ゴードン・ガイアット2025-800.webp","hash":"7e89b45f0e473991","precache":false},{"url":"avatars/variants/サンダー・グリーンランド2025-200.avif","hash":"3f9cbdfbd4697079","precache":false},{"url":"avatars/variants/サンダー・グリーンランド2025-200.webp","hash":"991ea118eae13bfe","precache":false},{"url":"avatars/variants/サンダー・グリーンランド2025-400.avif","hash":"c4802fe98a86095c","precache":false},{"url":"avatars/variants/サンダー・グリーンランド2025-400.webp","hash":"522161bab3526ca7","precache":false},{"url":"avatars/variants/サンダー・グリーンランド2025-800.avif","hash":"570cf0b04d8b3c55","precache":false},{"url":"avatars/variants/サンダー・グリーンランド2025-800.webp","hash":"4f36c738644cd6ce","precache":false},{"url":"avatars/variants/ジェロラモ・カルダノ2025-200.avif","hash":"68aa3fdec2c83725","precache":false},{"url":"avatars/variants/ジェロラモ・カルダノ2025-200.webp","hash":"a8884a8eacff8eba","precache":false},{"url":"avatars/variants/ジェロラモ・カルダノ2025-400.avif","hash":"f5c5aa419715f2f4","precache":false},{"url":"avatars/variants/ジェロラモ・カルダノ2025-400.webp","hash":"301a889620c24952","precache":false},{"url":"avatars/variants/ジェロラモ・カルダノ2025-800.avif","hash":"2b221ac3d8cffef4","precache":false},{"url":"avatars/variants/ジェロラモ・カルダノ2025-800.webp","hash":"9fc9a378f8a7c68f","precache":false},{"url":"avatars/variants/ジェームス・リンド2025-200.avif","hash":"dfec810e350be934","precache":false},{"url":"avatars/variants/ジェームス・リンド2025-200.webp","hash":"c63e9b9045724235","precache":false},{"url":"avatars/variants/ジェームス・リンド2025-400.avif","hash":"f994df77995a0866","precache":false},{"url":"avatars/variants/ジェームス・リンド2025-400.webp","hash":"e52e27139a143b19","precache":false},{"url":"avatars/variants/ジェームス・リンド2025-800.avif","hash":"56076cd210c6c721","precache":false},{"url":"avatars/variants/ジェームス・リンド2025-800.webp","hash":"e1684663834fc805","precache":false},{"url":"avatars/variants/ジェームス・ロビンス2025-200.avif","hash":"fcb6b3689e4686a4","precache":false},{"url":"avatars/variants/ジェームス・ロビンス2025-200.webp","hash":"0f6524800f0fa008","precache":false},{"url":"avatars/variants/ジェームス・ロビンス2025-400.avif","hash":"f11d2ecf2ac05e74","precache":false},{"url":"avatars/variants/ジェームス・ロビンス2025-400.webp","hash":"9495eaaa89cb0b76","precache":false},{"url":"avatars/variants/ジェームス・ロビンス2025-800.avif","hash":"36898a25ed77c773","precache":false},{"url":"avatars/variants/ジェームス・ロビンス2025-800.webp","hash":"43e94c348202ee4a","precache":false},{"url":"avatars/variants/ジョセフ＝ルイ・ラグランジュ2025-200.avif","hash":"a129e32986fcfead","precache":false},{"url":"avatars/variants/ジョセフ＝ルイ・ラグランジュ2025-200.webp","hash":"4edae7b4b75a17f8","precache":false},{"url":"avatars/variants/ジョセフ＝ルイ・ラグランジュ2025-400.avif","hash":"b8fb4e54e912c1f2","precache":false},{"url":"avatars/variants/ジョセフ＝ルイ・ラグランジュ2025-400.webp","hash":"fbc06580c1c805f4","precache":false},{"url":"avatars/variants/ジョセフ＝ルイ・ラグランジュ2025-800.avif","hash":"c72a48dd151378a9","precache":false},{"url":"avatars/variants/ジョセフ＝ルイ・ラグランジュ2025-800.webp","hash":"b2cb6d0996396367","precache":false},{"url":"avatars/variants/ジョン・グラント2025-200.avif","hash":"50d3db3fb721e91e","precache":false},{"url":"avatars/variants/ジョン・グラント2025-200.webp","hash":"dd3d18086c902476","precache":false},{"url":"avatars/variants/ジョン・グラント2025-400.avif","hash":"7c6580d7ae579b9e","precache":false},{"url":"avatars/variants/ジョン・グラント2025-400.webp","hash":"9644c31f846291aa","precache":false},{"url":"avatars/variants/ジョン・グラント2025-800.avif","hash":"43154ed54c13d5c6","precache":false},{"url":"avatars/variants/ジョン・グラント2025-800.webp","hash":"4f1e5b2d7db38ec2","precache":false},{"url":"avatars/variants/ジョン・スノー2025-200.avif","hash":"3d9ff57e0545ab22","precache":false},{"url":"avatars/variants/ジョン・スノー2025-200.webp","hash":"b86e517397c31469","precache":false},{"url":"avatars/variants/ジョン・スノー2025-400.avif","hash":"b476d49594b8e35d","precache":false},{"url":"avatars/variants/ジョン・スノー2025-400.webp","hash":"7ba52dfa4fdd8094","precache":false},{"url":"avatars/variants/ジョン・スノー2025-800.avif","hash":"d493c28138f30183","precache":false},{"url":"avatars/variants/ジョン・スノー2025-800.webp","hash":"6766588f131d72b8","precache":false},{"url":"avatars/variants/ジョン・テューキー2025-200.avif","hash":"766c06e9e8ddb2bc","precache":false},{"url":"avatars/variants/ジョン・テューキー2025-200.webp","hash":"b374a21dac051254","precache":false},{"url":"avatars/variants/ジョン・テューキー2025-400.avif","hash":"2b2540f60896351b","precache":false},{"url":"avatars/variants/ジョン・テューキー2025-400.webp","hash":"2c94448ae19c24df","precache":false},{"url":"avatars/variants/ジョン・テューキー2025-800.avif","hash":"a1a0825dd949b7da","precache":false},{"url":"avatars/variants/ジョン・テューキー2025-800.webp","hash":"186ffeea934c7877","precache":false},{"url":"avatars/variants/ジョン・ハンター2025-200.avif","hash":"8b9dde945ee79f95","precache":false},{"url":"avatars/variants/ジョン・ハンター2025-200.webp","hash":"a862c5f6c494a8d2","precache":false},{"url":"avatars/variants/ジョン・ハンター2025-400.avif","hash":"d2e14a251a381007","precache":false},{"url":"avatars/variants/ジョン・ハンター2025-400.webp","hash":"89903f010d399f2e","precache":false},{"url":"avatars/variants/ジョン・ハンター2025-800.avif","hash":"8083420519382a96","precache":false},{"url":"avatars/variants/ジョン・ハンター2025-800.webp","hash":"0c1b722cb8f2ad31","precache":false},{"url":"avatars/variants/ジョン・ポール2025-200.avif","hash":"7ebb0e798220f0ca","precache":false},{"url":"avatars/variants/ジョン・ポール2025-200.webp","hash":"fe98e564ebe4a0a0","precache":false},{"url":"avatars/variants/ジョン・ポール2025-400.avif","hash":"b977bb2b9f1f1561","precache":false},{"url":"avatars/variants/ジョン・ポール2025-400.webp","hash":"bde4d6866af4d395","precache":false},{"url":"avatars/variants/ジョン・ポール2025-800.avif","hash":"9c097843da0c52b3","precache":false},{"url":"avatars/variants/ジョン・ポール2025-800.webp","hash":"0420fae4725f0783","precache":false},{"url":"avatars/variants/スタニスワフ・ウラム2025-200.avif","hash":"b934e79ab6df3731","precache":false},{"url":"avatars/variants/スタニスワフ・ウラム2025-200.webp","hash":"3e4e3d80dd41bfb5","precache":false},{"url":"avatars/variants/スタニスワフ・ウラム2025-400.avif","hash":"40231ca687d343f4","precache":false},{"url":"avatars/variants/スタニスワフ・ウラム2025-400.webp","hash":"75967e3bdfb8b29a","precache":false},{"url":"avatars/variants/スタニスワフ・ウラム2025-785.avif","hash":"bb46677cec78ea00","precache":false},{"url":"avatars/variants/スタニスワフ・ウラム2025-785.webp","hash":"3b9dbc9d24253884","precache":false},{"url":"avatars/variants/ダグラス・アルトマン2025-200.avif","hash":"d6307800f8bd2b15","precache":false},{"url":"avatars/variants/ダグラス・アルトマン2025-200.webp","hash":"bb12e58c8f938269","precache":false},{"url":"avatars/variants/ダグラス・アルトマン2025-400.avif","hash":"165f3ef5a3d8e1af","precache":false},{"url":"avatars/variants/ダグラス・アルトマン2025-400.webp","hash":"74e640632295f936","precache":false},{"url":"avatars/variants/ダグラス・アルトマン2025-800.avif","hash":"38a41e0ade064e20","precache":false},{"url":"avatars/variants/ダグラス・アルトマン2025-800.webp","hash":"ef33a6ef2d0c5d10","precache":false},{"url":"avatars/variants/ダニエル・ベルヌーイ2025-200.avif","hash":"3a92e39038354606","precache":false},{"url":"avatars/variants/ダニエル・ベルヌーイ2025-200.webp","hash":"cbda52592500f0ad","precache":false},{"url":"avatars/variants/ダニエル・ベルヌーイ2025-400.avif","hash":"00cc6bd939a72aec","precache":false},{"url":"avatars/variants/ダニエル・ベルヌーイ2025-400.webp","hash":"d6b6e4b882b3b4f7","precache":false},{"url":"avatars/variants/ダニエル・ベルヌーイ2025-800.avif","hash":"c48745ed76cbbd54","precache":false},{"url":"avatars/variants/ダニエル・ベルヌーイ2025-800.webp","hash":"bb2e32d09dd38235","precache":false},{"url":"avatars/variants/チャールズ・スピアマン2025-200.avif","hash":"1758a5c20742fcf6","precache":false},{"url":"avatars/variants/チャールズ・スピアマン2025-200.webp","hash":"51934d2485e22376","precache":false},{"url":"avatars/variants/チャールズ・スピアマン2025-400.avif","hash":"0bff85e7c4d3cfb2","precache":false},{"url":"avatars/variants/チャールズ・スピアマン2025-400.webp","hash":"4f8b563f521d1c94","precache":false},{"url":"avatars/variants/チャールズ・スピアマン2025-800.avif","hash":"4f7ecd121b55e796","precache":false},{"url":"avatars/variants/チャールズ・スピアマン2025-800.webp","hash":"79c9737d7ac089c9","precache":false},{"url":"avatars/variants/ディビッド・サケット2025-200.avif","hash":"0d2eb1b5b4f5877b","precache":false},{"url":"avatars/variants/ディビッド・サケット2025-200.webp","hash":"aa508c1eb9b2d4c8","precache":false},{"url":"avatars/variants/ディビッド・サケット2025-400.avif","hash":"a031309451b57ee2","precache":false},{"url":"avatars/variants/ディビッド・サケット2025-400.webp","hash":"699240dd89aa86fa","precache":false},{"url":"avatars/variants/ディビッド・サケット2025-800.avif","hash":"6652f6e0077b4472","precache":false},{"url":"avatars/variants/ディビッド・サケット2025-800.webp","hash":"8a354527e8b2b815","precache":false},{"url":"avatars/variants/デビッド・コックス2025-200.avif","hash":"90fc8e07282ddd91","precache":false},{"url":"avatars/variants/デビッド・コックス2025-200.webp","hash":"c7cb77817ec9e7c7","precache":false},{"url":"avatars/variants/デビッド・コックス2025-400.avif","hash":"610913ef1bd966fd","precache":false},{"url":"avatars/variants/デビッド・コックス2025-400.webp","hash":"303f3bef2ca6b8c3","precache":false},{"url":"avatars/variants/デビッド・コックス2025-800.avif","hash":"4ab44d53ff445ea1","precache":false},{"url":"avatars/variants/デビッド・コックス2025-800.webp","hash":"eb1b11fe9428a711","precache":false},{"url":"avatars/variants/トーマス・ベイズ2025-200.avif","hash":"f74d64a8c81eaf04","precache":false},{"url":"avatars/variants/トーマス・ベイズ2025-200.webp","hash":"adec75f31dd58258","precache":false},{"url":"avatars/variants/トーマス・ベイズ2025-400.avif","hash":"6ef11ecfcc9672ba","precache":false},{"url":"avatars/variants/トーマス・ベイズ2025-400.webp","hash":"c95d6e0ab9853974","precache":false},{"url":"avatars/variants/トーマス・ベイズ2025-800.avif","hash":"0102676cbb952b8f","precache":false},{"url":"avatars/variants/トーマス・ベイズ2025-800.webp","hash":"c514ba294cf20a75","precache":false},{"url":"avatars/variants/ドナルド・ベルウィック2025-200.avif","hash":"05cb6a0887453722","precache":false},{"url":"avatars/variants/ドナルド・ベルウィック2025-200.webp","hash":"97edec5157bb1d0d","precache":false},{"url":"avatars/variants/ドナルド・ベルウィック2025-400.avif","hash":"4f3af0ade4bff919","precache":false},{"url":"avatars/variants/ドナルド・ベルウィック2025-400.webp","hash":"dfedc9f32f201ba0","precache":false},{"url":"avatars/variants/ドナルド・ベルウィック2025-800.avif","hash":"f568bbfc3942de1f","precache":false},{"url":"avatars/variants/ドナルド・ベルウィック2025-800.webp","hash":"4e698cf567c61988","precache":false},{"url":"avatars/variants/ドナルド・ルビン2025-200.avif","hash":"afe9e6b62dd1a6ad","precache":false},{"url":"avatars/variants/ドナルド・ルビン2025-200.webp","hash":"b80f43de5635be05","precache":false},{"url":"avatars/variants/ドナルド・ルビン2025-400.avif","hash":"0c38af22c1ee77c4","precache":false},{"url":"avatars/variants/ドナルド・ルビン2025-400.webp","hash":"638b553667f373ad","precache":false},{"url":"avatars/variants/ドナルド・ルビン2025-800.avif","hash":"8753ea34ad058913","precache":false},{"url":"avatars/variants/ドナルド・ルビン2025-800.webp","hash":"07767e2a5f3601e9","precache":false},{"url":"avatars/variants/ピエール・ド・フェルマー2025-200.avif","hash":"565ac2c45b24b582","precache":false},{"url":"avatars/variants/ピエール・ド・フェルマー2025-200.webp","hash":"b7836d7bed7e271d","precache":false},{"url":"avatars/variants/ピエール・ド・フェルマー2025-400.avif","hash":"f4d283e24435a318","precache":false},{"url":"avatars/variants/ピエール・ド・フェルマー2025-400.webp","hash":"2c1e04d3c99db894","precache":false},{"url":"avatars/variants/ピエール・ド・フェルマー2025-800.avif","hash":"c5898a23849b7586","precache":false},{"url":"avatars/variants/ピエール・ド・フェルマー2025-800.webp","hash":"b37f71cbf894b950","precache":false},{"url":"avatars/variants/ピエール＝シモン・ラプラス2025-200.avif","hash":"713039905b3e1803","precache":false},{"url":"avatars/variants/ピエール＝シモン・ラプラス2025-200.webp","hash":"7bc9d231301cc432","precache":false},{"url":"avatars/variants/ピエール＝シモン・ラプラス2025-400.avif","hash":"a3e55da53474a158","precache":false},{"url":"avatars/variants/ピエール＝シモン・ラプラス2025-400.webp","hash":"98847b0949f4dfee","precache":false},{"url":"avatars/variants/ピエール＝シモン・ラプラス2025-800.avif","hash":"1b053754f0a2b739","precache":false},{"url":"avatars/variants/ピエール＝シモン・ラプラス2025-800.webp","hash":"b97b7a78dc3a9791","precache":false},{"url":"avatars/variants/ピーター・アーミテージ2025-200.avif","hash":"8bf2a1ea9d6931b4","precache":false},{"url":"avatars/variants/ピーター・アーミテージ2025-200.webp","hash":"47726ce649c2ea0d","precache":false},{"url":"avatars/variants/ピーター・アーミテージ2025-400.avif","hash":"33ecb41546b90eef","precache":false},{"url":"avatars/variants/ピーター・アーミテージ2025-400.webp","hash":"423c902839c13a8b","precache":false},{"url":"avatars/variants/ピーター・アーミテージ2025-800.avif","hash":"d47e04c6837fa392","precache":false},{"url":"avatars/variants/ピーター・アーミテージ2025-800.webp","hash":"764cec8476d72dda","precache":false},{"url":"avatars/variants/フアン・カラムエル・イ・ロブコヴィッツ2025-200.avif","hash":"af6aa3221b9d182a","precache":false},{"url":"avatars/variants/フアン・カラムエル・イ・ロブコヴィッツ2025-200.webp","hash":"3754b82a7541b5c8","precache":false},{"url":"avatars/variants/フアン・カラムエル・イ・ロブコヴィッツ2025-400.avif","hash":"4e6a7962d3dd0f06","precache":false},{"url":"avatars/variants/フアン・カラムエル・イ・ロブコヴィッツ2025-400.webp","hash":"5fcd64f8bbd2f81a","precache":false},{"url":"avatars/variants/フアン・カラムエル・イ・ロブコヴィッツ2025-800.avif","hash":"b278d4eac2a14443","precache":false},{"url":"avatars/variants/フアン・カラムエル・イ・ロブコヴィッツ2025-800.webp","hash":"8d7b7f839ff0555d","precache":false},{"url":"avatars/variants/フランシス・ゴルトン2025-200.avif","hash":"9cadbac2d4161a87","precache":false},{"url":"avatars/variants/フランシス・ゴルトン2025-200.webp","hash":"3738143fab1e120c","precache":false},{"url":"avatars/variants/フランシス・ゴルトン2025-400.avif","hash":"269bd4aff81e02a4","precache":false},{"url":"avatars/variants/フランシス・ゴルトン2025-400.webp","hash":"9aaa8853b575568c","precache":false},{"url":"avatars/variants/フランシス・ゴルトン2025-800.avif","hash":"dccb8d7f6fdd0851","precache":false},{"url":"avatars/variants/フランシス・ゴルトン2025-800.webp","hash":"bc16dd7042f46a5c","precache":false},{"url":"avatars/variants/フローレンス・ナイチンゲール2025-200.avif","hash":"496ded3eebf433c6","precache":false},{"url":"avatars/variants/フローレンス・ナイチンゲール2025-200.webp","hash":"b21e341b53fcf8bd","precache":false},{"url":"avatars/variants/フローレンス・ナイチンゲール2025-400.avif","hash":"03eb29d6e52623d0","precache":false},{"url":"avatars/variants/フローレンス・ナイチンゲール2025-400.webp","hash":"b70d60db1df00a65","precache":false},{"url":"avatars/variants/フローレンス・ナイチンゲール2025-800.avif","hash":"76508b7559d82d00","precache":false},{"url":"avatars/variants/フローレンス・ナイチンゲール2025-800.webp","hash":"7cc9f6e1ff37d8c7","precache":false},{"url":"avatars/variants/ブレーズ・パスカル2025-200.avif","hash":"c883942954802702","precache":false},{"url":"avatars/variants/ブレーズ・パスカル2025-200.webp","hash":"a90dba31fcbddff5","precache":false},{"url":"avatars/variants/ブレーズ・パスカル2025-400.avif","hash":"358b68456e4ddcee","precache":false},{"url":"avatars/variants/ブレーズ・パスカル2025-400.webp","hash":"35574a7e5eeea71a","precache":false},{"url":"avatars/variants/ブレーズ・パスカル2025-800.avif","hash":"8c5f5ca2e146189a","precache":false},{"url":"avatars/variants/ブレーズ・パスカル2025-800.webp","hash":"a6274ebcbd0037d8","precache":false},{"url":"avatars/variants/マチアス・エッガー2025-200.avif","hash":"8d8a60e68be07d31","precache":false},{"url":"avatars/variants/マチアス・エッガー2025-200.webp","hash":"47f92f70899f9969","precache":false},{"url":"avatars/variants/マチアス・エッガー2025-400.avif","hash":"36bfb6a4d87de63f","precache":false},{"url":"avatars/variants/マチアス・エッガー2025-400.webp","hash":"577190053af85b21","precache":false},{"url":"avatars/variants/マチアス・エッガー2025-722.avif","hash":"51dcbf4b6e36ccee","precache":false},{"url":"avatars/variants/マチアス・エッガー2025-722.webp","hash":"6ddc9d9e5275339e","precache":false},{"url":"avatars/variants/ユリアン・ヒギンズ2025-200.avif","hash":"5bc0d56673770ca5","precache":false},{"url":"avatars/variants/ユリアン・ヒギンズ2025-200.webp","hash":"882a9cf74b5b5783","precache":false},{"url":"avatars/variants/ユリアン・ヒギンズ2025-400.avif","hash":"52007f618df67340","precache":false},{"url":"avatars/variants/ユリアン・ヒギンズ2025-400.webp","hash":"9d42bb5569abcd32","precache":false},{"url":"avatars/variants/ユリアン・ヒギンズ2025-800.avif","hash":"1793a25e32f6a55b","precache":false},{"url":"avatars/variants/ユリアン・ヒギンズ2025-800.webp","hash":"f64f2e0200aee270","precache":false},{"url":"avatars/variants/レオンハルト・オイラー2025-200.avif","hash":"70efccb198fa7c08","precache":false},{"url":"avatars/variants/レオンハルト・オイラー2025-200.webp","hash":"7fcc34757ac024b2","precache":false},{"url":"avatars/variants/レオンハルト・オイラー2025-400.avif","hash":"d81668c136d86170","precache":false},{"url":"avatars/variants/レオンハルト・オイラー2025-400.webp","hash":"80e131d46514fdd0","precache":false},{"url":"avatars/variants/レオンハルト・オイラー2025-800.avif","hash":"90a91d1cba971637","precache":false},{"url":"avatars/variants/レオンハルト・オイラー2025-800.webp","hash":"3a5bf1afeb225002","precache":false},{"url":"avatars/variants/ロナルド・フィッシャー2025-200.avif","hash":"c6275f6481eef754","precache":false},{"url":"avatars/variants/ロナルド・フィッシャー2025-200.webp","hash":"fc5572b926d4d272","precache":false},{"url":"avatars/variants/ロナルド・フィッシャー2025-400.avif","hash":"b33de24756ed71c7","precache":false},{"url":"avatars/variants/ロナルド・フィッシャー2025-400.webp","hash":"96cd3a150ab5af81","precache":false},{"url":"avatars/variants/ロナルド・フィッシャー2025-800.avif","hash":"857bf3afbb17cf61","precache":false},{"url":"avatars/variants/ロナルド・フィッシャー2025-800.webp","hash":"5d7b90a9c911e2f2","precache":false},{"url":"avatars/variants/原敬2025-200.avif","hash":"c8d633ac46d44f3c","precache":false},{"url":"avatars/variants/原敬2025-200.webp","hash":"e386c29c759cf6c2","precache":false},{"url":"avatars/variants/原敬2025-400.avif","hash":"e7e5357c57905ab9","precache":false},{"url":"avatars/variants/原敬2025-400.webp","hash":"940fe292508223ce","precache":false},{"url":"avatars/variants/原敬2025-800.avif","hash":"5955bf96434417a4","precache":false},{"url":"avatars/variants/原敬2025-800.webp","hash":"20a417555926b9a4","precache":false},{"url":"avatars/variants/大隈重信2025-200.avif","hash":"9c00b7e26404684f","precache":false},{"url":"avatars/variants/大隈重信2025-200.webp","hash":"24cc81f44223efe1","precache":false},{"url":"avatars/variants/大隈重信2025-400.avif","hash":"407cdf66d94f9108","precache":false},{"url":"avatars/variants/大隈重信2025-400.webp","hash":"fd694e2806a22825","precache":false},{"url":"avatars/variants/大隈重信2025-800.avif","hash":"b2c56b6807bbabfd","precache":false},{"url":"avatars/variants/大隈重信2025-800.webp","hash":"44b2e845f0f5fb57","precache":false},{"url":"avatars/variants/杉亨二2025-200.avif","hash":"ed4b0d2e87e223ce","precache":false},{"url":"avatars/variants/杉亨二2025-200.webp","hash":"fa63325006eb3bc9","precache":false},{"url":"avatars/variants/杉亨二2025-400.avif","hash":"239d26c57f930f04","precache":false},{"url":"avatars/variants/杉亨二2025-400.webp","hash":"cd96453ae2b6575d","precache":false},{"url":"avatars/variants/杉亨二2025-800.avif","hash":"85edb5ae973789ee","precache":false},{"url":"avatars/variants/杉亨二2025-800.webp","hash":"ed5d5f9a514aa97c","precache":false},{"url":"avatars/variants/森鴎外2025-200.avif","hash":"a1a36d49f351f59b","precache":false},{"url":"avatars/variants/森鴎外2025-200.webp","hash":"34c2006e6d0b0762","precache":false},{"url":"avatars/variants/森鴎外2025-400.avif","hash":"73eaba0c544c04d0","precache":false},{"url":"avatars/variants/森鴎外2025-400.webp","hash":"23be3c50ee1c71ee","precache":false},{"url":"avatars/variants/森鴎外2025-800.avif","hash":"118e9217c14ac460","precache":false},{"url":"avatars/variants/森鴎外2025-800.webp","hash":"8b44025d1b7fec54","precache":false},{"url":"avatars/variants/田口玄一2025-200.avif","hash":"4b503fb9464057bc","precache":false},{"url":"avatars/variants/田口玄一2025-200.webp","hash":"d70245fb28ab4dfe","precache":false},{"url":"avatars/variants/田口玄一2025-400.avif","hash":"a55974b47494ae4b","precache":false},{"url":"avatars/variants/田口玄一2025-400.webp","hash":"918d20f594c001f6","precache":false},{"url":"avatars/variants/田口玄一2025-800.avif","hash":"c79c03b1a4299f54","precache":false},{"url":"avatars/variants/田口玄一2025-800.webp","hash":"aaf09f2562e3f6e7","precache":false},{"url":"avatars/variants/福沢諭吉2025-200.avif","hash":"8af604de8cd9ae6d","precache":false},{"url":"avatars/variants/福沢諭吉2025-200.webp","hash":"b89012f504b71fdd","precache":false},{"url":"avatars/variants/福沢諭吉2025-400.avif","hash":"d5b3dcc25a2f206b","precache":false},{"url":"avatars/variants/福沢諭吉2025-400.webp","hash":"6fc0da601bdda77c","precache":false},{"url":"avatars/variants/福沢諭吉2025-800.avif","hash":"cab6f1337a21464a","precache":false},{"url":"avatars/variants/福沢諭吉2025-800.webp","hash":"833df095edbc304f","precache":false},{"url":"avatars/variants/赤池2025-200.avif","hash":"c09aa2093a4b4fe4","precache":false},{"url":"avatars/variants/赤池2025-200.webp","hash":"c2b9a89b1a6eaa72","precache":false},{"url":"avatars/variants/赤池2025-400.avif","hash":"9e109e07b03a2e3b","precache":false},{"url":"avatars/variants/赤池2025-400.webp","hash":"4a8ec9ff1401f2be","precache":false},{"url":"avatars/variants/赤池2025-800.avif","hash":"e419383b79059ac3","precache":false},{"url":"avatars/variants/赤池2025-800.webp","hash":"b53816bcaee07ed0","precache":false},{"url":"avatars/variants/高木兼寛2025-200.avif","hash":"a7567fd6c838d769","precache":false},{"url":"avatars/variants/高木兼寛2025-200.webp","hash":"feb553774b7001f9","precache":false},{"url":"avatars/variants/高木兼寛2025-400.avif","hash":"6e7963abc8e9143c","precache":false},{"url":"avatars/variants/高木兼寛2025-400.webp","hash":"2237664ffd36ae4e","precache":false},{"url":"avatars/variants/高木兼寛2025-800.avif","hash":"7c13ac90cda68e57","precache":false},{"url":"avatars/variants/高木兼寛2025-800.webp","hash":"c3060d28700f8b20","precache":false}]};
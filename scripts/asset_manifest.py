@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+"""
+アバター関連ファイルのアセットマニフェスト（avatars/assets.db）
+
+学者IDごとに、参照画像・手動参照画像・アバター画像・バリアントのファイル情報
+（パス・SHA-256・サイズ・幅・高さ・更新時刻）を記録する。
+各スクリプトはファイルを書き込んだときに record_asset() で該当エントリだけを更新し、
+「どの学者のアバターがないか・古いか」はディレクトリを走査せずにマニフェストの参照で判定する。
+
+マニフェストはSQLite（WALモード）に保持し、ファイル1つごとのupsertで更新する。
+マニフェスト全体を書き直さないため、生成スクリプト・ジョブキュー・取り込みを
+複数プロセスで同時に実行しても、互いの更新を上書きしない。
+
+reference_photos/ に手動で追加した画像など、スクリプト外で変更されたファイルは
+refresh() （または --rebuild）で取り込む。更新時刻とサイズが変わっていない
+ファイルはハッシュを再計算しない。
+
+使い方:
+python scripts/asset_manifest.py --rebuild   # ディレクトリを走査してマニフェストを更新
+python scripts/asset_manifest.py --missing   # 参照画像はあるがアバターがない学者を表示
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lazy_import import lazy_import
+
+# 画像の大きさを調べるときだけ読み込む
+Image = lazy_import("PIL.Image")
+
+# アバター画像・ダウンロードした参照画像のディレクトリ
+AVATAR_DIR = Path("avatars")
+
+# 手動で追加した参照画像のディレクトリ
+REF_DIR = Path("reference_photos")
+
+# バリアントのマニフェスト（scripts/build_avatar_variants.pyが出力）
+VARIANT_MANIFEST = AVATAR_DIR / "variants" / "manifest.json"
+
+# アセットマニフェスト（SQLite）
+MANIFEST_DB = AVATAR_DIR / "assets.db"
+
+# 参照画像として扱う拡張子（優先順）
+REFERENCE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
+
+# ファイルの種類
+AVATAR = "avatar"
+REFERENCE = "reference"
+MANUAL_REFERENCE = "manual_reference"
+VARIANTS = "variants"
+
+# ダウンロードした参照画像のファイル名（{id}_reference.{ext}）
+_REFERENCE_NAME = re.compile(r'(.+)_reference\.([^.]+)$')
+
+# 他プロセスが書き込み中の場合に待機する最大秒数
+BUSY_TIMEOUT = 30
+
+# ファイル情報の列（describe_file() の戻り値のキー）
+ASSET_COLUMNS = ("path", "sha256", "size", "width", "height", "mtime")
+
+# スレッドごとの接続
+_local = threading.local()
+
+def file_sha256(path):
+    """ファイルのSHA-256ハッシュを計算"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def describe_file(path, previous=None):
+    """ファイルの情報を取得（更新時刻とサイズが前回と同じならハッシュと寸法を再利用）"""
+    path = Path(path)
+    stat = path.stat()
+    if previous and previous.get("mtime") == stat.st_mtime_ns and previous.get("size") == stat.st_size:
+        return dict(previous, path=path.as_posix())
+
+    width = height = None
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+    except Exception:
+        pass
+    return {
+        "path": path.as_posix(),
+        "sha256": file_sha256(path),
+        "size": stat.st_size,
+        "width": width,
+        "height": height,
+        "mtime": stat.st_mtime_ns,
+    }
+
+def _connect():
+    """スレッドごとのSQLite接続を取得（初回はテーブルを作成）"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    MANIFEST_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(MANIFEST_DB, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # position: バリアントの並び順（バリアント以外は0）
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS assets (
+            scholar_id TEXT,
+            kind TEXT,
+            position INTEGER,
+            path TEXT,
+            sha256 TEXT,
+            size INTEGER,
+            width INTEGER,
+            height INTEGER,
+            mtime INTEGER,
+            PRIMARY KEY (scholar_id, kind, position)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_assets_path ON assets (path)")
+    _local.conn = conn
+    return conn
+
+def _to_manifest(rows):
+    """assets テーブルの行を 学者ID -> {種類: ファイル情報} に変換"""
+    manifest = {}
+    for row in rows:
+        asset = {column: row[column] for column in ASSET_COLUMNS}
+        assets = manifest.setdefault(row["scholar_id"], {})
+        if row["kind"] == VARIANTS:
+            assets.setdefault(VARIANTS, []).append(asset)
+        else:
+            assets[row["kind"]] = asset
+    return manifest
+
+def _write(removals=(), assets=()):
+    """ファイル情報の削除と書き込みを1トランザクションで行う
+
+    removals: (学者ID, 種類) のリスト（種類がNoneの場合は学者のすべてのファイル）
+    assets: (学者ID, 種類, 並び順, ファイル情報) のリスト
+    """
+    rows = [
+        (scholar_id, kind, position, *(asset[column] for column in ASSET_COLUMNS))
+        for scholar_id, kind, position, asset in assets
+    ]
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("DELETE FROM assets WHERE scholar_id = ? AND kind = coalesce(?, kind)", removals)
+        conn.executemany("""
+            INSERT INTO assets (scholar_id, kind, position, path, sha256, size, width, height, mtime)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(scholar_id, kind, position) DO UPDATE SET
+                path = excluded.path,
+                sha256 = excluded.sha256,
+                size = excluded.size,
+                width = excluded.width,
+                height = excluded.height,
+                mtime = excluded.mtime
+        """, rows)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+def load():
+    """マニフェストを読み込む（学者ID -> {種類: ファイル情報}）"""
+    rows = _connect().execute("SELECT * FROM assets ORDER BY scholar_id, kind, position")
+    return _to_manifest(rows)
+
+def get_assets(scholar_id):
+    """学者のファイル情報をまとめて取得（{種類: ファイル情報}）"""
+    rows = _connect().execute("SELECT * FROM assets WHERE scholar_id = ? ORDER BY kind, position", (scholar_id,))
+    return _to_manifest(rows).get(scholar_id, {})
+
+def get_asset(scholar_id, kind):
+    """学者の指定した種類のファイル情報を取得（ない場合はNone）"""
+    return get_assets(scholar_id).get(kind)
+
+def get_path(scholar_id, kind):
+    """学者の指定した種類のファイルのパスを取得（ない場合はNone）"""
+    asset = get_asset(scholar_id, kind)
+    return Path(asset["path"]) if asset else None
+
+def find_reference(scholar_id):
+    """学者の参照画像のパス（手動参照画像を優先）"""
+    return get_path(scholar_id, MANUAL_REFERENCE) or get_path(scholar_id, REFERENCE)
+
+def _describe(path, previous):
+    """ファイルの情報を取得（前回の記録が同じパスならハッシュの再利用に使う）"""
+    if previous and previous.get("path") != Path(path).as_posix():
+        previous = None
+    return describe_file(path, previous)
+
+def _describe_variants(paths, previous):
+    """バリアントのファイル情報を取得（前回の記録のうち同じパスのものを再利用に使う）"""
+    previous = {v["path"]: v for v in previous or []}
+    return [describe_file(p, previous.get(Path(p).as_posix())) for p in paths]
+
+def record_asset(scholar_id, kind, path):
+    """書き込んだファイルの情報をマニフェストに記録（該当する行だけを更新）"""
+    asset = _describe(path, get_asset(scholar_id, kind))
+    _write(assets=[(scholar_id, kind, 0, asset)])
+    return asset
+
+def record_variants(scholar_id, paths):
+    """アバターのバリアントの情報をマニフェストに記録"""
+    variants = _describe_variants(paths, get_asset(scholar_id, VARIANTS))
+    _write(removals=[(scholar_id, VARIANTS)],
+           assets=[(scholar_id, VARIANTS, position, v) for position, v in enumerate(variants)])
+    return variants
+
+def remove_asset(scholar_id, kind):
+    """削除したファイルの情報をマニフェストから除く"""
+    _write(removals=[(scholar_id, kind)])
+
+def cached_sha256(path):
+    """ファイルのSHA-256（マニフェストの記録が最新ならそれを使う）"""
+    path = Path(path)
+    stat = path.stat()
+    row = _connect().execute(
+        "SELECT sha256 FROM assets WHERE path = ? AND mtime = ? AND size = ? LIMIT 1",
+        (path.as_posix(), stat.st_mtime_ns, stat.st_size),
+    ).fetchone()
+    return row["sha256"] if row else file_sha256(path)
+
+def _scan():
+    """ディレクトリを走査して学者ID -> {種類: パス} を作成"""
+    found = {}
+
+    if AVATAR_DIR.exists():
+        for entry in os.scandir(AVATAR_DIR):
+            if not entry.is_file():
+                continue
+            match = _REFERENCE_NAME.match(entry.name)
+            if match:
+                scholar_id, ext = match.group(1), f".{match.group(2).lower()}"
+                if ext not in REFERENCE_EXTENSIONS:
+                    continue
+                # 同じ学者に複数の参照画像がある場合は拡張子の優先順で選ぶ
+                current = found.setdefault(scholar_id, {}).get(REFERENCE)
+                if current is None or REFERENCE_EXTENSIONS.index(ext) < REFERENCE_EXTENSIONS.index(current.suffix.lower()):
+                    found[scholar_id][REFERENCE] = AVATAR_DIR / entry.name
+            elif entry.name.endswith(".png") and not entry.name.startswith("."):
+                found.setdefault(entry.name[:-4], {})[AVATAR] = AVATAR_DIR / entry.name
+
+    if REF_DIR.exists():
+        for entry in sorted(os.scandir(REF_DIR), key=lambda e: e.name):
+            path = REF_DIR / entry.name
+            ext = path.suffix.lower()
+            if entry.is_file() and ext in REFERENCE_EXTENSIONS:
+                current = found.setdefault(path.stem, {}).get(MANUAL_REFERENCE)
+                if current is None or REFERENCE_EXTENSIONS.index(ext) < REFERENCE_EXTENSIONS.index(current.suffix.lower()):
+                    found[path.stem][MANUAL_REFERENCE] = path
+
+    if VARIANT_MANIFEST.exists():
+        try:
+            with open(VARIANT_MANIFEST, "r", encoding="utf-8") as f:
+                variants = json.load(f).get("avatars", {})
+        except Exception as e:
+            print(f"Warning: バリアントのマニフェストの読み込みエラー: {e}")
+            variants = {}
+        for scholar_id, entry in variants.items():
+            paths = [
+                Path(candidate.rsplit(" ", 1)[0])
+                for srcset in entry.get("srcset", {}).values()
+                for candidate in srcset.split(", ")
+            ]
+            paths = [p for p in paths if p.exists()]
+            if paths:
+                found.setdefault(scholar_id, {})[VARIANTS] = paths
+
+    return found
+
+def refresh():
+    """ディレクトリを走査してマニフェストを更新（変更のないファイルはハッシュを再利用）
+
+    ハッシュの計算はトランザクションの外で行い、変更分だけを1トランザクションで書き込む。
+
+    Returns:
+        更新・追加・削除されたファイルの数
+    """
+    manifest = load()
+    found = _scan()
+    removals = []
+    assets = []
+    changes = 0
+
+    for scholar_id in sorted(set(manifest) - set(found)):
+        removals.append((scholar_id, None))
+        changes += len(manifest[scholar_id])
+
+    for scholar_id, kinds in found.items():
+        before = manifest.get(scholar_id, {})
+        for kind in before:
+            if kind not in kinds:
+                removals.append((scholar_id, kind))
+                changes += 1
+        for kind, value in kinds.items():
+            if kind == VARIANTS:
+                after = _describe_variants(value, before.get(VARIANTS))
+                if after != before.get(VARIANTS):
+                    removals.append((scholar_id, VARIANTS))
+                    assets += [(scholar_id, VARIANTS, position, v) for position, v in enumerate(after)]
+                    changes += 1
+            else:
+                after = _describe(value, before.get(kind))
+                if after != before.get(kind):
+                    assets.append((scholar_id, kind, 0, after))
+                    changes += 1
+
+    if removals or assets:
+        _write(removals, assets)
+    return changes
+
+def find_missing_avatars():
+    """参照画像はあるがアバター画像がない学者IDのリスト"""
+    return sorted(
+        scholar_id for scholar_id, assets in load().items()
+        if AVATAR not in assets and (REFERENCE in assets or MANUAL_REFERENCE in assets)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="アバター関連ファイルのアセットマニフェスト")
+    parser.add_argument("--rebuild", action="store_true", help="ディレクトリを走査してマニフェストを更新")
+    parser.add_argument("--missing", action="store_true", help="参照画像はあるがアバターがない学者を表示")
+    args = parser.parse_args()
+
+    if args.rebuild or not MANIFEST_DB.exists():
+        changes = refresh()
+        print(f"アセットマニフェストを更新しました: {MANIFEST_DB}（変更 {changes}件）")
+
+    manifest = load()
+    counts = {kind: 0 for kind in (AVATAR, REFERENCE, MANUAL_REFERENCE, VARIANTS)}
+    for assets in manifest.values():
+        for kind in assets:
+            counts[kind] += 1
+    print(f"学者: {len(manifest)}人")
+    for kind, count in counts.items():
+        print(f"{kind}: {count}")
+
+    if args.missing:
+        missing = find_missing_avatars()
+        print(f"\n参照画像はあるがアバターがない学者: {len(missing)}人")
+        for scholar_id in missing:
+            print(f"  {scholar_id}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+アバター生成のキャッシュ（参照画像・プロンプト・モデルによるキャッシュキー）
+
+アバター画像 avatars/{id}.png の隣に avatars/{id}.meta.json を置き、生成時の
+参照画像のハッシュ・プロンプト・モデル名から計算したキャッシュキーを記録する。
+生成スクリプトは現在の入力から計算したキーと記録済みのキーを比較し、
+いずれかの入力が変わった場合のみ再生成する（変わっていない学者には課金しない）。
+
+メタデータのない既存のアバター（キャッシュ導入前に生成したもの）は生成済みとして扱う。
+プロンプトの変更を既存のアバターにも反映したい場合は、先に --adopt で
+現在の入力をメタデータとして記録しておく。
+
+使い方:
+python scripts/avatar_cache.py            # キャッシュの状態を表示
+python scripts/avatar_cache.py --adopt    # メタデータのないアバターに現在の入力を記録
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import asset_manifest
+
+# 画像生成モデル
+GEMINI_IMAGE_MODEL = "gemini-2.0-flash-exp-image-generation"
+GPT_IMAGE_MODEL = "gpt-image-1"
+
+# アバター生成用のプロンプト（Gemini・GPT-image-1共通）
+AVATAR_PROMPT_TEMPLATE = """Create a flat pastel portrait of {name_en} based on the reference image.
+
+Style guidelines:
+- Facing forward
+- 4-colour palette
+- Thick outline
+- Solid background
+- Simple, stylized cartoon illustration
+- No text or watermarks
+"""
+
+# キャッシュキーの形式を変えた場合に上げる（既存のキーをすべて無効にする）
+CACHE_KEY_VERSION = 1
+
+def build_avatar_prompt(name_en):
+    """学者の英語名からアバター生成用のプロンプトを作成"""
+    return AVATAR_PROMPT_TEMPLATE.format(name_en=name_en)
+
+def compute_cache_key(reference_sha256, prompt, model):
+    """参照画像のハッシュ・プロンプト・モデル名からキャッシュキーを計算"""
+    digest = hashlib.sha256()
+    for value in (str(CACHE_KEY_VERSION), reference_sha256, prompt, model):
+        data = value.encode("utf-8")
+        # 区切りを曖昧にしないよう長さを前置する
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+def meta_path(avatar_path):
+    """アバター画像に対応するメタデータのパス（avatars/{id}.meta.json）"""
+    avatar_path = Path(avatar_path)
+    return avatar_path.with_name(f"{avatar_path.stem}.meta.json")
+
+def load_meta(avatar_path):
+    """アバター画像のメタデータを読み込む（ない場合はNone）"""
+    path = meta_path(avatar_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: メタデータの読み込みエラー ({path}): {e}")
+        return None
+
+def write_meta(avatar_path, reference_image_path, prompt, model):
+    """生成したアバター画像のメタデータ（キャッシュキーと入力）を記録"""
+    reference_sha256 = asset_manifest.cached_sha256(reference_image_path)
+    meta = {
+        "cache_key": compute_cache_key(reference_sha256, prompt, model),
+        "model": model,
+        "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+        "reference": Path(reference_image_path).as_posix(),
+        "reference_sha256": reference_sha256,
+        "avatar_sha256": asset_manifest.cached_sha256(avatar_path),
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    path = meta_path(avatar_path)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return meta
+
+def remove_meta(avatar_path):
+    """メタデータを削除（参照画像を使わずに生成した場合など）"""
+    path = meta_path(avatar_path)
+    if path.exists():
+        path.unlink()
+
+def is_current(avatar_path, reference_image_path, prompt, model):
+    """アバター画像が現在の参照画像・プロンプト・モデルで生成済みか確認
+
+    メタデータのない既存のアバターは生成済みとして扱う。
+    """
+    avatar_path = Path(avatar_path)
+    if not avatar_path.exists():
+        return False
+    meta = load_meta(avatar_path)
+    if meta is None:
+        return True
+    if not reference_image_path or not Path(reference_image_path).exists():
+        return False
+    reference_sha256 = asset_manifest.cached_sha256(reference_image_path)
+    return meta.get("cache_key") == compute_cache_key(reference_sha256, prompt, model)
+
+def find_reference_image(scholar_id):
+    """学者の参照画像を探す（手動追加の参照画像 → 過去にダウンロードした参照画像の順）"""
+    return asset_manifest.find_reference(scholar_id)
+
+def is_scholar_avatar_current(scholar_id, name_en, model=GEMINI_IMAGE_MODEL):
+    """学者のアバターが現在の入力で生成済みか確認（参照画像が手元にない場合は生成済みとみなす）
+
+    アバター・参照画像の有無はアセットマニフェストで判定する（事前に asset_manifest.refresh() を呼ぶこと）。
+    """
+    avatar_path = asset_manifest.get_path(scholar_id, asset_manifest.AVATAR)
+    if avatar_path is None:
+        return False
+    reference_image_path = find_reference_image(scholar_id)
+    if reference_image_path is None:
+        return True
+    return is_current(avatar_path, reference_image_path, build_avatar_prompt(name_en), model)
+
+def main():
+    parser = argparse.ArgumentParser(description="アバター生成キャッシュの状態確認")
+    parser.add_argument("--adopt", action="store_true",
+                        help="メタデータのないアバターに現在の参照画像・プロンプト・モデルを記録")
+    parser.add_argument("--model", default=GEMINI_IMAGE_MODEL, help=f"比較に使うモデル名（既定: {GEMINI_IMAGE_MODEL}）")
+    parser.add_argument("--scholars", default="scholars_enhanced.json", help="学者データのJSONファイル")
+    args = parser.parse_args()
+
+    try:
+        with open(args.scholars, "r", encoding="utf-8") as f:
+            scholars = json.load(f)
+    except Exception as e:
+        print(f"Error loading scholar data: {e}")
+        return
+
+    asset_manifest.refresh()
+    counts = {"current": 0, "stale": 0, "legacy": 0, "no_reference": 0, "missing": 0}
+    for scholar in scholars:
+        scholar_id = scholar["id"]
+        prompt = build_avatar_prompt(scholar["name"]["en"])
+        avatar_path = asset_manifest.get_path(scholar_id, asset_manifest.AVATAR)
+        reference_image_path = find_reference_image(scholar_id)
+
+        if avatar_path is None:
+            counts["missing"] += 1
+        elif reference_image_path is None:
+            counts["no_reference"] += 1
+        elif load_meta(avatar_path) is None:
+            if args.adopt:
+                write_meta(avatar_path, reference_image_path, prompt, args.model)
+                print(f"メタデータを記録: {avatar_path}")
+                counts["current"] += 1
+            else:
+                counts["legacy"] += 1
+        elif is_current(avatar_path, reference_image_path, prompt, args.model):
+            counts["current"] += 1
+        else:
+            print(f"再生成が必要: {scholar_id}")
+            counts["stale"] += 1
+
+    print("\n===== キャッシュの状態 =====")
+    print(f"生成済み（入力に変更なし）: {counts['current']}")
+    print(f"再生成が必要（入力に変更あり）: {counts['stale']}")
+    print(f"メタデータなし（生成済みとして扱う）: {counts['legacy']}")
+    print(f"参照画像なし: {counts['no_reference']}")
+    print(f"アバター未生成: {counts['missing']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+#!/usr/bin/env python
+"""
+アバター生成のジョブキュー（複数バックエンドへの振り分けとフォールバック）
+
+生成ジョブをSQLite（avatar_jobs.db）に保存し、バックエンドごとのワーカースレッドで処理する。
+
+- バックエンド: gemini（参照画像あり）/ gpt-image-1（参照画像あり）/ dall-e-3（テキストのみ）
+- バックエンドごとに同時実行数を制限する
+- 失敗したジョブは指数バックオフで再試行し、上限回数を超えたら次のバックエンドに回す
+- 連続して失敗したバックエンドは一定時間止め（サーキットブレーカー）、ジョブを次のバックエンドに回す
+- 生成できたジョブはその場でアバター画像・キャッシュのメタデータ・処理状態を記録する
+  （途中で中断しても、次回は残りのジョブから再開する）
+
+使い方:
+1. 生成対象をキューに登録: python scripts/avatar_job_queue.py enqueue
+   （特定の学者のみ: --ids rosenbaum2025 ...、Webから参照画像を取得: --fetch-references）
+2. キューを処理: python scripts/avatar_job_queue.py run
+   （バックエンドと同時実行数: --backends gemini,dall-e-3 --concurrency gemini=4）
+3. 状態を確認: python scripts/avatar_job_queue.py status
+
+環境変数:
+- GOOGLE_API_KEY: Google Gemini APIキー（geminiを使う場合）
+- OPENAI_API_KEY: OpenAI APIキー（gpt-image-1・dall-e-3を使う場合）
+"""
+
+import argparse
+import base64
+import importlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import photo_status_store, avatar_cache, asset_manifest, ingest_reference_photos, scholar_schema
+from scripts.lazy_import import load_all
+
+# ジョブを保持するSQLiteデータベース
+JOB_DB = Path("avatar_jobs.db")
+
+# 学者データ
+SCHOLARS_JSON = Path("scholars_enhanced.json")
+
+# アバター画像の出力先
+OUT_DIR = Path("avatars")
+
+# バックエンドの設定（順番がフォールバックの順序）
+BACKENDS = {
+    "gemini": {"needs_reference": True, "concurrency": 4},
+    "gpt-image-1": {"needs_reference": True, "concurrency": 2},
+    "dall-e-3": {"needs_reference": False, "concurrency": 2},
+}
+
+# 1つのバックエンドで試行する最大回数（超えたら次のバックエンドに回す）
+MAX_ATTEMPTS_PER_BACKEND = 3
+
+# 再試行までの待機時間（秒）: BACKOFF_BASE * 2^(試行回数-1)、上限BACKOFF_MAX
+BACKOFF_BASE = 2
+BACKOFF_MAX = 60
+
+# サーキットブレーカー: 連続失敗回数のしきい値と停止する秒数
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 120
+
+# 処理できるジョブがない場合の待機時間（秒）
+POLL_INTERVAL = 0.5
+
+# 他プロセスが書き込み中の場合に待機する最大秒数
+BUSY_TIMEOUT = 30
+
+# スレッドごとの接続
+_local = threading.local()
+
+def _connect():
+    """スレッドごとのSQLite接続を取得（初回はテーブルを作成）"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(JOB_DB, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS avatar_jobs (
+            scholar_id TEXT PRIMARY KEY,
+            name_en TEXT,
+            name_ja TEXT,
+            reference_path TEXT,
+            source_url TEXT,
+            status TEXT,
+            backend TEXT,
+            attempts INTEGER DEFAULT 0,
+            tried_backends TEXT DEFAULT '',
+            next_attempt_at REAL DEFAULT 0,
+            last_error TEXT,
+            avatar_path TEXT,
+            updated_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_avatar_jobs_claim ON avatar_jobs (status, backend, next_attempt_at)")
+    _local.conn = conn
+    return conn
+
+class CircuitBreaker:
+    """バックエンドの連続失敗を数え、しきい値を超えたら一定時間止める"""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def is_open(self):
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            if time.time() - self.opened_at >= self.cooldown:
+                # 停止時間が過ぎたら再開して様子を見る
+                self.opened_at = None
+                self.failures = self.threshold - 1
+                return False
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold and self.opened_at is None:
+                self.opened_at = time.time()
+                return True
+            return False
+
+def _generate_gemini(job):
+    """Geminiで参照画像からアバターを生成"""
+    from scripts.gen_avatar_from_photo import generate_avatar_from_reference_image
+    return generate_avatar_from_reference_image(job["name_en"], job["reference_path"])
+
+def _generate_gpt_image(job):
+    """GPT-image-1で参照画像からアバターを生成"""
+    from scripts.gen_avatar_from_photo_openai_api import generate_avatar_from_reference_image
+    return generate_avatar_from_reference_image(job["name_en"], job["reference_path"])
+
+def _generate_dalle(job):
+    """DALL·E 3で名前からアバターを生成（参照画像なし）"""
+    from scripts.gen_avatar_batch import generate_image_data
+    return generate_image_data({"id": job["scholar_id"], "name": {"en": job["name_en"]}})
+
+# バックエンド名 -> 生成関数（画像データを返し、失敗した場合はNone）
+GENERATORS = {
+    "gemini": _generate_gemini,
+    "gpt-image-1": _generate_gpt_image,
+    "dall-e-3": _generate_dalle,
+}
+
+# バックエンド名 -> 生成関数のモジュール（ワーカーの起動前に読み込む）
+GENERATOR_MODULES = {
+    "gemini": "scripts.gen_avatar_from_photo",
+    "gpt-image-1": "scripts.gen_avatar_from_photo_openai_api",
+    "dall-e-3": "scripts.gen_avatar_batch",
+}
+
+# キャッシュのメタデータに記録するモデル名（参照画像を使うバックエンドのみ）
+CACHE_MODELS = {
+    "gemini": avatar_cache.GEMINI_IMAGE_MODEL,
+    "gpt-image-1": avatar_cache.GPT_IMAGE_MODEL,
+}
+
+def next_backend(job, backends):
+    """ジョブを処理できる次のバックエンドを選ぶ（試したバックエンドは除く）"""
+    tried = set(filter(None, (job["tried_backends"] or "").split(",")))
+    for name in backends:
+        if name in tried:
+            continue
+        if BACKENDS[name]["needs_reference"] and not job["reference_path"]:
+            continue
+        return name
+    return None
+
+def enqueue(scholars, backends, fetch_references=False, force=False):
+    """生成が必要な学者をキューに登録（登録済みで未完了のジョブは上書きしない）"""
+    conn = _connect()
+    existing = {
+        row["scholar_id"]: row["status"]
+        for row in conn.execute("SELECT scholar_id, status FROM avatar_jobs")
+    }
+
+    # 手動で追加された参照画像などをアセットマニフェストに取り込む
+    asset_manifest.refresh()
+    # 参照画像を正規化しておく（ワーカーでは変換しない）
+    ingest_reference_photos.ingest_all()
+    
+    if fetch_references:
+        from scripts.gen_avatar_from_photo import resolve_reference_image
+
+    rows = []
+    now = time.time()
+    for scholar in scholars:
+        scholar_id = scholar["id"]
+        name_en = scholar["name"]["en"]
+        if not force and avatar_cache.is_scholar_avatar_current(scholar_id, name_en):
+            continue
+        if existing.get(scholar_id) in ("pending", "running"):
+            continue
+
+        reference_path = avatar_cache.find_reference_image(scholar_id)
+        source_url = None
+        if reference_path is None and fetch_references:
+            reference_path, source_url, _ = resolve_reference_image(scholar)
+
+        job = {"reference_path": str(reference_path) if reference_path else None, "tried_backends": ""}
+        backend = next_backend(job, backends)
+        if backend is None:
+            print(f"処理できるバックエンドがありません（参照画像なし）: {scholar_id}")
+            continue
+
+        rows.append((
+            scholar_id, name_en, scholar["name"].get("ja", ""), job["reference_path"], source_url,
+            "pending", backend, now
+        ))
+
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany("""
+        INSERT INTO avatar_jobs (scholar_id, name_en, name_ja, reference_path, source_url,
+                                 status, backend, attempts, tried_backends, next_attempt_at,
+                                 last_error, avatar_path, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 0, '', 0, NULL, NULL, ?)
+        ON CONFLICT(scholar_id) DO UPDATE SET
+            name_en = excluded.name_en,
+            name_ja = excluded.name_ja,
+            reference_path = excluded.reference_path,
+            source_url = excluded.source_url,
+            status = excluded.status,
+            backend = excluded.backend,
+            attempts = 0,
+            tried_backends = '',
+            next_attempt_at = 0,
+            last_error = NULL,
+            updated_at = excluded.updated_at
+    """, rows)
+    conn.execute("COMMIT")
+    print(f"{len(rows)}件のジョブを登録しました")
+    return len(rows)
+
+def claim_job(backend):
+    """バックエンドに割り当てられた実行可能なジョブを1件取得して実行中にする"""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        job = conn.execute("""
+            SELECT * FROM avatar_jobs
+            WHERE status = 'pending' AND backend = ? AND next_attempt_at <= ?
+            ORDER BY next_attempt_at, rowid LIMIT 1
+        """, (backend, time.time())).fetchone()
+        if job:
+            conn.execute(
+                "UPDATE avatar_jobs SET status = 'running', updated_at = ? WHERE scholar_id = ?",
+                (time.time(), job["scholar_id"])
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return dict(job) if job else None
+
+def has_unfinished_jobs():
+    """未完了（待機中・実行中）のジョブがあるか"""
+    conn = _connect()
+    row = conn.execute("SELECT COUNT(*) FROM avatar_jobs WHERE status IN ('pending', 'running')").fetchone()
+    return row[0] > 0
+
+def _update_job(scholar_id, **fields):
+    """ジョブの列を更新"""
+    fields["updated_at"] = time.time()
+    assignments = ", ".join(f"{key} = ?" for key in fields)
+    conn = _connect()
+    conn.execute(f"UPDATE avatar_jobs SET {assignments} WHERE scholar_id = ?", (*fields.values(), scholar_id))
+
+def save_avatar(scholar_id, avatar_data):
+    """生成された画像データを保存してパスを返す（base64文字列にも対応）"""
+    if isinstance(avatar_data, str):
+        if avatar_data.startswith('data:image'):
+            avatar_data = avatar_data.split(',', 1)[1]
+        avatar_data = base64.b64decode(avatar_data)
+
+    avatar_path = OUT_DIR / f"{scholar_id}.png"
+    temp_path = avatar_path.with_name(f".{avatar_path.name}.tmp")
+    with open(temp_path, "wb") as f:
+        f.write(avatar_data)
+    temp_path.replace(avatar_path)
+    asset_manifest.record_asset(scholar_id, asset_manifest.AVATAR, avatar_path)
+    return avatar_path
+
+def complete_job(job, backend, avatar_data):
+    """生成結果を保存し、キャッシュのメタデータ・処理状態・ジョブを更新"""
+    avatar_path = save_avatar(job["scholar_id"], avatar_data)
+
+    if backend in CACHE_MODELS:
+        prompt = avatar_cache.build_avatar_prompt(job["name_en"])
+        avatar_cache.write_meta(avatar_path, job["reference_path"], prompt, CACHE_MODELS[backend])
+    else:
+        avatar_cache.remove_meta(avatar_path)
+
+    photo_status_store.upsert_status(job["scholar_id"], job["name_en"], job["name_ja"], job["source_url"], "generated")
+    _update_job(job["scholar_id"], status="done", backend=backend, avatar_path=str(avatar_path), last_error=None)
+    print(f"✅ 生成成功 [{backend}]: {avatar_path}")
+
+def fail_job(job, backend, error, backends, breaker_open):
+    """失敗したジョブを再試行・次のバックエンドへのフォールバック・失敗のいずれかにする"""
+    attempts = job["attempts"] + 1
+    if attempts < MAX_ATTEMPTS_PER_BACKEND and not breaker_open:
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+        _update_job(job["scholar_id"], status="pending", attempts=attempts,
+                    next_attempt_at=time.time() + delay, last_error=error)
+        print(f"再試行予定 [{backend}] ({attempts}/{MAX_ATTEMPTS_PER_BACKEND}, {delay}秒後): {job['scholar_id']}")
+        return
+
+    tried = ",".join(filter(None, [job["tried_backends"], backend]))
+    fallback = next_backend({**job, "tried_backends": tried}, backends)
+    if fallback:
+        _update_job(job["scholar_id"], status="pending", backend=fallback, attempts=0,
+                    tried_backends=tried, next_attempt_at=0, last_error=error)
+        print(f"フォールバック [{backend} -> {fallback}]: {job['scholar_id']}")
+    else:
+        _update_job(job["scholar_id"], status="failed", attempts=attempts, tried_backends=tried, last_error=error)
+        print(f"❌ 生成失敗（すべてのバックエンドで失敗）: {job['scholar_id']}")
+
+def reroute_backend(backend, backends):
+    """停止中のバックエンドに割り当てられた待機中のジョブを次のバックエンドに回す"""
+    conn = _connect()
+    jobs = conn.execute(
+        "SELECT * FROM avatar_jobs WHERE status = 'pending' AND backend = ?", (backend,)
+    ).fetchall()
+    for job in jobs:
+        tried = ",".join(filter(None, [job["tried_backends"], backend]))
+        fallback = next_backend({**dict(job), "tried_backends": tried}, backends)
+        if fallback:
+            _update_job(job["scholar_id"], backend=fallback, attempts=0, tried_backends=tried, next_attempt_at=0)
+            print(f"フォールバック [{backend}停止中 -> {fallback}]: {job['scholar_id']}")
+
+def worker(backend, backends, breaker, stats, stats_lock):
+    """バックエンド1つ分のワーカースレッド"""
+    while True:
+        if breaker.is_open():
+            reroute_backend(backend, backends)
+            if not has_unfinished_jobs():
+                return
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        job = claim_job(backend)
+        if job is None:
+            if not has_unfinished_jobs():
+                return
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        print(f"生成開始 [{backend}]: {job['name_en']} ({job['scholar_id']})")
+        try:
+            avatar_data = GENERATORS[backend](job)
+            error = None if avatar_data else "no image data returned"
+        except Exception as e:
+            avatar_data, error = None, str(e)
+
+        if avatar_data:
+            try:
+                complete_job(job, backend, avatar_data)
+                breaker.record_success()
+                with stats_lock:
+                    stats[backend]["success"] += 1
+                continue
+            except Exception as e:
+                error = f"save failed: {e}"
+
+        opened = breaker.record_failure()
+        if opened:
+            print(f"⚠️ {backend}で失敗が続いたため{BREAKER_COOLDOWN}秒停止します")
+        with stats_lock:
+            stats[backend]["failure"] += 1
+        fail_job(job, backend, error, backends, breaker.is_open())
+
+def run(backends, concurrency):
+    """キューのジョブをすべて処理"""
+    conn = _connect()
+    # 前回中断された実行中のジョブを待機中に戻す
+    conn.execute("UPDATE avatar_jobs SET status = 'pending' WHERE status = 'running'")
+    # 今回使わないバックエンドに割り当てられたジョブを振り直す
+    for job in conn.execute("SELECT * FROM avatar_jobs WHERE status = 'pending'").fetchall():
+        if job["backend"] not in backends:
+            backend = next_backend(dict(job), backends)
+            if backend:
+                _update_job(job["scholar_id"], backend=backend, attempts=0)
+            else:
+                _update_job(job["scholar_id"], status="failed", last_error="no available backend")
+
+    # 生成に使うモジュールと、遅延読み込みのライブラリ（requests・google.genaiなど）を
+    # ワーカーの起動前に読み込んでおく（複数のワーカーが同時に初めて使うのを避ける）
+    for name in backends:
+        importlib.import_module(GENERATOR_MODULES[name])
+    load_all()
+
+    stats = {name: {"success": 0, "failure": 0} for name in backends}
+    stats_lock = threading.Lock()
+    threads = []
+    for name in backends:
+        breaker = CircuitBreaker()
+        for i in range(concurrency[name]):
+            thread = threading.Thread(
+                target=worker, args=(name, backends, breaker, stats, stats_lock),
+                name=f"{name}-{i}", daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+    print(f"ワーカー起動: " + ", ".join(f"{name}×{concurrency[name]}" for name in backends))
+
+    for thread in threads:
+        thread.join()
+
+    # 処理状態をmissing_photos.csvに書き出す
+    photo_status_store.export_csv()
+    return stats
+
+def sync_scholars_json():
+    """完了したジョブのアバターパスを学者データに反映"""
+    conn = _connect()
+    done = dict(conn.execute("SELECT scholar_id, avatar_path FROM avatar_jobs WHERE status = 'done'"))
+    if not done or not SCHOLARS_JSON.exists():
+        return 0
+
+    scholars = scholar_schema.load_scholars(SCHOLARS_JSON)
+    updated = 0
+    for scholar in scholars:
+        avatar_path = done.get(scholar["id"])
+        if avatar_path and scholar.get("avatar") != avatar_path:
+            scholar["avatar"] = avatar_path
+            updated += 1
+    if updated:
+        scholar_schema.save_scholars(SCHOLARS_JSON, scholars)
+        print(f"{SCHOLARS_JSON}の{updated}件のアバターパスを更新しました")
+    return updated
+
+def summarize():
+    """状態・バックエンドごとのジョブ数"""
+    conn = _connect()
+    return conn.execute("""
+        SELECT status, backend, COUNT(*) AS count FROM avatar_jobs
+        GROUP BY status, backend ORDER BY status, backend
+    """).fetchall()
+
+def parse_concurrency(values):
+    """--concurrency gemini=4 dall-e-3=1 の形式を辞書にする（同時実行数は1以上）
+
+    0のバックエンドにはワーカーが起動せず、割り当てられたジョブが終わらなくなるため受け付けない
+    （バックエンドを使わない場合は --backends から外す）
+    """
+    concurrency = {name: config["concurrency"] for name, config in BACKENDS.items()}
+    for value in values or []:
+        name, _, count = value.partition("=")
+        if name not in BACKENDS or not count.isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(f"不正な同時実行数の指定（1以上の整数）: {value}")
+        concurrency[name] = int(count)
+    return concurrency
+
+def main():
+    parser = argparse.ArgumentParser(description="アバター生成ジョブキュー")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help=f"使用するバックエンド（フォールバック順、既定: {','.join(BACKENDS)}）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="生成が必要な学者をキューに登録")
+    enqueue_parser.add_argument("--ids", nargs="+", help="登録する学者ID（既定: すべての学者）")
+    enqueue_parser.add_argument("--fetch-references", action="store_true",
+                                help="参照画像が手元にない学者はWebから取得を試みる")
+    enqueue_parser.add_argument("--force", action="store_true", help="生成済みのアバターも再生成する")
+
+    run_parser = subparsers.add_parser("run", help="キューのジョブを処理")
+    run_parser.add_argument("--concurrency", nargs="+", metavar="BACKEND=N",
+                            help="バックエンドごとの同時実行数（例: gemini=4 dall-e-3=1）")
+
+    subparsers.add_parser("status", help="ジョブの状態を表示")
+    args = parser.parse_args()
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = [name for name in backends if name not in BACKENDS]
+    if unknown:
+        parser.error(f"不明なバックエンド: {', '.join(unknown)}")
+
+    if args.command == "enqueue":
+        with open(SCHOLARS_JSON, "r", encoding="utf-8") as f:
+            scholars = json.load(f)
+        if args.ids:
+            scholars = [s for s in scholars if s["id"] in set(args.ids)]
+        enqueue(scholars, backends, args.fetch_references, args.force)
+
+    elif args.command == "run":
+        try:
+            concurrency = parse_concurrency(args.concurrency)
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+        OUT_DIR.mkdir(exist_ok=True)
+        start_time = time.time()
+        stats = run(backends, concurrency)
+        sync_scholars_json()
+
+        elapsed_time = time.time() - start_time
+        print("\n===== 処理結果サマリー =====")
+        for name, counts in stats.items():
+            print(f"{name}: 成功 {counts['success']}, 失敗 {counts['failure']}")
+        print(f"所要時間: {elapsed_time:.1f}秒")
+
+    for row in summarize():
+        print(f"{row['status']} [{row['backend']}]: {row['count']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+#!/usr/bin/env python
+"""
+アバター生成パイプラインのスループット計測（APIキー不要のオフライン実行）
+
+画像生成モデル（Gemini / GPT-image-1 / DALL·E 3）とWeb（Wikipediaのページ・画像のダウンロード）を
+遅延と失敗率を指定できるスタブに置き換え、一時ディレクトリ上で以下のシナリオを実行する。
+
+- batch-seq:      gen_avatars_batch_gemini.process_scholar_batch（逐次モード）
+- batch-parallel: gen_avatars_batch_gemini.process_scholar_batch（並列モード、--workers）
+- missing:        gen_missing_avatars_from_existing_references.generate_missing_avatars
+- queue:          avatar_job_queue（enqueue --fetch-references → run → JSONへの反映）
+
+シナリオごとに別プロセスで実行し、学者数/分・段階ごとの累積時間・最大RSS・
+CSV/JSONの書き込み回数を表示する。バッチ処理の変更で性能が落ちていないかを、
+APIの料金をかけずに確認するためのもの。
+
+レート制限対策の固定の待機（time.sleep）と、ジョブキューの再試行・停止時間は
+--sleep-scale 倍に縮める（既定: 0.01倍）。スタブの遅延はそのまま待つ。
+
+使い方:
+python scripts/bench_avatar_pipeline.py
+python scripts/bench_avatar_pipeline.py --scholars 50 --model-latency 1.0 --model-failure-rate 0.2
+python scripts/bench_avatar_pipeline.py --output bench.json                 # 結果を保存
+python scripts/bench_avatar_pipeline.py --baseline bench.json              # 保存した結果と比較
+"""
+
+import argparse
+import base64
+import builtins
+import functools
+import io
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter, defaultdict
+from pathlib import Path
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# 実行できるシナリオ
+SCENARIOS = ("batch-seq", "batch-parallel", "missing", "queue")
+
+# スタブの遅延のばらつき（±割合）
+LATENCY_JITTER = 0.2
+
+# スタブが返す画像の大きさ（参照写真・生成したアバター）
+REFERENCE_IMAGE_SIZE = (800, 1000)
+AVATAR_IMAGE_SIZE = (1024, 1024)
+
+# 本物のtime.sleep（スタブの遅延はこちらで待つ）
+_real_sleep = time.sleep
+_real_open = builtins.open
+
+# ---------------------------------------------------------------------------
+# スタブ（子プロセス内で使用）
+# ---------------------------------------------------------------------------
+
+class StubBackend:
+    """遅延と失敗率を持つスタブの共通処理（呼び出し回数・失敗回数・所要時間を数える）"""
+
+    def __init__(self, name, latency, failure_rate, rng, stats):
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = rng
+        self.stats = stats
+
+    def call(self, exception_type=RuntimeError):
+        with self.stats.lock:
+            jitter = self.rng.uniform(-LATENCY_JITTER, LATENCY_JITTER)
+            fail = self.rng.random() < self.failure_rate
+            self.stats.calls[self.name] += 1
+            if fail:
+                self.stats.failures[self.name] += 1
+        delay = max(0.0, self.latency * (1 + jitter))
+        _real_sleep(delay)
+        self.stats.add_time(f"スタブ: {self.name}", delay)
+        if fail:
+            raise exception_type(f"stub {self.name} failure")
+
+class BenchStats:
+    """計測値（スレッドから更新される）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.failures = Counter()
+        self.stage_time = defaultdict(float)
+        self.stage_count = Counter()
+        self.writes = Counter()
+
+    def add_time(self, stage, seconds):
+        with self.lock:
+            self.stage_time[stage] += seconds
+            self.stage_count[stage] += 1
+
+def _encode_image(size, fmt, seed):
+    """スタブが返す画像（グラデーションに模様を重ねた、圧縮しすぎない画像）"""
+    from PIL import Image, ImageDraw
+
+    width, height = size
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    rng = random.Random(seed)
+    for _ in range(200):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(5, 60)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    buffer = io.BytesIO()
+    if fmt == "JPEG":
+        img.save(buffer, fmt, quality=85)
+    else:
+        img.save(buffer, fmt)
+    return buffer.getvalue()
+
+def install_model_stubs(args, rng, stats):
+    """google.genai と openai をスタブのモジュールに置き換える（スクリプトのimport前に呼ぶ）"""
+    avatar_png = _encode_image(AVATAR_IMAGE_SIZE, "PNG", args.seed)
+    gemini = StubBackend("gemini", args.model_latency, args.model_failure_rate, rng, stats)
+    gpt_image = StubBackend("gpt-image-1", args.model_latency, args.model_failure_rate, rng, stats)
+    dalle = StubBackend("dall-e-3", args.model_latency, args.model_failure_rate, rng, stats)
+
+    # google.genai
+    def generate_content(model=None, contents=None, config=None):
+        gemini.call()
+        inline_data = types.SimpleNamespace(mime_type="image/png", data=avatar_png)
+        part = types.SimpleNamespace(inline_data=inline_data, text=None)
+        content = types.SimpleNamespace(parts=[part])
+        return types.SimpleNamespace(candidates=[types.SimpleNamespace(content=content)])
+
+    class GenaiClient:
+        def __init__(self, api_key=None, **kwargs):
+            self.models = types.SimpleNamespace(generate_content=generate_content)
+
+    genai_types = types.ModuleType("google.genai.types")
+    genai_types.Part = types.SimpleNamespace(
+        from_bytes=lambda data=None, mime_type=None: types.SimpleNamespace(data=data, mime_type=mime_type)
+    )
+    genai_types.GenerateContentConfig = lambda **kwargs: types.SimpleNamespace(**kwargs)
+    genai = types.ModuleType("google.genai")
+    genai.Client = GenaiClient
+    genai.types = genai_types
+    google = types.ModuleType("google")
+    google.genai = genai
+    sys.modules.update({"google": google, "google.genai": genai, "google.genai.types": genai_types})
+
+    # openai
+    def images_edit(**kwargs):
+        gpt_image.call()
+        b64 = base64.b64encode(avatar_png).decode("ascii")
+        return types.SimpleNamespace(data=[types.SimpleNamespace(b64_json=b64, url=None)])
+
+    def images_generate(**kwargs):
+        dalle.call()
+        url = f"https://images.example/generated/{stats.calls['dall-e-3']}.png"
+        return types.SimpleNamespace(data=[types.SimpleNamespace(url=url, b64_json=None)])
+
+    class OpenAIClient:
+        def __init__(self, api_key=None, **kwargs):
+            self.images = types.SimpleNamespace(edit=images_edit, generate=images_generate)
+
+    openai = types.ModuleType("openai")
+    openai.OpenAI = OpenAIClient
+    sys.modules["openai"] = openai
+    return avatar_png
+
+class StubResponse:
+    """requests.Responseのうち、スクリプトが使う部分だけを持つスタブ"""
+
+    def __init__(self, content, content_type):
+        self.status_code = 200
+        self.content = content
+        self.headers = {"Content-Type": content_type, "Content-Length": str(len(content))}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def install_web_stub(args, rng, stats, avatar_png):
+    """requests.get をスタブに置き換える（Wikipediaのページ・画像・生成画像のURL）"""
+    import requests
+
+    reference_jpeg = _encode_image(REFERENCE_IMAGE_SIZE, "JPEG", args.seed + 1)
+    web = StubBackend("web", args.web_latency, args.web_failure_rate, rng, stats)
+
+    def get(url, params=None, **kwargs):
+        web.call(requests.exceptions.ConnectionError)
+        if "/wiki/" in url:
+            slug = url.rsplit("/", 1)[-1]
+            html = (
+                f"<html><head><title>{slug} - Wikipedia</title></head><body>"
+                f"<table class=\"infobox\"><tr><td><img src=\"//upload.wikimedia.org/bench/{slug}.jpg\" "
+                f"width=\"220\" height=\"275\"></td></tr></table>"
+                f"<div class=\"mw-parser-output\"><p>{slug} " + "lorem ipsum " * 50 + "</p></div>"
+                "</body></html>"
+            )
+            return StubResponse(html.encode("utf-8"), "text/html; charset=UTF-8")
+        if url.endswith(".png"):
+            return StubResponse(avatar_png, "image/png")
+        return StubResponse(reference_jpeg, "image/jpeg")
+
+    requests.get = get
+    return reference_jpeg
+
+def install_sleep_scale(scale):
+    """固定の待機（レート制限対策など）を scale 倍に縮める"""
+    time.sleep = lambda seconds: _real_sleep(seconds * scale)
+
+def install_write_counter(stats):
+    """CSV/JSONファイルへの書き込み（open）を数える"""
+    def counting_open(file, mode="r", *args, **kwargs):
+        if isinstance(file, (str, os.PathLike)) and any(m in mode for m in "wax"):
+            # 一時ファイル経由の書き込み（.{name}.{pid}.tmp / {name}.tmp など）は元のファイル名で数える
+            name = re.sub(r"(\.\d+)*(\.tmp)?$", "", Path(file).name.lstrip("."))
+            if name.endswith(".meta.json"):
+                name = "avatars/*.meta.json"
+            if ".csv" in name or ".json" in name:
+                with stats.lock:
+                    stats.writes[name] += 1
+        return _real_open(file, mode, *args, **kwargs)
+
+    builtins.open = counting_open
+
+def instrument(stats, stage, module, name):
+    """関数の所要時間を段階ごとに集計する（from import で参照しているモジュールも置き換える）"""
+    original = getattr(module, name)
+
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            stats.add_time(stage, time.perf_counter() - start)
+
+    for loaded in list(sys.modules.values()):
+        if getattr(loaded, "__name__", "").startswith("scripts.") and getattr(loaded, name, None) is original:
+            setattr(loaded, name, wrapper)
+
+def peak_rss_mb():
+    """プロセスの最大RSS（MB、取得できない環境ではNone）"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # LinuxはKB、macOSはバイト単位
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+# ---------------------------------------------------------------------------
+# シナリオ（子プロセス内で、一時ディレクトリをカレントディレクトリとして実行）
+# ---------------------------------------------------------------------------
+
+def create_fixture(scenario, count, reference_jpeg):
+    """学者データと（missingの場合は）参照画像を用意"""
+    scholars = [
+        {
+            "id": f"bench{i:04d}",
+            "name": {"en": f"Bench Scholar {i}", "ja": f"ベンチ学者{i}"},
+            "rarity": "N",
+            "sources": [f"https://en.wikipedia.org/wiki/Bench_Scholar_{i}"],
+            "avatar": None,
+        }
+        for i in range(count)
+    ]
+    with _real_open("scholars_enhanced.json", "w", encoding="utf-8") as f:
+        json.dump(scholars, f, ensure_ascii=False, indent=2)
+
+    Path("avatars").mkdir(exist_ok=True)
+    Path("reference_photos").mkdir(exist_ok=True)
+    if scenario == "missing":
+        for scholar in scholars:
+            with _real_open(Path("avatars") / f"{scholar['id']}_reference.jpg", "wb") as f:
+                f.write(reference_jpeg)
+    return scholars
+
+def instrument_pipeline(stats):
+    """パイプラインの主な段階に計測を仕込む"""
+    from scripts import (
+        gen_avatar_from_photo, reference_preprocess, avatar_cache, asset_manifest, photo_status_store
+    )
+
+    stages = [
+        ("参照画像の準備（合計）", gen_avatar_from_photo, "resolve_reference_image"),
+        ("Webページから画像を抽出", gen_avatar_from_photo, "extract_image_from_webpage"),
+        ("参照画像のダウンロード", reference_preprocess, "download_reference_image"),
+        ("参照画像の前処理", reference_preprocess, "prepare_reference"),
+        ("アバター生成（合計）", gen_avatar_from_photo, "generate_avatar_from_reference_image"),
+        ("アバターの保存", gen_avatar_from_photo, "save_avatar_data"),
+        ("学者データの検索", gen_avatar_from_photo, "get_scholar_by_id"),
+        ("キャッシュ判定", avatar_cache, "is_current"),
+        ("メタデータの記録", avatar_cache, "write_meta"),
+        ("アセットマニフェストの更新", asset_manifest, "refresh"),
+        ("アセットマニフェストの記録", asset_manifest, "record_asset"),
+        ("処理状態の記録", photo_status_store, "upsert_status"),
+        ("処理状態の記録", photo_status_store, "upsert_statuses"),
+        ("CSVの書き出し", photo_status_store, "export_csv"),
+    ]
+    for stage, module, name in stages:
+        instrument(stats, stage, module, name)
+
+def run_scenario(args):
+    """子プロセスでシナリオを1つ実行して結果を返す"""
+    stats = BenchStats()
+    rng = random.Random(args.seed)
+    avatar_png = install_model_stubs(args, rng, stats)
+    reference_jpeg = install_web_stub(args, rng, stats, avatar_png)
+    scholars = create_fixture(args.run_scenario, args.scholars, reference_jpeg)
+
+    # スクリプトのimport（APIキーの確認・クライアントの初期化はスタブに対して行われる）
+    from scripts import gen_avatars_batch_gemini, gen_missing_avatars_from_existing_references, avatar_job_queue
+    from scripts import gen_avatar_from_photo_openai_api, gen_avatar_batch  # noqa: F401（ジョブキューのバックエンド）
+
+    instrument_pipeline(stats)
+    install_sleep_scale(args.sleep_scale)
+    install_write_counter(stats)
+
+    start = time.perf_counter()
+    if args.run_scenario == "batch-seq":
+        gen_avatars_batch_gemini.process_scholar_batch(workers=1)
+    elif args.run_scenario == "batch-parallel":
+        gen_avatars_batch_gemini.process_scholar_batch(workers=args.workers)
+    elif args.run_scenario == "missing":
+        gen_missing_avatars_from_existing_references.generate_missing_avatars()
+    elif args.run_scenario == "queue":
+        # ジョブキューの再試行・停止時間も固定の待機と同じ倍率で縮める
+        queue = avatar_job_queue
+        queue.BACKOFF_BASE *= args.sleep_scale
+        queue.BACKOFF_MAX *= args.sleep_scale
+        queue.POLL_INTERVAL *= args.sleep_scale
+        queue.CircuitBreaker.__init__.__defaults__ = (
+            queue.BREAKER_THRESHOLD, queue.BREAKER_COOLDOWN * args.sleep_scale
+        )
+        backends = list(queue.BACKENDS)
+        queue.enqueue(scholars, backends, fetch_references=True)
+        queue.run(backends, {name: args.workers for name in backends})
+        queue.sync_scholars_json()
+    elapsed = time.perf_counter() - start
+
+    builtins.open = _real_open
+    with open("scholars_enhanced.json", "r", encoding="utf-8") as f:
+        generated = sum(1 for s in json.load(f) if s.get("avatar"))
+
+    return {
+        "scenario": args.run_scenario,
+        "scholars": len(scholars),
+        "generated": generated,
+        "elapsed": elapsed,
+        "scholars_per_minute": len(scholars) / elapsed * 60 if elapsed else 0,
+        "peak_rss_mb": peak_rss_mb(),
+        "calls": dict(stats.calls),
+        "failures": dict(stats.failures),
+        "stage_time": dict(stats.stage_time),
+        "stage_count": dict(stats.stage_count),
+        "writes": dict(stats.writes),
+    }
+
+# ---------------------------------------------------------------------------
+# 親プロセス
+# ---------------------------------------------------------------------------
+
+def launch_scenario(scenario, args):
+    """シナリオを一時ディレクトリ・別プロセスで実行して結果を読み込む"""
+    work_dir = Path(tempfile.mkdtemp(prefix=f"bench_{scenario}_"))
+    result_path = work_dir / "bench_result.json"
+    log_path = work_dir / "bench.log"
+    command = [
+        sys.executable, str(Path(__file__).resolve()),
+        "--run-scenario", scenario, "--result", str(result_path),
+        "--scholars", str(args.scholars), "--workers", str(args.workers),
+        "--model-latency", str(args.model_latency), "--model-failure-rate", str(args.model_failure_rate),
+        "--web-latency", str(args.web_latency), "--web-failure-rate", str(args.web_failure_rate),
+        "--sleep-scale", str(args.sleep_scale), "--seed", str(args.seed),
+    ]
+    # スタブのクライアントに渡すダミーのAPIキー（入力を求められないように）
+    env = dict(os.environ, GOOGLE_API_KEY="bench-dummy-key", OPENAI_API_KEY="bench-dummy-key",
+               PYTHONIOENCODING="utf-8")
+    try:
+        with open(log_path, "w", encoding="utf-8") as log:
+            process = subprocess.run(
+                command, cwd=work_dir, env=env, stdin=subprocess.DEVNULL,
+                stdout=None if args.verbose else log, stderr=subprocess.STDOUT if not args.verbose else None,
+            )
+        if process.returncode != 0 or not result_path.exists():
+            print(f"シナリオ {scenario} が失敗しました（終了コード {process.returncode}）")
+            if not args.verbose:
+                print(log_path.read_text(encoding="utf-8")[-3000:])
+            return None
+        with open(result_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        if args.keep_temp:
+            print(f"作業ディレクトリ: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def print_result(result):
+    """シナリオ1つ分の結果を表示"""
+    rss = f"{result['peak_rss_mb']:.1f}MB" if result["peak_rss_mb"] is not None else "不明"
+    print(f"\n----- {result['scenario']} -----")
+    print(f"学者数: {result['scholars']} / 生成: {result['generated']}")
+    print(f"所要時間: {result['elapsed']:.2f}秒（{result['scholars_per_minute']:.1f}人/分）")
+    print(f"最大RSS: {rss}")
+    calls = ", ".join(f"{k} {v}回（失敗 {result['failures'].get(k, 0)}）" for k, v in sorted(result["calls"].items()))
+    print(f"スタブ呼び出し: {calls or 'なし'}")
+
+    print("段階ごとの累積時間（スレッドの合計、入れ子を含む）:")
+    for stage, seconds in sorted(result["stage_time"].items(), key=lambda item: -item[1]):
+        print(f"  {stage}: {seconds:.2f}秒（{result['stage_count'][stage]}回）")
+
+    writes = result["writes"]
+    csv_writes = sum(v for k, v in writes.items() if ".csv" in k)
+    json_writes = sum(v for k, v in writes.items() if ".json" in k)
+    print(f"書き込み: CSV {csv_writes}回, JSON {json_writes}回")
+    for name, count in sorted(writes.items(), key=lambda item: -item[1]):
+        print(f"  {name}: {count}回")
+
+def compare_with_baseline(results, baseline_path, max_regression):
+    """保存した結果と学者数/分を比較（max_regressionを超えて遅くなったシナリオを返す）"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["scenario"]: r for r in json.load(f)}
+
+    regressions = []
+    print(f"\n===== ベースラインとの比較（{baseline_path}） =====")
+    for result in results:
+        base = baseline.get(result["scenario"])
+        if not base or not base["scholars_per_minute"]:
+            print(f"{result['scenario']}: ベースラインなし")
+            continue
+        ratio = result["scholars_per_minute"] / base["scholars_per_minute"]
+        mark = ""
+        if ratio < 1 - max_regression:
+            mark = " ← 低下"
+            regressions.append(result["scenario"])
+        print(f"{result['scenario']}: {base['scholars_per_minute']:.1f} -> "
+              f"{result['scholars_per_minute']:.1f}人/分（{ratio:.2f}倍）{mark}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="アバター生成パイプラインのスループット計測（スタブ使用）")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS),
+                        help="実行するシナリオ（既定: すべて）")
+    parser.add_argument("--scholars", type=int, default=30, help="学者数（既定: 30）")
+    parser.add_argument("--workers", type=int, default=4, help="並列モード・ジョブキューの同時実行数（既定: 4）")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="画像生成スタブの遅延（秒、既定: 0.5）")
+    parser.add_argument("--model-failure-rate", type=float, default=0.1, help="画像生成スタブの失敗率（既定: 0.1）")
+    parser.add_argument("--web-latency", type=float, default=0.1, help="Webスタブの遅延（秒、既定: 0.1）")
+    parser.add_argument("--web-failure-rate", type=float, default=0.05, help="Webスタブの失敗率（既定: 0.05）")
+    parser.add_argument("--sleep-scale", type=float, default=0.01,
+                        help="固定の待機・再試行の待ち時間に掛ける倍率（既定: 0.01）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数の種（既定: 0）")
+    parser.add_argument("--output", help="結果を保存するJSONファイル")
+    parser.add_argument("--baseline", help="比較するベースラインのJSONファイル（--outputで保存したもの）")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="ベースラインから許容する学者数/分の低下率（既定: 0.2）")
+    parser.add_argument("--keep-temp", action="store_true", help="作業ディレクトリを削除しない")
+    parser.add_argument("--verbose", action="store_true", help="パイプラインの出力を表示")
+    # 子プロセス用
+    parser.add_argument("--run-scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        result = run_scenario(args)
+        with _real_open(args.result, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        return
+
+    print(f"学者数: {args.scholars}, 同時実行数: {args.workers}, "
+          f"画像生成スタブ: {args.model_latency}秒/失敗率{args.model_failure_rate}, "
+          f"Webスタブ: {args.web_latency}秒/失敗率{args.web_failure_rate}, 待機の倍率: {args.sleep_scale}")
+
+    results = []
+    for scenario in args.scenarios:
+        print(f"\n実行中: {scenario}")
+        result = launch_scenario(scenario, args)
+        if result:
+            results.append(result)
+            print_result(result)
+
+    print("\n===== 処理結果サマリー =====")
+    for result in results:
+        print(f"{result['scenario']:<15} {result['scholars_per_minute']:8.1f}人/分  "
+              f"{result['elapsed']:7.2f}秒  生成 {result['generated']}/{result['scholars']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n結果を保存しました: {args.output}")
+
+    failed = len(results) < len(args.scenarios)
+    if args.baseline:
+        failed = bool(compare_with_baseline(results, args.baseline, args.max_regression)) or failed
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
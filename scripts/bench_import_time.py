@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+スクリプトの起動時間（import時間）の計測
+
+各モジュールを別プロセスで `python -X importtime -c "import scripts.xxx"` として読み込み、
+モジュールのimportにかかった時間と、その内訳（パッケージごとの自己時間の合計）を表示する。
+あわせて --help など副作用のないコマンドの実行時間（インタプリタの起動を含む）も計測する。
+
+計測は一時ディレクトリをカレントディレクトリにして行い、import時にディレクトリや
+ファイルが作られていないか（avatars/ の作成やAPIキーの入力待ちがないか）も確認する。
+
+使い方:
+python scripts/bench_import_time.py
+python scripts/bench_import_time.py --modules scripts.gen_avatar_from_photo --top 20
+python scripts/bench_import_time.py --repeat 5 --max-ms 150   # 150msを超えたら終了コード1
+"""
+
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# プロジェクトルート
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# 計測するモジュール
+MODULES = (
+    "scripts.gen_avatar_from_photo",
+    "scripts.gen_avatars_batch_gemini",
+    "scripts.gen_missing_avatars_from_existing_references",
+    "scripts.gen_avatar_from_photo_openai_api",
+    "scripts.gen_avatar_batch",
+    "scripts.avatar_job_queue",
+    "scripts.asset_manifest",
+    "scripts.ingest_reference_photos",
+)
+
+# 実行時間を計測するコマンド（副作用のないもの）
+COMMANDS = (
+    ("gen_avatars_batch_gemini --help", ["scripts/gen_avatars_batch_gemini.py", "--help"]),
+    ("avatar_job_queue --help", ["scripts/avatar_job_queue.py", "--help"]),
+    ("asset_manifest --help", ["scripts/asset_manifest.py", "--help"]),
+    ("ingest_reference_photos --help", ["scripts/ingest_reference_photos.py", "--help"]),
+)
+
+# -X importtime の出力行（import time: 自己時間 | 累積時間 | モジュール名）
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def run_python(args, cwd, extra_env=None):
+    """プロジェクトルートをPYTHONPATHに加えてPythonを実行し、(所要時間, 終了コード, 標準エラー) を返す"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    env.update(extra_env or {})
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *args], cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=120)
+    return time.perf_counter() - start, proc.returncode, proc.stderr
+
+def parse_importtime(stderr, module):
+    """-X importtime の出力から (モジュールの累積時間[ms], パッケージごとの自己時間[ms]) を求める"""
+    cumulative = None
+    by_package = defaultdict(float)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        by_package[name.split(".")[0]] += int(self_us) / 1000
+        if name == module:
+            cumulative = int(cumulative_us) / 1000
+    return cumulative, dict(by_package)
+
+def measure_module(module, repeat, workdir):
+    """モジュールのimport時間を repeat 回計測し、中央値と内訳（中央値の回のもの）を返す"""
+    runs = []
+    for _ in range(repeat):
+        _, returncode, stderr = run_python(["-X", "importtime", "-c", f"import {module}"], workdir)
+        if returncode != 0:
+            error = stderr.strip().splitlines()[-1] if stderr.strip() else f"終了コード {returncode}"
+            return {"module": module, "error": error}
+        cumulative, by_package = parse_importtime(stderr, module)
+        runs.append((cumulative or 0.0, by_package))
+    runs.sort(key=lambda run: run[0])
+    cumulative, by_package = runs[len(runs) // 2]
+    return {"module": module, "ms": cumulative, "by_package": by_package}
+
+def measure_command(args, repeat, workdir):
+    """コマンドの実行時間（インタプリタの起動を含む、ms）の中央値"""
+    times = []
+    for _ in range(repeat):
+        elapsed, returncode, stderr = run_python([str(PROJECT_ROOT / args[0]), *args[1:]], workdir)
+        if returncode != 0:
+            return None, stderr.strip().splitlines()[-1] if stderr.strip() else f"終了コード {returncode}"
+        times.append(elapsed * 1000)
+    return statistics.median(times), None
+
+def main():
+    parser = argparse.ArgumentParser(description="スクリプトの起動時間（import時間）の計測")
+    parser.add_argument("--modules", nargs="+", default=list(MODULES), help="計測するモジュール（既定: 主なスクリプト）")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の回数（中央値を表示、既定: 3）")
+    parser.add_argument("--top", type=int, default=8, help="内訳を表示するパッケージ数（既定: 8）")
+    parser.add_argument("--no-commands", action="store_true", help="--help などのコマンドの実行時間を計測しない")
+    parser.add_argument("--max-ms", type=float, help="import時間がこれを超えるモジュールがあれば終了コード1")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_import_")
+    try:
+        results = []
+        for module in args.modules:
+            result = measure_module(module, args.repeat, workdir)
+            results.append(result)
+            if "error" in result:
+                print(f"{module}: 読み込みエラー（{result['error']}）")
+                continue
+            print(f"\n{module}: {result['ms']:.1f}ms")
+            ranked = sorted(result["by_package"].items(), key=lambda item: item[1], reverse=True)
+            for package, ms in ranked[:args.top]:
+                print(f"  {package:<32} {ms:8.1f}ms")
+
+        commands = []
+        if not args.no_commands:
+            print()
+            for label, command in COMMANDS:
+                ms, error = measure_command(command, args.repeat, workdir)
+                commands.append((label, ms, error))
+                print(f"{label}: " + (f"{ms:.0f}ms" if error is None else f"エラー（{error}）"))
+
+        # import時に作られたファイル・ディレクトリ（__pycache__ 以外）
+        created = sorted(p.name for p in Path(workdir).iterdir() if p.name != "__pycache__")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    measured = [r for r in results if "error" not in r]
+    print("\n===== 処理結果サマリー =====")
+    print(f"モジュール: {len(measured)}/{len(results)}")
+    if measured:
+        slowest = max(measured, key=lambda r: r["ms"])
+        print(f"最大のimport時間: {slowest['ms']:.1f}ms（{slowest['module']}）")
+        print(f"import時間の中央値: {statistics.median(r['ms'] for r in measured):.1f}ms")
+    if commands:
+        timed = [ms for _, ms, error in commands if error is None]
+        if timed:
+            print(f"コマンドの実行時間の最大: {max(timed):.0f}ms（インタプリタの起動を含む）")
+    print(f"import時に作られたファイル: {', '.join(created) if created else 'なし'}")
+
+    if args.max_ms is not None:
+        over = [r for r in measured if r["ms"] > args.max_ms]
+        if over or len(measured) < len(results):
+            for r in over:
+                print(f"上限超過: {r['module']} {r['ms']:.1f}ms > {args.max_ms:.0f}ms")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
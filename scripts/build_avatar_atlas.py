@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+アバターのサムネイルをまとめたスプライトシート（WebP）を生成するビルドスクリプト
+
+一覧表示（debug/card_browser.html の一覧など）でアバターを1枚ずつ読み込むと学者の数だけ
+リクエストが発生するため、96px角のサムネイルを数枚のスプライトシートにまとめ、
+各アバターのシート番号と位置をマップ（avatars/atlas/atlas.json）に書き出す。
+
+学者ごとのシート上の位置は前回のマップから引き継ぎ（空いた位置には新しい学者を詰める）、
+元画像のハッシュ（アセットマニフェスト）に変更があったシートだけを作り直す。
+
+使い方:
+python scripts/build_avatar_atlas.py            # 変更のあったシートだけ再生成
+python scripts/build_avatar_atlas.py --force    # すべてのシートを再生成
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import asset_manifest
+
+# 出力ディレクトリとマップ
+ATLAS_DIR = Path("avatars") / "atlas"
+ATLAS_MAP = ATLAS_DIR / "atlas.json"
+
+# サムネイルの大きさ（px）とシートの列数・行数（1シート 10x10 = 100人、960x960px）
+THUMB_SIZE = 96
+ATLAS_COLUMNS = 10
+ATLAS_ROWS = 10
+SLOTS_PER_SHEET = ATLAS_COLUMNS * ATLAS_ROWS
+
+# WebPのエンコード設定
+ATLAS_QUALITY = 80
+
+# 肖像は上寄りに顔があることが多いため、正方形に切り抜く位置をやや上にする
+THUMB_CENTERING = (0.5, 0.35)
+
+# サムネイルの作り方を変えた場合に上げる（既存のシートをすべて作り直す）
+ATLAS_VERSION = 1
+
+def sheet_path(index):
+    """シート画像の出力パス"""
+    return ATLAS_DIR / f"atlas-{index}.webp"
+
+def slot_position(slot):
+    """シート内の位置番号から左上の座標 (x, y) を計算"""
+    return (slot % ATLAS_COLUMNS) * THUMB_SIZE, (slot // ATLAS_COLUMNS) * THUMB_SIZE
+
+def sheet_key(entries):
+    """シートの内容（位置・学者ID・元画像のハッシュ）から変更検出用のキーを計算"""
+    digest = hashlib.sha256(f"{ATLAS_VERSION}:{THUMB_SIZE}:{ATLAS_COLUMNS}".encode("utf-8"))
+    for slot, avatar_id, _, source_hash in sorted(entries):
+        digest.update(f"\n{slot}:{avatar_id}:{source_hash}".encode("utf-8"))
+    return digest.hexdigest()
+
+def load_map():
+    """既存のマップを読み込む"""
+    if not ATLAS_MAP.exists():
+        return {"sheets": [], "avatars": {}}
+    try:
+        with open(ATLAS_MAP, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: マップの読み込みエラー: {e}")
+        return {"sheets": [], "avatars": {}}
+
+def save_map(atlas_map):
+    """マップを書き出す（一時ファイル経由で置き換え）"""
+    temp_path = ATLAS_MAP.with_suffix(".json.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(atlas_map, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, ATLAS_MAP)
+
+def assign_slots(avatar_ids, previous):
+    """学者を (シート番号, 位置番号) に割り当てる（前回の位置を引き継ぎ、空いた位置に新しい学者を詰める）"""
+    if previous.get("thumb_size") != THUMB_SIZE or previous.get("columns") != ATLAS_COLUMNS:
+        previous = {}
+
+    assigned = {}
+    used = set()
+    for avatar_id in avatar_ids:
+        entry = previous.get("avatars", {}).get(avatar_id)
+        if entry is not None and (entry["sheet"], entry["slot"]) not in used:
+            assigned[avatar_id] = (entry["sheet"], entry["slot"])
+            used.add((entry["sheet"], entry["slot"]))
+
+    free_slot = 0
+    for avatar_id in avatar_ids:
+        if avatar_id in assigned:
+            continue
+        while divmod(free_slot, SLOTS_PER_SHEET) in used:
+            free_slot += 1
+        assigned[avatar_id] = divmod(free_slot, SLOTS_PER_SHEET)
+        used.add(assigned[avatar_id])
+    return assigned
+
+def build_sheet(index, entries):
+    """1枚のシートを生成してシートの情報を返す（ワーカープロセスで実行）
+
+    Args:
+        entries: (位置番号, 学者ID, 元画像のパス, 元画像のハッシュ) のリスト
+    """
+    rows = max(slot for slot, _, _, _ in entries) // ATLAS_COLUMNS + 1
+    sheet = Image.new("RGBA", (ATLAS_COLUMNS * THUMB_SIZE, rows * THUMB_SIZE), (0, 0, 0, 0))
+
+    for slot, _, source, _ in entries:
+        with Image.open(source) as img:
+            img.draft("RGB", (THUMB_SIZE * 2, THUMB_SIZE * 2))
+            img = img.convert("RGBA")
+            thumb = ImageOps.fit(img, (THUMB_SIZE, THUMB_SIZE), Image.LANCZOS, centering=THUMB_CENTERING)
+        sheet.paste(thumb, slot_position(slot))
+
+    out_path = sheet_path(index)
+    sheet.save(out_path, "WEBP", quality=ATLAS_QUALITY, method=6)
+    return index, {
+        "file": out_path.as_posix(),
+        "sha256": asset_manifest.file_sha256(out_path),
+        "key": sheet_key(entries),
+        "width": sheet.width,
+        "height": sheet.height,
+    }
+
+def build_all(workers=None, force=False):
+    """スプライトシートとマップを生成（内容に変更がないシートはスキップ）"""
+    ATLAS_DIR.mkdir(parents=True, exist_ok=True)
+
+    asset_manifest.refresh()
+    sources = {}
+    for avatar_id, assets in sorted(asset_manifest.load().items()):
+        avatar = assets.get(asset_manifest.AVATAR)
+        if avatar:
+            sources[avatar_id] = (avatar["path"], avatar["sha256"])
+
+    previous = load_map()
+    assigned = assign_slots(list(sources), previous)
+
+    # シートごとに内容をまとめる
+    sheets = {}
+    for avatar_id, (index, slot) in assigned.items():
+        path, source_hash = sources[avatar_id]
+        sheets.setdefault(index, []).append((slot, avatar_id, path, source_hash))
+
+    previous_sheets = {i: s for i, s in enumerate(previous.get("sheets", [])) if s}
+    pending = []
+    for index, entries in sorted(sheets.items()):
+        old = previous_sheets.get(index)
+        if not force and old and old.get("key") == sheet_key(entries) and Path(old["file"]).exists():
+            continue
+        pending.append(index)
+
+    print(f"アバター画像: {len(sources)}枚 / シート: {len(sheets)}枚"
+          f"（生成対象: {len(pending)}枚, 最新のためスキップ: {len(sheets) - len(pending)}枚）")
+
+    results = {"success": 0, "error": 0}
+    built = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_sheet, index, sheets[index]): index for index in pending}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    _, info = future.result()
+                except Exception as e:
+                    print(f"シート生成エラー ({sheet_path(index).name}): {e}")
+                    results["error"] += 1
+                    continue
+                built[index] = info
+                results["success"] += 1
+                print(f"生成完了: {info['file']}（{len(sheets[index])}人）")
+
+    # 使われなくなったシートを削除
+    sheet_count = max(sheets) + 1 if sheets else 0
+    for index in sorted(previous_sheets):
+        if index not in sheets and sheet_path(index).exists():
+            print(f"学者がいなくなったシートを削除: {sheet_path(index).name}")
+            sheet_path(index).unlink()
+
+    sheet_list = [built.get(i) or previous_sheets.get(i) for i in range(sheet_count)]
+    atlas_map = {
+        "thumb_size": THUMB_SIZE,
+        "columns": ATLAS_COLUMNS,
+        "sheets": sheet_list,
+        "avatars": {
+            avatar_id: {"sheet": index, "slot": slot, "x": slot_position(slot)[0], "y": slot_position(slot)[1]}
+            for avatar_id, (index, slot) in sorted(assigned.items())
+            # 生成に失敗したシートの学者はマップに載せない
+            if sheet_list[index] and sheet_list[index].get("key") == sheet_key(sheets[index])
+        },
+    }
+    save_map(atlas_map)
+    print(f"マップを書き出しました: {ATLAS_MAP}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="アバターのサムネイルのスプライトシートを生成")
+    parser.add_argument("--workers", type=int, default=None, help="並列プロセス数（既定: CPU数）")
+    parser.add_argument("--force", action="store_true", help="最新のシートも含めてすべて再生成")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    results = build_all(args.workers, args.force)
+
+    elapsed_time = time.time() - start_time
+    print("\n===== 処理結果サマリー =====")
+    print(f"生成: {results['success']}")
+    print(f"エラー: {results['error']}")
+    print(f"所要時間: {elapsed_time:.1f}秒")
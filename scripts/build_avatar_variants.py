@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+アバター画像のレスポンシブ用バリアント（WebP/AVIF）を生成するビルドスクリプト
+
+avatars/*.png（参照画像を除く）から複数の幅のWebP・AVIFを avatars/variants/ に生成し、
+フロントエンドがsrcsetに使うマニフェスト（avatars/variants/manifest.json）を書き出す。
+元画像のハッシュがマニフェストと一致し、出力がそろっている画像はスキップする。
+
+使い方:
+1. 必要なライブラリをインストール: pip install pillow
+   （AVIFはPillow 11.3以降の標準対応、またはpillow-avif-pluginが必要。
+    どちらもない場合はWebPのみ生成）
+2. このスクリプトを実行: python scripts/build_avatar_variants.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from PIL import Image, features
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import asset_manifest
+
+# 入力・出力ディレクトリ
+AVATAR_DIR = Path("avatars")
+VARIANT_DIR = AVATAR_DIR / "variants"
+VARIANT_MANIFEST = VARIANT_DIR / "manifest.json"
+
+# 生成する幅（カードの表示幅は最大400px、高DPI端末向けに2倍まで）
+VARIANT_WIDTHS = (200, 400, 800)
+
+# 形式ごとのエンコード設定（srcsetでは先に書いた形式が優先される）
+VARIANT_FORMATS = {
+    "avif": {"format": "AVIF", "quality": 55, "speed": 6},
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+}
+
+def avif_available():
+    """AVIFで保存できるか確認（標準対応がなければpillow-avif-pluginを試す）"""
+    if features.check("avif"):
+        return True
+    try:
+        import pillow_avif  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def find_avatar_sources():
+    """バリアントの元になるアバター画像を取得（アセットマニフェストから、(パス, ハッシュ) のリスト）"""
+    asset_manifest.refresh()
+    sources = []
+    for scholar_id, assets in sorted(asset_manifest.load().items()):
+        avatar = assets.get(asset_manifest.AVATAR)
+        if avatar:
+            sources.append((Path(avatar["path"]), avatar["sha256"]))
+    return sources
+
+def effective_widths(widths, src_width):
+    """実際に生成する幅（元画像より大きいサイズには拡大せず、元の幅に丸める）"""
+    return sorted({min(width, src_width) for width in widths})
+
+def variant_path(avatar_id, width, fmt):
+    """バリアント画像の出力パス"""
+    return VARIANT_DIR / f"{avatar_id}-{width}.{fmt}"
+
+def build_variants(source, source_hash, widths, formats):
+    """1枚のアバター画像からバリアントを生成してマニフェストのエントリを返す（ワーカープロセスで実行）"""
+    source = Path(source)
+    avatar_id = source.stem
+    if "avif" in formats:
+        avif_available()  # プラグイン方式の場合はワーカー側でも登録が必要
+
+    with Image.open(source) as img:
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        src_width, src_height = img.size
+
+        srcset = {fmt: [] for fmt in formats}
+        for width in effective_widths(widths, src_width):
+            height = round(src_height * width / src_width)
+            resized = img if width == src_width else img.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                out_path = variant_path(avatar_id, width, fmt)
+                options = dict(VARIANT_FORMATS[fmt])
+                resized.save(out_path, options.pop("format"), **options)
+                srcset[fmt].append(f"{out_path.as_posix()} {width}w")
+
+    return avatar_id, {
+        "source": source.as_posix(),
+        "sha256": source_hash,
+        "width": src_width,
+        "height": src_height,
+        "srcset": {fmt: ", ".join(entries) for fmt, entries in srcset.items()},
+    }
+
+def is_up_to_date(entry, source_hash, widths, formats):
+    """マニフェストのエントリが現在の元画像・設定で生成済みか確認"""
+    if not entry or entry.get("sha256") != source_hash:
+        return False
+    if set(entry.get("srcset", {})) != set(formats):
+        return False
+    expected = [f"{w}w" for w in effective_widths(widths, entry["width"])]
+    for value in entry["srcset"].values():
+        candidates = [c.rsplit(" ", 1) for c in value.split(", ")]
+        if [d for _, d in candidates] != expected or not all(Path(c).exists() for c, _ in candidates):
+            return False
+    return True
+
+def load_manifest():
+    """既存のマニフェストを読み込む"""
+    if not VARIANT_MANIFEST.exists():
+        return {}
+    try:
+        with open(VARIANT_MANIFEST, "r", encoding="utf-8") as f:
+            return json.load(f).get("avatars", {})
+    except Exception as e:
+        print(f"Warning: マニフェストの読み込みエラー: {e}")
+        return {}
+
+def save_manifest(avatars, widths):
+    """マニフェストを書き出す（一時ファイル経由で置き換え）"""
+    data = {"widths": list(widths), "avatars": dict(sorted(avatars.items()))}
+    temp_path = VARIANT_MANIFEST.with_suffix(".json.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, VARIANT_MANIFEST)
+
+def remove_stale_variants(avatar_id):
+    """元画像が削除されたアバターのバリアントを削除"""
+    for path in VARIANT_DIR.glob(f"{avatar_id}-*.*"):
+        if path.stem.rsplit("-", 1)[0] == avatar_id:
+            path.unlink()
+
+def build_all(widths=VARIANT_WIDTHS, workers=None, force=False):
+    """すべてのアバター画像のバリアントを生成（変更がないものはスキップ）"""
+    VARIANT_DIR.mkdir(parents=True, exist_ok=True)
+
+    formats = [fmt for fmt in VARIANT_FORMATS if fmt != "avif" or avif_available()]
+    if "avif" not in formats:
+        print("Warning: AVIFに対応していないため、WebPのみ生成します（pip install pillow-avif-plugin）")
+
+    manifest = load_manifest()
+    sources = find_avatar_sources()
+    source_ids = {p.stem for p, _ in sources}
+
+    # 元画像がなくなったアバターをマニフェストから除く
+    for avatar_id in sorted(set(manifest) - source_ids):
+        print(f"元画像が削除されたためバリアントを削除: {avatar_id}")
+        remove_stale_variants(avatar_id)
+        del manifest[avatar_id]
+        asset_manifest.remove_asset(avatar_id, asset_manifest.VARIANTS)
+
+    # ハッシュを比較して生成が必要な画像を選別
+    pending = []
+    for source, source_hash in sources:
+        if not force and is_up_to_date(manifest.get(source.stem), source_hash, widths, formats):
+            continue
+        pending.append((source, source_hash))
+
+    print(f"アバター画像: {len(sources)}枚（生成対象: {len(pending)}枚, 最新のためスキップ: {len(sources) - len(pending)}枚）")
+
+    results = {"success": 0, "error": 0}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(build_variants, str(source), source_hash, widths, formats): source
+                for source, source_hash in pending
+            }
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    avatar_id, entry = future.result()
+                except Exception as e:
+                    print(f"バリアント生成エラー ({source.name}): {e}")
+                    results["error"] += 1
+                    continue
+                manifest[avatar_id] = entry
+                results["success"] += 1
+                print(f"生成完了: {source.name}")
+
+                # アセットマニフェストにバリアントを記録
+                paths = [c.rsplit(" ", 1)[0] for srcset in entry["srcset"].values() for c in srcset.split(", ")]
+                asset_manifest.record_variants(avatar_id, paths)
+
+    save_manifest(manifest, widths)
+    print(f"マニフェストを書き出しました: {VARIANT_MANIFEST}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="アバター画像のWebP/AVIFバリアントを生成")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(VARIANT_WIDTHS),
+                        help=f"生成する幅（既定: {' '.join(map(str, VARIANT_WIDTHS))}）")
+    parser.add_argument("--workers", type=int, default=None, help="並列プロセス数（既定: CPU数）")
+    parser.add_argument("--force", action="store_true", help="最新のバリアントも含めてすべて再生成")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    results = build_all(sorted(set(args.widths)), args.workers, args.force)
+
+    elapsed_time = time.time() - start_time
+    print("\n===== 処理結果サマリー =====")
+    print(f"生成: {results['success']}")
+    print(f"エラー: {results['error']}")
+    print(f"所要時間: {elapsed_time:.1f}秒")
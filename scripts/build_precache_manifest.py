@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+サービスワーカー（sw.js）用のプリキャッシュマニフェストを生成するビルドスクリプト
+
+サイトのファイルごとのハッシュを precache-manifest.js に書き出す。sw.js はこれを読み込み、
+ファイルを「URL + ハッシュ」の組でキャッシュする。
+
+- 画面の表示に必要なファイル（HTML・CSS・JS・学者データの索引と詳細・アバターのバリアントのマニフェスト）は
+  サービスワーカーのインストール時にまとめてキャッシュする（precache）
+- アバター画像（バリアントと、バリアントのない学者の元画像）は最初に表示したときにキャッシュする
+
+ハッシュが変わっていないファイルは、データを更新した後もキャッシュをそのまま使い、変わったファイルだけを
+取得し直す。マニフェストの内容が変わると precache-manifest.js が変わり、ブラウザがサービスワーカーを更新する。
+
+ほかのビルドスクリプト（build_avatar_variants.py・build_site_data.py）の後に実行する。
+
+使い方:
+python scripts/build_precache_manifest.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+# 出力先（sw.js が importScripts で読み込む）
+OUTPUT_PATH = Path("precache-manifest.js")
+
+# インストール時にキャッシュするファイル
+PRECACHE_FILES = (
+    "index.html",
+    "style.css",
+    "gacha.js",
+    "data/index.json",
+    "avatars/variants/manifest.json",
+)
+PRECACHE_GLOBS = ("data/details/*.json",)
+
+# 表示したときにキャッシュするファイル
+VARIANT_DIR = Path("avatars/variants")
+SITE_INDEX = Path("data/index.json")
+
+# ハッシュの桁数（16進数）
+HASH_LENGTH = 16
+
+def file_hash(path):
+    """ファイルのSHA-256（先頭 HASH_LENGTH 桁）"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def runtime_files():
+    """アバター画像（バリアントと、バリアントのない学者の元画像）"""
+    files = sorted(path.as_posix() for path in VARIANT_DIR.glob("*") if path.suffix in (".webp", ".avif"))
+    if SITE_INDEX.exists():
+        with open(SITE_INDEX, "r", encoding="utf-8") as f:
+            scholars = json.load(f)["scholars"]
+        variant_manifest = VARIANT_DIR / "manifest.json"
+        variants = {}
+        if variant_manifest.exists():
+            with open(variant_manifest, "r", encoding="utf-8") as f:
+                variants = json.load(f).get("avatars", {})
+        files += sorted({scholar["avatar"] for scholar in scholars
+                         if scholar["avatar"] and scholar["id"] not in variants})
+    return files
+
+def build_manifest():
+    """マニフェスト {"version", "assets": [{"url", "hash", "precache"}]} と、見つからなかったファイルを返す"""
+    precache = list(PRECACHE_FILES)
+    for pattern in PRECACHE_GLOBS:
+        precache += sorted(path.as_posix() for path in Path(".").glob(pattern))
+
+    assets = []
+    missing = []
+    for files, is_precache in ((precache, True), (runtime_files(), False)):
+        for url in files:
+            if not Path(url).exists():
+                missing.append(url)
+                continue
+            assets.append({"url": url, "hash": file_hash(url), "precache": is_precache})
+
+    version = hashlib.sha256(json.dumps(assets, sort_keys=True).encode("utf-8")).hexdigest()[:HASH_LENGTH]
+    return {"version": version, "assets": assets}, missing
+
+def write_manifest(manifest, path=OUTPUT_PATH):
+    """sw.js が読み込むスクリプトとして書き出す（一時ファイル経由）"""
+    text = ("// scripts/build_precache_manifest.py で生成（編集しないこと）\n"
+            f"self.PRECACHE_MANIFEST = {json.dumps(manifest, ensure_ascii=False, separators=(',', ':'))};\n")
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+    return len(text.encode("utf-8"))
+
+def load_previous(path=OUTPUT_PATH):
+    """前回のマニフェスト（URL -> ハッシュ）"""
+    if not path.exists():
+        return {}
+    text = path.read_text(encoding="utf-8")
+    try:
+        manifest = json.loads(text[text.index("{"):text.rindex("}") + 1])
+    except ValueError:
+        return {}
+    return {asset["url"]: asset["hash"] for asset in manifest.get("assets", [])}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="サービスワーカー用のプリキャッシュマニフェストを生成")
+    parser.add_argument("--output", default=str(OUTPUT_PATH), help=f"出力先（既定: {OUTPUT_PATH}）")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    output_path = Path(args.output)
+    previous = load_previous(output_path)
+    manifest, missing = build_manifest()
+    size = write_manifest(manifest, output_path)
+
+    assets = manifest["assets"]
+    changed = [asset for asset in assets if previous.get(asset["url"]) != asset["hash"]]
+    precache = [asset for asset in assets if asset["precache"]]
+    precache_bytes = sum(Path(asset["url"]).stat().st_size for asset in precache)
+
+    elapsed_time = time.time() - start_time
+    print("\n===== 処理結果サマリー =====")
+    print(f"版: {manifest['version']}")
+    print(f"インストール時にキャッシュ: {len(precache)}件（{precache_bytes / 1024:.1f}KB）")
+    print(f"表示時にキャッシュ: {len(assets) - len(precache)}件")
+    print(f"前回から変わったファイル: {len(changed)}件")
+    for asset in changed[:10]:
+        print(f"  {asset['url']}")
+    if missing:
+        print(f"見つからなかったファイル: {len(missing)}件")
+        for url in missing:
+            print(f"  {url}")
+    print(f"マニフェスト: {size / 1024:.1f}KB: {output_path}")
+    print(f"所要時間: {elapsed_time:.1f}秒")
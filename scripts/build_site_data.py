@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+"""
+フロントエンド（gacha.js）用の学者データを生成するビルドスクリプト
+
+gacha.js が整形済みの scholars_enhanced_tavily.json 全体を読み込むと、引いていない学者の
+貢献・豆知識の文章まで最初に読み込むことになる。そこで学者データを2つに分けて書き出す。
+
+- data/index.json: ガチャを引くのに必要な項目（ID・名前・レア度・タグ・アバター）だけの索引（空白なし）
+  タグ・レア度ごとの学者の位置の一覧（転置索引）も入れ、ガチャで絞り込むときに全員を走査しなくて済むようにする
+  gacha_config.json の排出率から作った絞り込みごとのエイリアス表（scripts/gacha_rates.py）と、
+  10連ガチャの保証枠（SR以上など）だけの表も入れる
+- data/details/{ハッシュ}.json: それ以外の項目（所属・貢献・豆知識・出典など）を SHARD_SIZE 人ずつまとめたもの
+  （カードを表示するときに、その学者を含むファイルだけを読み込む）
+
+詳細のファイル名は内容のハッシュのため、変更のないファイルはそのまま残り、ブラウザのキャッシュも
+そのまま使われる。使われなくなったファイルは削除する。
+
+使い方:
+python scripts/build_site_data.py
+python scripts/build_site_data.py --source scholars_enhanced.json --shard-size 32
+python scripts/build_site_data.py --config gacha_config.json
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import gacha_rates, scholar_schema
+
+# 元の学者データ（gacha.js が読み込んでいたもの）
+SOURCE = Path("scholars_enhanced_tavily.json")
+
+# 出力先
+DATA_DIR = Path("data")
+INDEX_PATH = DATA_DIR / "index.json"
+DETAIL_DIR = DATA_DIR / "details"
+
+# 索引に入れる項目（それ以外は詳細のファイルに入れる）
+INDEX_FIELDS = ("id", "name", "rarity", "tags", "avatar")
+
+# 詳細のファイル1つあたりの学者数
+SHARD_SIZE = 16
+
+def dump_minified(data):
+    """空白なしのJSON文字列"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+def write_atomic(path, text):
+    """一時ファイル経由で書き出す"""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+def index_entry(scholar):
+    """索引の1人分（アバターのパスは / 区切りにそろえる）"""
+    entry = {field: scholar.get(field) for field in INDEX_FIELDS}
+    entry["tags"] = entry["tags"] or []
+    if entry["avatar"]:
+        entry["avatar"] = entry["avatar"].replace("\\", "/")
+    return entry
+
+def detail_entry(scholar):
+    """詳細のファイルに入れる1人分（索引にない項目）"""
+    return {field: value for field, value in scholar.items() if field not in INDEX_FIELDS}
+
+def inverted_index(entries, field):
+    """項目の値（タグ・レア度）ごとの、その値をもつ学者の索引での位置の一覧"""
+    positions = defaultdict(list)
+    for position, entry in enumerate(entries):
+        values = entry[field] if isinstance(entry[field], list) else [entry[field]]
+        for value in dict.fromkeys(values):
+            positions[value].append(position)
+    return dict(sorted(positions.items()))
+
+def build(source=SOURCE, shard_size=SHARD_SIZE, config_path=gacha_rates.CONFIG_PATH):
+    """索引と詳細のファイルを書き出し、サイズなどの集計を返す"""
+    scholars = scholar_schema.load_scholars(source)
+    errors = scholar_schema.validate_records(scholars)
+    if errors:
+        raise scholar_schema.SchemaError(errors)
+    config = gacha_rates.load_config(config_path)
+    ids = {scholar["id"] for scholar in scholars}
+    for scholar_id in config["rateUp"]["scholars"]:
+        if scholar_id not in ids:
+            print(f"警告: ピックアップの学者 {scholar_id} が学者データにありません")
+
+    DETAIL_DIR.mkdir(parents=True, exist_ok=True)
+    shards = []
+    written = 0
+    for start in range(0, len(scholars), shard_size):
+        batch = scholars[start:start + shard_size]
+        text = dump_minified({scholar["id"]: detail_entry(scholar) for scholar in batch})
+        name = f"{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}.json"
+        path = DETAIL_DIR / name
+        if not path.exists():
+            write_atomic(path, text)
+            written += 1
+        shards.append(name)
+
+    # 使われなくなった詳細のファイルを削除
+    removed = 0
+    for path in DETAIL_DIR.glob("*.json"):
+        if path.name not in shards:
+            path.unlink()
+            removed += 1
+
+    # 学者の詳細は、索引での位置 // shardSize 番目のファイルにある
+    entries = [index_entry(scholar) for scholar in scholars]
+    by_tag = inverted_index(entries, "tags")
+    by_rarity = inverted_index(entries, "rarity")
+    filters = {"all": list(range(len(entries))), **by_rarity, **by_tag}
+    index = {
+        "shardSize": shard_size,
+        "shards": [f"details/{name}" for name in shards],
+        "scholars": entries,
+        "byTag": by_tag,
+        "byRarity": by_rarity,
+        "draw": gacha_rates.compile_draw_tables(entries, filters, config),
+        # 保証枠は該当者がいれば区分が1つでも表を作る（gacha.js は保証枠の学者の一覧を持たないため）
+        "guaranteed": {
+            "rarities": list(gacha_rates.guaranteed_rarities(config)),
+            "draw": gacha_rates.compile_draw_tables(
+                entries, gacha_rates.guaranteed_filters(entries, filters, config), config, min_buckets=1),
+        },
+    }
+    # 内容が変わったときだけ変わる版（キャッシュの更新の判定用）
+    index = {"version": hashlib.sha256(dump_minified(index).encode("utf-8")).hexdigest()[:16], **index}
+    index_text = dump_minified(index)
+    write_atomic(INDEX_PATH, index_text)
+
+    shard_sizes = [(DETAIL_DIR / name).stat().st_size for name in shards]
+    return {
+        "scholars": len(scholars),
+        "shards": len(shards),
+        "written": written,
+        "removed": removed,
+        "source_bytes": Path(source).stat().st_size,
+        "index_bytes": len(index_text.encode("utf-8")),
+        "index_gzip_bytes": len(gzip.compress(index_text.encode("utf-8"))),
+        "tags": len(index["byTag"]),
+        "shard_bytes": sum(shard_sizes) / len(shard_sizes) if shard_sizes else 0,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="フロントエンド用の学者データ（索引と詳細）を生成")
+    parser.add_argument("--source", default=str(SOURCE), help=f"元の学者データ（既定: {SOURCE}）")
+    parser.add_argument("--config", default=str(gacha_rates.CONFIG_PATH),
+                        help=f"排出率の設定（既定: {gacha_rates.CONFIG_PATH}）")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                        help=f"詳細のファイル1つあたりの学者数（既定: {SHARD_SIZE}）")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    stats = build(args.source, args.shard_size, args.config)
+
+    elapsed_time = time.time() - start_time
+    print("\n===== 処理結果サマリー =====")
+    print(f"学者数: {stats['scholars']}（タグ {stats['tags']}種類）")
+    print(f"元のデータ: {stats['source_bytes'] / 1024:.1f}KB")
+    print(f"索引: {stats['index_bytes'] / 1024:.1f}KB（gzip {stats['index_gzip_bytes'] / 1024:.1f}KB）: {INDEX_PATH}")
+    print(f"詳細のファイル: {stats['shards']}件（平均 {stats['shard_bytes'] / 1024:.1f}KB、"
+          f"新規 {stats['written']}件、削除 {stats['removed']}件）: {DETAIL_DIR}")
+    print(f"所要時間: {elapsed_time:.1f}秒")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+"""
+ガチャの排出率（レア度ごとの確率とピックアップ）とエイリアス表
+
+gacha_config.json の排出率を、絞り込み（全員・レア度・タグ）ごとのエイリアス表（Walker's alias method）に
+変換する。ブラウザ（gacha.js）は表を1回引くだけ（乱数2つ）で、レア度とピックアップの区分を選べる。
+
+- rates: レア度ごとの排出率（絞り込みに含まれないレア度の分は、含まれるレア度に比例して配分し直す）
+- rateUp.scholars: ピックアップする学者のID（空ならピックアップなし）
+- rateUp.share: ピックアップの学者が、そのレア度の排出率のうちに占める割合
+- guaranteed.minRarity: 10連ガチャの最後の1枠で保証するレア度（それ以上のレア度だけの表を別に作る）
+
+区分（レア度 × ピックアップかどうか）の中では、まだ引いていない学者から均等に選ぶ。
+
+表は scripts/build_site_data.py が data/index.json に入れる。このスクリプトを実行すると、
+data/index.json の表を gacha.js と同じ方法でNumPyを使って大量に引き、実際の排出率が設定どおりかを確かめる。
+
+使い方:
+python scripts/gacha_rates.py                          # 全員から100万回引いて確認
+python scripts/gacha_rates.py --pulls 5000000 --filter SSR Statistics
+python scripts/gacha_rates.py --all-filters            # すべての絞り込みを確認
+python scripts/gacha_rates.py --guaranteed             # 10連ガチャの保証枠の表を確認
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+# 排出率の設定
+CONFIG_PATH = Path("gacha_config.json")
+
+# gacha.js が読み込む索引（scripts/build_site_data.pyで生成）
+INDEX_PATH = Path("data/index.json")
+
+# レア度（表示の順）
+RARITIES = ("N", "R", "SR", "SSR")
+
+# 設定ファイルがない場合の排出率
+DEFAULT_CONFIG = {
+    "rates": {"N": 0.6, "R": 0.28, "SR": 0.09, "SSR": 0.03},
+    "rateUp": {"scholars": [], "share": 0.5},
+    "guaranteed": {"minRarity": "SR"},
+}
+
+# 確率の小数点以下の桁数（索引のサイズを抑えるため）
+PROB_DIGITS = 6
+
+def load_config(path=CONFIG_PATH):
+    """排出率の設定を読み込んで検証する"""
+    path = Path(path)
+    if not path.exists():
+        return DEFAULT_CONFIG
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    rates = config.get("rates", {})
+    unknown = set(rates) - set(RARITIES)
+    if unknown:
+        raise ValueError(f"{path}: 不明なレア度があります: {', '.join(sorted(unknown))}")
+    if any(not isinstance(rate, (int, float)) or rate < 0 for rate in rates.values()) or not any(rates.values()):
+        raise ValueError(f"{path}: rates は0以上の数で、いずれかが正である必要があります")
+
+    rate_up = {**DEFAULT_CONFIG["rateUp"], **config.get("rateUp", {})}
+    if not 0 < rate_up["share"] <= 1:
+        raise ValueError(f"{path}: rateUp.share は0より大きく1以下である必要があります")
+    guaranteed = {**DEFAULT_CONFIG["guaranteed"], **config.get("guaranteed", {})}
+    if guaranteed["minRarity"] not in RARITIES:
+        raise ValueError(f"{path}: guaranteed.minRarity は {', '.join(RARITIES)} のいずれかである必要があります")
+    return {"rates": rates, "rateUp": rate_up, "guaranteed": guaranteed}
+
+def guaranteed_rarities(config):
+    """10連ガチャの保証枠で出るレア度"""
+    return RARITIES[RARITIES.index(config["guaranteed"]["minRarity"]):]
+
+def guaranteed_filters(entries, filters, config):
+    """絞り込みごとの、保証枠で出るレア度の学者の位置（該当者がいない絞り込みは除く）"""
+    rarities = set(guaranteed_rarities(config))
+    restricted = {name: [p for p in positions if entries[p]["rarity"] in rarities]
+                  for name, positions in filters.items()}
+    return {name: positions for name, positions in restricted.items() if positions}
+
+def bucket_weights(entries, positions, config):
+    """
+    絞り込みに含まれる学者を区分（レア度 × ピックアップかどうか）に分け、
+    [(区分名, 学者の位置の一覧, 確率)] を返す（確率の合計は1）
+    """
+    featured = set(config["rateUp"]["scholars"])
+    share = config["rateUp"]["share"]
+    groups = {}
+    for position in positions:
+        entry = entries[position]
+        groups.setdefault(entry["rarity"], ([], []))[entry["id"] in featured].append(position)
+
+    buckets = []
+    for rarity in RARITIES:
+        rate = config["rates"].get(rarity, 0)
+        if rarity not in groups or rate <= 0:
+            continue
+        regular, picked = groups[rarity]
+        if picked and regular:
+            buckets.append((rarity, regular, rate * (1 - share)))
+            buckets.append((f"{rarity}+", picked, rate * share))
+        else:
+            buckets.append((f"{rarity}+" if picked else rarity, picked or regular, rate))
+
+    total = sum(weight for _, _, weight in buckets)
+    return [(name, members, weight / total) for name, members, weight in buckets]
+
+def build_alias_table(probabilities):
+    """Vose の方法でエイリアス表 (prob, alias) を作る（i 列目は確率 prob[i] で i、それ以外は alias[i]）"""
+    n = len(probabilities)
+    scaled = [p * n for p in probabilities]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1]
+    large = [i for i, p in enumerate(scaled) if p >= 1]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1 - scaled[s]
+        (small if scaled[l] < 1 else large).append(l)
+    # 丸め誤差で残ったものは確率1
+    return [round(p, PROB_DIGITS) for p in prob], alias
+
+def compile_draw_tables(entries, filters, config, min_buckets=2):
+    """
+    絞り込みごとのエイリアス表
+    {絞り込み: {"buckets": [区分名], "members": [[学者の位置]], "prob": [...], "alias": [...]}}
+    区分が min_buckets 未満の絞り込みは表を作らない（区分が1つだけの絞り込み（多くのタグ）は、
+    絞り込みに含まれる全員から均等に選ぶのと同じため）
+    """
+    tables = {}
+    for name, positions in filters.items():
+        buckets = bucket_weights(entries, positions, config)
+        if not buckets or len(buckets) < min_buckets:
+            continue
+        prob, alias = build_alias_table([weight for _, _, weight in buckets])
+        tables[name] = {
+            "buckets": [bucket for bucket, _, _ in buckets],
+            "members": [members for _, members, _ in buckets],
+            "prob": prob,
+            "alias": alias,
+        }
+    return tables
+
+def uniform_table(name, positions):
+    """表のない絞り込みの、全員から均等に選ぶ表（gacha.js で表がない場合と同じ）"""
+    return {"buckets": [name], "members": [positions], "prob": [1.0], "alias": [0]}
+
+def simulate(table, pulls, seed=None):
+    """gacha.js と同じ方法で表を pulls 回引き、学者の位置ごとの回数を返す（NumPyでまとめて計算）"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    prob = np.asarray(table["prob"])
+    alias = np.asarray(table["alias"])
+    columns = (rng.random(pulls) * len(prob)).astype(np.int64)
+    buckets = np.where(rng.random(pulls) < prob[columns], columns, alias[columns])
+
+    # 区分の中では均等に選ぶ（引いた学者を除く処理は、長く引いたときの割合を変えない）
+    counts = {}
+    for bucket, members in enumerate(table["members"]):
+        hits = int(np.count_nonzero(buckets == bucket))
+        picks = np.bincount(rng.integers(len(members), size=hits), minlength=len(members))
+        counts.update({position: int(count) for position, count in zip(members, picks)})
+    return counts
+
+def check_filter(name, table, entries, positions, config, pulls, seed=None, sigma=5.0):
+    """設定から求めた確率と、シミュレーションの割合を比べる（ずれが sigma 標準偏差を超えたものを返す）"""
+    counts = simulate(table, pulls, seed)
+    expected = {}
+    for bucket, members, weight in bucket_weights(entries, positions, config):
+        for position in members:
+            expected[position] = (bucket, weight / len(members))
+
+    def deviation(observed, p):
+        tolerance = sigma * math.sqrt(max(p * (1 - p), 0) / pulls) + 10 ** -PROB_DIGITS
+        return abs(observed / pulls - p), tolerance
+
+    rows = []
+    failures = []
+    by_bucket = {}
+    for position, (bucket, p) in expected.items():
+        observed, p_bucket = by_bucket.get(bucket, (0, 0.0))
+        by_bucket[bucket] = (observed + counts.get(position, 0), p_bucket + p)
+        diff, tolerance = deviation(counts.get(position, 0), p)
+        if diff > tolerance:
+            failures.append(f"{name}: {entries[position]['id']} {counts.get(position, 0) / pulls:.5f}（期待値 {p:.5f}）")
+    for bucket, (observed, p) in by_bucket.items():
+        diff, tolerance = deviation(observed, p)
+        rows.append((bucket, observed / pulls, p))
+        if diff > tolerance:
+            failures.append(f"{name}: 区分 {bucket} {observed / pulls:.5f}（期待値 {p:.5f}）")
+    return rows, failures
+
+def main():
+    parser = argparse.ArgumentParser(description="ガチャの排出率をシミュレーションで確認")
+    parser.add_argument("--index", default=str(INDEX_PATH), help=f"確認する索引（既定: {INDEX_PATH}）")
+    parser.add_argument("--config", default=str(CONFIG_PATH), help=f"排出率の設定（既定: {CONFIG_PATH}）")
+    parser.add_argument("--pulls", type=int, default=1_000_000, help="絞り込みごとに引く回数（既定: 1000000）")
+    parser.add_argument("--filter", nargs="+", default=["all"], help="確認する絞り込み（既定: all）")
+    parser.add_argument("--all-filters", action="store_true", help="すべての絞り込みを確認")
+    parser.add_argument("--guaranteed", action="store_true", help="10連ガチャの保証枠の表を確認")
+    parser.add_argument("--seed", type=int, help="乱数のシード")
+    args = parser.parse_args()
+
+    with open(args.index, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    config = load_config(args.config)
+    entries = index["scholars"]
+    filters = {"all": list(range(len(entries))), **index["byRarity"], **index["byTag"]}
+    tables = index["draw"]
+    if args.guaranteed:
+        filters = guaranteed_filters(entries, filters, config)
+        tables = index["guaranteed"]["draw"]
+    names = list(filters) if args.all_filters else args.filter
+
+    start_time = time.time()
+    failures = []
+    checked = 0
+    for name in names:
+        if name not in filters:
+            print(f"{name}: 該当する学者がいません")
+            failures.append(f"{name}: 該当なし")
+            continue
+        table = tables.get(name) or uniform_table(name, filters[name])
+        rows, filter_failures = check_filter(name, table, entries, filters[name], config, args.pulls, args.seed)
+        failures.extend(filter_failures)
+        checked += 1
+        if not args.all_filters:
+            print(f"\n{name}（{args.pulls:,}回）")
+            for bucket, observed, p in rows:
+                print(f"  {bucket:<5} {observed * 100:8.3f}%（期待値 {p * 100:.3f}%）")
+
+    elapsed_time = time.time() - start_time
+    print("\n===== 処理結果サマリー =====")
+    print(f"確認した絞り込み: {checked}件（各 {args.pulls:,}回）")
+    print(f"期待値からずれたもの: {len(failures)}件")
+    for failure in failures[:20]:
+        print(f"  {failure}")
+    print(f"所要時間: {elapsed_time:.1f}秒")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
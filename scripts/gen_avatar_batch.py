@@ -15,15 +15,21 @@
 - 既存の画像は上書きされません
 """
 
-import json, os, time, base64
+import json, os, sys, time, base64
 from pathlib import Path
-import requests
-from openai import OpenAI
 
-# OpenAI APIクライアントの初期化
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import asset_manifest, scholar_schema
+from scripts.lazy_import import lazy_import
+
+# 重いライブラリは使うときに読み込む
+requests = lazy_import("requests")
+openai = lazy_import("openai")
+
+# OpenAI APIクライアント（get_client() の初回の呼び出し時に作成）
+_client = None
 OUT_DIR = Path("avatars")
-OUT_DIR.mkdir(exist_ok=True)
 
 # 学者の画像を生成するためのプロンプトテンプレート
 # 必要に応じてカスタマイズしてください
@@ -33,25 +39,29 @@ PROMPT_TEMPLATE = (
     "No text, no watermark."
 )
 
-def generate_and_save(record):
-    """学者の画像を生成し、avatarsディレクトリに保存する"""
-    # すでに画像が存在する場合はそのパスを返す
-    img_path = OUT_DIR / f"{record['id']}.png"
-    if img_path.exists():
-        print(f"画像が存在するのでスキップ: {img_path}")
-        return str(img_path)
-        
+# 画像生成モデル
+IMAGE_MODEL = "dall-e-3"
+
+def get_client():
+    """OpenAI APIクライアントを返す（初回の呼び出し時に環境変数のAPIキーで作成）"""
+    global _client
+    if _client is None:
+        _client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+def generate_image_data(record):
+    """学者の画像を生成し、画像データ（バイト列）を返す（失敗した場合はNone）"""
     # 生成用プロンプトの作成
     prompt = PROMPT_TEMPLATE.format(name_en=record["name"]["en"])
     print(f"画像生成: {record['name']['en']}")
     
     try:
         # OpenAI APIを呼び出して画像を生成
-        response = client.images.generate(
-            model="dall-e-3",  # GPT-image-1または他の適切なモデル
+        response = get_client().images.generate(
+            model=IMAGE_MODEL,
             prompt=prompt,
             size="1024x1024",
-            quality="medium",
+            quality="standard",
             n=1
         )
         
@@ -59,30 +69,48 @@ def generate_and_save(record):
         image_url = response.data[0].url
         print(f"画像URL: {image_url}")
         
-        with requests.get(image_url, stream=True) as r:
+        with requests.get(image_url, timeout=30) as r:
             r.raise_for_status()
-            with open(img_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        
-        print(f"画像保存完了: {img_path}")
-        time.sleep(1)  # APIレート制限対策
-        
-        return str(img_path)
+            return r.content
     
     except Exception as e:
         print(f"画像生成エラー: {e}")
         return None
 
+def generate_and_save(record):
+    """学者の画像を生成し、avatarsディレクトリに保存する"""
+    # すでに画像が存在する場合はそのパスを返す
+    img_path = asset_manifest.get_path(record['id'], asset_manifest.AVATAR)
+    if img_path:
+        print(f"画像が存在するのでスキップ: {img_path}")
+        return str(img_path)
+    OUT_DIR.mkdir(exist_ok=True)
+    img_path = OUT_DIR / f"{record['id']}.png"
+    
+    image_data = generate_image_data(record)
+    if not image_data:
+        return None
+    
+    with open(img_path, "wb") as f:
+        f.write(image_data)
+    asset_manifest.record_asset(record['id'], asset_manifest.AVATAR, img_path)
+    
+    print(f"画像保存完了: {img_path}")
+    time.sleep(1)  # APIレート制限対策
+    
+    return str(img_path)
+
 # メイン処理
 def main():
     print("学者データの読み込み開始")
     try:
-        with open("scholars.json", "r", encoding="utf-8") as f:
-            scholars = json.load(f)
+        scholars = scholar_schema.load_scholars("scholars.json")
         
         print(f"データ読み込み完了: {len(scholars)}人の学者")
         
+        # 既存のアバター画像をアセットマニフェストに取り込む
+        asset_manifest.refresh()
+        
         changed = False
         for idx, record in enumerate(scholars):
             print(f"\n処理中: {idx+1}/{len(scholars)} - {record['name']['ja']}")
@@ -97,8 +125,7 @@ def main():
         
         if changed:
             print("\nJSONファイルを更新します")
-            with open("scholars.json", "w", encoding="utf-8") as f:
-                json.dump(scholars, f, ensure_ascii=False, indent=2)
+            scholar_schema.save_scholars("scholars.json", scholars)
             print("JSON更新完了")
         else:
             print("\n変更はありませんでした")
@@ -13,41 +13,75 @@ import json
 import os
 import time
 import base64
-import csv
 from pathlib import Path
-import io
-import requests
-from bs4 import BeautifulSoup
-from PIL import Image
-from io import BytesIO
-import google.genai as genai
-from google.genai import types
-
-# Google Gemini APIクライアントの初期化
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    # APIキーが環境変数にない場合は、ここに直接入力してください
-    api_key = "your_api_key_here"
-    if api_key == "your_api_key_here":
-        print("警告: Google APIキーが設定されていません。")
-        print("スクリプト内の'your_api_key_here'を実際のAPIキーに書き換えるか、")
-        print("環境変数GOOGLE_API_KEYを設定してください。")
+import threading
+from urllib.parse import unquote, urlsplit
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import photo_status_store, avatar_cache, reference_preprocess, asset_manifest, ingest_reference_photos, scholar_schema
+from scripts.lazy_import import lazy_import
+
+# 重いライブラリは使うときに読み込む（他のスクリプトから関数だけを使う場合に読み込みの時間がかからないように）
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
+genai = lazy_import("google.genai")
+
+# APIキーが環境変数にない場合は、ここに直接入力してください
+DEFAULT_API_KEY = "your_api_key_here"
 
 # Wikipediaリクエスト用のUser-Agentヘッダー
 USER_AGENT = 'Epi-Gacha/1.0 (https://github.com/SRWS-PSG/epi-gacha; youkiti@gmail.com) Python/3.x requests/2.x'
 
-client = genai.Client(api_key=api_key)
+# Google Gemini APIクライアント（get_client() の初回の呼び出し時に作成）
+_client = None
+_client_lock = threading.Lock()
 
-# 出力ディレクトリの設定
+# 出力ディレクトリの設定（書き込むときに作成）
 OUT_DIR = Path("avatars")
-OUT_DIR.mkdir(exist_ok=True)
 
 # 参照画像用ディレクトリの設定
 REF_DIR = Path("reference_photos")
-REF_DIR.mkdir(exist_ok=True)
 
-# 画像が見つからなかった学者の情報を記録するCSVファイル
-MISSING_PHOTOS_CSV = Path("missing_photos.csv")
+# 画像が見つからなかった学者の情報を記録するCSVファイル（状態ストアから書き出される）
+MISSING_PHOTOS_CSV = photo_status_store.MISSING_PHOTOS_CSV
+
+# Wikimedia Commons API（imageinfoの一括取得用）
+COMMONS_API_URL = "https://commons.wikimedia.org/w/api.php"
+# 1回のクエリで指定できるタイトル数の上限（匿名アクセス時）
+COMMONS_TITLES_PER_QUERY = 50
+# 参照画像として取得するサムネイルの幅（原寸の巨大画像を避ける）
+COMMONS_THUMB_WIDTH = 1024
+# 参照画像として扱うMIMEタイプ（SVGなどの図版は除外）
+COMMONS_IMAGE_MIME_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp')
+
+def get_client():
+    """Google Gemini APIクライアントを返す（初回の呼び出し時に環境変数のAPIキーで作成）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            api_key = os.getenv("GOOGLE_API_KEY") or DEFAULT_API_KEY
+            if api_key == "your_api_key_here":
+                print("警告: Google APIキーが設定されていません。")
+                print("スクリプト内の'your_api_key_here'を実際のAPIキーに書き換えるか、")
+                print("環境変数GOOGLE_API_KEYを設定してください。")
+            _client = genai.Client(api_key=api_key)
+        return _client
+
+def reset_client():
+    """APIキーを設定し直した場合に、次の get_client() でクライアントを作り直す"""
+    global _client
+    with _client_lock:
+        _client = None
+
+def ensure_dirs():
+    """出力ディレクトリと参照画像用ディレクトリを作成"""
+    OUT_DIR.mkdir(exist_ok=True)
+    REF_DIR.mkdir(exist_ok=True)
+
+# imageinfoの取得結果キャッシュ（タイトル -> imageinfo、見つからない場合はNone）
+_commons_imageinfo_cache = {}
 
 # イラスト生成用のプロンプトテンプレート
 PROMPT_TEMPLATE = (
@@ -79,7 +113,7 @@ def describe_person_from_url(url, name_en):
         response.raise_for_status()
         
         # HTMLからテキストを抽出
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = bs4.BeautifulSoup(response.content, 'html.parser')
         
         # タイトルとメタディスクリプションを取得
         title = soup.title.string if soup.title else ""
@@ -188,21 +222,108 @@ def get_scholar_description(scholar):
         return f"A portrait of {name_en}, a distinguished academic figure."
 
 def download_reference_image(url):
-    """URLから画像をダウンロードする"""
-    try:
-        headers = {'User-Agent': USER_AGENT}
-        response = requests.get(url, stream=True, timeout=10, headers=headers)
-        response.raise_for_status()
-        img = Image.open(io.BytesIO(response.content))
+    """URLから画像をダウンロードする（上限サイズ付きのストリーミング、JPEGは縮小デコード）"""
+    return reference_preprocess.download_reference_image(url, USER_AGENT)
+
+def collect_commons_file_titles(soup):
+    """ページ内のFile:リンクから候補となる画像ファイルのタイトルを出現順に収集"""
+    titles = []
+    seen = set()
+    for link in soup.find_all('a', href=True):
+        # 日本語版のリンクはパーセントエンコードされているためデコードしてから判定
+        href = unquote(urlsplit(link['href']).path)
+        if 'File:' in href:
+            filename = href.split('File:')[-1]
+        elif 'ファイル:' in href:
+            filename = href.split('ファイル:')[-1]
+        else:
+            continue
         
-        if img.format == 'GIF' or img.mode == 'P':
-            img = img.convert('RGB')
-            
-        print(f"Reference image downloaded: {img.format} {img.size} (mode: {img.mode})")
-        return img
-    except Exception as e:
-        print(f"Error downloading reference image: {e}")
+        if not any(filename.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif']):
+            continue
+        
+        title = f"File:{filename.replace('_', ' ')}"
+        if title not in seen:
+            seen.add(title)
+            titles.append(title)
+    return titles
+
+def fetch_commons_imageinfo(titles):
+    """Commons APIのimageinfoを複数タイトルまとめて取得する
+    
+    1回のクエリで最大COMMONS_TITLES_PER_QUERY件を解決し、結果はキャッシュするため、
+    複数の学者のページから集めたタイトルを一度に渡して先読みすることもできる。
+    
+    Returns:
+        タイトル -> {"url", "thumburl", "width", "height", "mime"} の辞書
+        （ファイルが存在しないタイトルは含まない）
+    """
+    pending = [t for t in dict.fromkeys(titles) if t not in _commons_imageinfo_cache]
+    headers = {'User-Agent': USER_AGENT}
+    
+    for i in range(0, len(pending), COMMONS_TITLES_PER_QUERY):
+        chunk = pending[i:i + COMMONS_TITLES_PER_QUERY]
+        params = {
+            'action': 'query',
+            'format': 'json',
+            'formatversion': '2',
+            'prop': 'imageinfo',
+            'iiprop': 'url|size|mime',
+            'iiurlwidth': COMMONS_THUMB_WIDTH,
+            'titles': '|'.join(chunk),
+        }
+        try:
+            response = requests.get(COMMONS_API_URL, params=params, timeout=10, headers=headers)
+            response.raise_for_status()
+            query = response.json().get('query', {})
+        except Exception as e:
+            print(f"Commons API error: {e}")
+            continue
+        
+        # APIが正規化したタイトルを元のタイトルに対応付ける
+        original_titles = {t: t for t in chunk}
+        for item in query.get('normalized', []):
+            original_titles[item['to']] = item['from']
+        
+        for page in query.get('pages', []):
+            title = original_titles.get(page.get('title'), page.get('title'))
+            info = (page.get('imageinfo') or [None])[0]
+            if page.get('missing') or not info:
+                _commons_imageinfo_cache[title] = None
+                continue
+            _commons_imageinfo_cache[title] = {
+                'url': info.get('url'),
+                'thumburl': info.get('thumburl'),
+                'width': info.get('width', 0),
+                'height': info.get('height', 0),
+                'mime': info.get('mime', ''),
+            }
+        
+        # 応答に含まれなかったタイトルも再問い合わせしないよう記録
+        for title in chunk:
+            _commons_imageinfo_cache.setdefault(title, None)
+    
+    return {t: _commons_imageinfo_cache[t] for t in titles if _commons_imageinfo_cache.get(t)}
+
+def select_best_commons_image(titles, imageinfo):
+    """imageinfoの中から顔写真として最も適した画像のURLを選ぶ
+    
+    ラスター画像で一定サイズ以上のものに絞り、縦長〜正方形（肖像写真らしい比率）を優先し、
+    同条件ならページ内での出現順（infobox付近が先）を優先する。
+    """
+    candidates = []
+    for order, title in enumerate(titles):
+        info = imageinfo.get(title)
+        if not info or info['mime'] not in COMMONS_IMAGE_MIME_TYPES:
+            continue
+        if info['width'] <= 100 or info['height'] <= 100:
+            continue
+        landscape = info['width'] > info['height'] * 1.2
+        candidates.append((landscape, order, info.get('thumburl') or info['url']))
+    
+    if not candidates:
         return None
+    return min(candidates)[2]
 
 def extract_image_from_webpage(url):
     """WebページからWikipediaの顔写真を抽出する"""
@@ -212,7 +333,7 @@ def extract_image_from_webpage(url):
         response = requests.get(url, timeout=10, headers=headers)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = bs4.BeautifulSoup(response.content, 'html.parser')
         
         # Wikipediaの場合は特別な処理
         if "wikipedia" in url.lower():
@@ -245,31 +366,16 @@ def extract_image_from_webpage(url):
                         print(f"Found image in article body: {src}")
                         return src
             
-            # 方法3: Wikipediaの画像ファイル名からCommons URLを作成
-            # 例: File:Paul_Rosenbaum.jpg -> https://commons.wikimedia.org/wiki/File:Paul_Rosenbaum.jpg
-            file_links = soup.select('a[href*="File:"], a[href*="ファイル:"]')
-            for link in file_links:
-                href = link.get('href', '')
-                if 'File:' in href or 'ファイル:' in href:
-                    # ファイル名を抽出
-                    filename = href.split('File:')[-1] if 'File:' in href else href.split('ファイル:')[-1]
-                    if '.' in filename and any(ext in filename.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif']):
-                        commons_url = f"https://commons.wikimedia.org/wiki/File:{filename}"
-                        try:
-                            # Commonsページにアクセス
-                            headers = {'User-Agent': USER_AGENT}
-                            commons_response = requests.get(commons_url, timeout=10, headers=headers)
-                            commons_soup = BeautifulSoup(commons_response.content, 'html.parser')
-                            # 画像URLを取得
-                            img = commons_soup.select_one('.fullImageLink img')
-                            if img and img.get('src'):
-                                img_src = img.get('src')
-                                if not img_src.startswith('http'):
-                                    img_src = 'https:' + img_src if img_src.startswith('//') else 'https://commons.wikimedia.org' + img_src
-                                print(f"Found image via Commons: {img_src}")
-                                return img_src
-                        except Exception as e:
-                            print(f"Commons access error: {e}")
+            # 方法3: ページ内のFile:リンクをまとめてCommons APIで解決
+            # 例: File:Paul_Rosenbaum.jpg -> imageinfo（URL・サイズ・MIMEタイプ）
+            file_titles = collect_commons_file_titles(soup)
+            if file_titles:
+                print(f"Resolving {len(file_titles)} file links via Commons API")
+                imageinfo = fetch_commons_imageinfo(file_titles)
+                img_src = select_best_commons_image(file_titles, imageinfo)
+                if img_src:
+                    print(f"Found image via Commons: {img_src}")
+                    return img_src
         
         # 一般的なページからプロフィール画像のように見える画像を探す
         candidate_imgs = []
@@ -304,113 +410,56 @@ def extract_image_from_webpage(url):
         return None
 
 def check_reference_photo(scholar_id):
-    """参照画像フォルダ内にIDに対応する画像があるか確認"""
-    # サポートされる画像形式
-    extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
-    
-    for ext in extensions:
-        ref_path = REF_DIR / f"{scholar_id}{ext}"
-        if ref_path.exists():
-            print(f"Found manual reference photo: {ref_path}")
-            return ref_path
+    """参照画像フォルダ内にIDに対応する画像があるか確認（アセットマニフェストを参照）"""
+    ref_path = asset_manifest.get_path(scholar_id, asset_manifest.MANUAL_REFERENCE)
+    if ref_path:
+        print(f"Found manual reference photo: {ref_path}")
+        return ref_path
     
     print(f"No manual reference photo found for {scholar_id}")
     return None
 
 def add_to_missing_photos_csv(scholar_id, name_en, name_ja, source_url=None, status="missing"):
-    """学者の情報をCSVに追記（画像がない場合だけでなく、処理状況も記録）
+    """学者の処理状況を状態ストアに記録（画像がない場合だけでなく、処理状況も記録）
     
     status:
     - "missing": 画像が見つからず、手動での追加が必要
     - "manual_added": 手動で参照画像が追加済み
     - "generated": アバター生成成功
-    """
-    # CSVファイルが存在するか確認
-    file_exists = MISSING_PHOTOS_CSV.exists()
-    
-    # ヘッダー情報の定義（新しい形式）
-    headers = ['scholar_id', 'name_en', 'name_ja', 'search_url', 'status']
     
-    # 既存のエントリとヘッダー情報を読み込む
-    existing_data = {}
-    existing_headers = None
-    if file_exists:
-        try:
-            with open(MISSING_PHOTOS_CSV, 'r', encoding='utf-8', newline='') as f:
-                reader = csv.reader(f)
-                # ヘッダー行を読み込む
-                existing_headers = next(reader, headers)
-                
-                # ヘッダーが古い形式の場合（statusがない）
-                if len(existing_headers) < len(headers):
-                    existing_headers = headers
-                
-                # データ行を読み込む
-                for row in reader:
-                    if row and len(row) > 0:
-                        # 古い形式のデータ行の場合、statusカラムを追加
-                        if len(row) < len(headers):
-                            row.append("missing")
-                        
-                        # 辞書に格納（IDをキーとして）
-                        existing_data[row[0]] = row
-        except Exception as e:
-            print(f"Warning: Error reading existing CSV: {e}")
-    
-    # データを準備
-    new_row = [scholar_id, name_en, name_ja, source_url or '', status]
+    missing_photos.csvへの反映はphoto_status_store.export_csv()でまとめて行う。
+    """
+    photo_status_store.upsert_status(scholar_id, name_en, name_ja, source_url, status)
+
+def update_missing_photos_csv(entries):
+    """複数学者の処理状況をまとめて状態ストアに記録し、missing_photos.csvに書き出す
     
-    # CSVを更新（既存エントリの更新または新規追加）
-    try:
-        mode = 'w'  # 書き換えモード
-        with open(MISSING_PHOTOS_CSV, mode, encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            
-            # ヘッダー行を書き込む
-            writer.writerow(existing_headers if existing_headers else headers)
-            
-            # 既存データをアップデート
-            if scholar_id in existing_data:
-                existing_data[scholar_id] = new_row
-                print(f"Updated {name_en} ({scholar_id}) in {MISSING_PHOTOS_CSV.name} with status: {status}")
-            else:
-                existing_data[scholar_id] = new_row
-                print(f"Added {name_en} ({scholar_id}) to {MISSING_PHOTOS_CSV.name} with status: {status}")
-            
-            # 全データを書き込む
-            for row in existing_data.values():
-                writer.writerow(row)
-    except Exception as e:
-        print(f"Error updating {MISSING_PHOTOS_CSV.name}: {e}")
+    entries: (scholar_id, name_en, name_ja, source_url, status) のリスト
+    """
+    photo_status_store.upsert_statuses(entries)
+    photo_status_store.export_csv()
 
 def generate_avatar_from_reference_image(name_en, reference_image_path):
     """参照画像をもとにアバター画像を生成"""
     try:
         # プロンプトの作成
-        prompt = f"""
-        Create a flat pastel portrait of {name_en} based on the reference image.
-        
-        Style guidelines:
-        - Facing forward
-        - 4-colour palette
-        - Thick outline
-        - Solid background
-        - Simple, stylized cartoon illustration
-        - No text or watermarks
-        """
+        prompt = avatar_cache.build_avatar_prompt(name_en)
         
         print(f"Generating avatar with reference image using Gemini")
         
-        # 画像を開く
-        image = Image.open(reference_image_path)
+        # 参照画像を用意（取り込み済みなら正規化済みの画像、未取り込みならここで前処理）
+        image_bytes, mime_type = reference_preprocess.prepare_reference(
+            reference_image_path, avatar_cache.GEMINI_IMAGE_MODEL
+        )
+        print(f"参照画像を前処理しました: {len(image_bytes) // 1024}KB")
+        image = genai.types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
         
         # Geminiモデルを使用して画像生成
-        model = "gemini-2.0-flash-exp-image-generation"
         try:
-            response = client.models.generate_content(
-                model=model,
+            response = get_client().models.generate_content(
+                model=avatar_cache.GEMINI_IMAGE_MODEL,
                 contents=[prompt, image],
-                config=types.GenerateContentConfig(
+                config=genai.types.GenerateContentConfig(
                     response_modalities=['TEXT', 'IMAGE']
                 )
             )
@@ -442,6 +491,83 @@ def generate_avatar_from_reference_image(name_en, reference_image_path):
         print(f"Error generating avatar with Gemini: {e}")
         return None
 
+def resolve_reference_image(scholar):
+    """学者の参照画像を用意する（手動参照画像 → ソースURLから取得の順）
+    
+    CSVへの記録は行わず、記録すべき状態を返す（バッチ処理でまとめて反映できるように）。
+    
+    Returns:
+        (reference_image_path, source_url, status)
+        - reference_image_path: 参照画像のパス（用意できなかった場合はNone）
+        - status: "manual_added" / "missing"、Webから取得できた場合はNone
+    """
+    scholar_id = scholar['id']
+    
+    # まず手動で追加された参照画像をチェック
+    manual_ref_path = check_reference_photo(scholar_id)
+    if manual_ref_path:
+        print(f"Using manual reference photo from: {manual_ref_path}")
+        return manual_ref_path, None, "manual_added"
+    
+    # 手動参照画像がなければウェブから取得を試みる
+    if not scholar.get('sources') or len(scholar['sources']) == 0:
+        print(f"No source URLs found for scholar {scholar_id}")
+        return None, None, "missing"
+    
+    source_url = scholar['sources'][0]
+    print(f"Using source URL: {source_url}")
+    
+    # URLから顔写真を抽出
+    img_url = extract_image_from_webpage(source_url)
+    if not img_url:
+        print(f"Could not extract image from webpage.")
+        return None, source_url, "missing"
+    
+    # 顔写真をダウンロードして保存
+    temp_img_path = OUT_DIR / f"{scholar_id}_reference.jpg"
+    img = download_reference_image(img_url)
+    if not img:
+        print(f"Failed to download reference image.")
+        return None, source_url, "missing"
+    
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    OUT_DIR.mkdir(exist_ok=True)
+    img.save(temp_img_path)
+    asset_manifest.record_asset(scholar_id, asset_manifest.REFERENCE, temp_img_path)
+    # 生成時に変換しないよう、保存した時点で正規化済みの参照画像を作る
+    ingest_reference_photos.ingest_file(scholar_id, temp_img_path)
+    print(f"Saved reference image to {temp_img_path}")
+    return temp_img_path, source_url, None
+
+def save_avatar_data(scholar_id, avatar_data):
+    """生成されたアバター画像データを保存してパスを返す"""
+    avatar_path = OUT_DIR / f"{scholar_id}.png"
+    try:
+        # base64エンコードされているか確認
+        if isinstance(avatar_data, str) and avatar_data.startswith(('data:image', 'iVBOR', '/9j/')):
+            # base64エンコードされた文字列からプレフィックスを削除
+            if avatar_data.startswith('data:image'):
+                # 例: 'data:image/png;base64,iVBORw0...' -> 'iVBORw0...'
+                avatar_data = avatar_data.split(',', 1)[1]
+            print("Base64エンコードされたデータをデコードします")
+            avatar_data = base64.b64decode(avatar_data)
+        
+        # バイナリデータとして書き込み
+        OUT_DIR.mkdir(exist_ok=True)
+        with open(avatar_path, "wb") as f:
+            f.write(avatar_data)
+        asset_manifest.record_asset(scholar_id, asset_manifest.AVATAR, avatar_path)
+        print(f"画像を保存しました：{avatar_path}")
+    except Exception as e:
+        print(f"画像の保存中にエラーが発生しました: {e}")
+        print(f"データタイプ: {type(avatar_data)}")
+        if isinstance(avatar_data, str) and len(avatar_data) > 100:
+            print(f"データの先頭: {avatar_data[:100]}...")
+        raise
+    
+    return avatar_path
+
 def debug_generate_from_photo(scholar_id):
     """特定学者のソースURLから顔写真を取得し、イラスト化するデバッグ関数"""
     # 1. スキーマから指定IDの学者データを取得
@@ -455,91 +581,36 @@ def debug_generate_from_photo(scholar_id):
     
     print(f"Processing scholar: {name_en} ({scholar_id})")
     
-    # 2. 参照画像を取得するソースをチェック
-    reference_image_path = None
-    source_url = None
+    # 2. 参照画像を用意（手動参照画像 → ソースURLから取得）
+    reference_image_path, source_url, status = resolve_reference_image(scholar)
+    if status:
+        add_to_missing_photos_csv(scholar_id, name_en, name_ja, source_url, status)
     
-    # 2.1 まず手動で追加された参照画像をチェック
-    manual_ref_path = check_reference_photo(scholar_id)
-    if manual_ref_path:
-        reference_image_path = manual_ref_path
-        print(f"Using manual reference photo from: {manual_ref_path}")
-        # 手動参照画像が見つかったことを記録
-        add_to_missing_photos_csv(scholar_id, name_en, name_ja, None, "manual_added")
-    
-    # 2.2 手動参照画像がなければウェブから取得を試みる
     if not reference_image_path:
-        if not scholar.get('sources') or len(scholar['sources']) == 0:
-            print(f"No source URLs found for scholar {scholar_id}")
-            # missing_photos.csvに追記
-            add_to_missing_photos_csv(scholar_id, name_en, name_ja)
-            print(f"Please add a reference photo for {name_en} to {REF_DIR}")
-            return None
-        else:
-            source_url = scholar['sources'][0]
-            print(f"Using source URL: {source_url}")
-            
-            # URLから顔写真を抽出
-            img_url = extract_image_from_webpage(source_url)
-            if not img_url:
-                print(f"Could not extract image from webpage.")
-                # missing_photos.csvに追記
-                add_to_missing_photos_csv(scholar_id, name_en, name_ja, source_url)
-                print(f"Please add a reference photo for {name_en} to {REF_DIR}")
-                return None
-            else:
-                # 顔写真をダウンロードして一時ファイルに保存
-                temp_img_path = OUT_DIR / f"{scholar_id}_reference.jpg"
-                img = download_reference_image(img_url)
-                if not img:
-                    print(f"Failed to download reference image.")
-                    add_to_missing_photos_csv(scholar_id, name_en, name_ja, source_url)
-                    print(f"Please add a reference photo for {name_en} to {REF_DIR}")
-                    return None
-                else:
-                    if img.mode != 'RGB':
-                        img = img.convert('RGB')
-                    img.save(temp_img_path)
-                    print(f"Saved reference image to {temp_img_path}")
-                    reference_image_path = temp_img_path
+        print(f"Please add a reference photo for {name_en} to {REF_DIR}")
+        return None
     
-    # 参照画像が存在する場合、アバター生成を実行
-    if reference_image_path:
-        # 参照画像をもとにイラスト生成
-        avatar_data = generate_avatar_from_reference_image(name_en, reference_image_path)
-        if not avatar_data:
-            print(f"Failed to generate avatar from reference.")
-            return None
-        
-        # 結果を保存
-        avatar_path = OUT_DIR / f"{scholar_id}.png"
-        try:
-            # base64エンコードされているか確認
-            if isinstance(avatar_data, str) and avatar_data.startswith(('data:image', 'iVBOR', '/9j/')):
-                # base64エンコードされた文字列からプレフィックスを削除
-                if avatar_data.startswith('data:image'):
-                    # 例: 'data:image/png;base64,iVBORw0...' -> 'iVBORw0...'
-                    avatar_data = avatar_data.split(',', 1)[1]
-                print("Base64エンコードされたデータをデコードします")
-                avatar_data = base64.b64decode(avatar_data)
-            
-            # バイナリデータとして書き込み
-            with open(avatar_path, "wb") as f:
-                f.write(avatar_data)
-            print(f"画像を保存しました：{avatar_path}")
-        except Exception as e:
-            print(f"画像の保存中にエラーが発生しました: {e}")
-            print(f"データタイプ: {type(avatar_data)}")
-            if isinstance(avatar_data, str) and len(avatar_data) > 100:
-                print(f"データの先頭: {avatar_data[:100]}...")
-            raise
-        
-        print(f"Successfully generated and saved avatar to {avatar_path}")
-        # アバター生成成功を記録
-        add_to_missing_photos_csv(scholar_id, name_en, name_ja, source_url, "generated")
+    # 参照画像・プロンプト・モデルが前回の生成時から変わっていなければ再生成しない
+    prompt = avatar_cache.build_avatar_prompt(name_en)
+    avatar_path = OUT_DIR / f"{scholar_id}.png"
+    if avatar_cache.is_current(avatar_path, reference_image_path, prompt, avatar_cache.GEMINI_IMAGE_MODEL):
+        print(f"入力に変更がないため生成をスキップ: {avatar_path}")
         return avatar_path
     
-    return None
+    # 3. 参照画像をもとにイラスト生成
+    avatar_data = generate_avatar_from_reference_image(name_en, reference_image_path)
+    if not avatar_data:
+        print(f"Failed to generate avatar from reference.")
+        return None
+    
+    # 4. 結果を保存
+    avatar_path = save_avatar_data(scholar_id, avatar_data)
+    avatar_cache.write_meta(avatar_path, reference_image_path, prompt, avatar_cache.GEMINI_IMAGE_MODEL)
+    
+    print(f"Successfully generated and saved avatar to {avatar_path}")
+    # アバター生成成功を記録
+    add_to_missing_photos_csv(scholar_id, name_en, name_ja, source_url, "generated")
+    return avatar_path
 
 if __name__ == "__main__":
     # APIキーがない場合は入力を求める
@@ -548,11 +619,16 @@ if __name__ == "__main__":
         print("Google APIキーが設定されていません。")
         api_key = input("Google APIキーを入力してください: ").strip()
         os.environ["GOOGLE_API_KEY"] = api_key
-        client = genai.Client(api_key=api_key)
+        reset_client()
+    ensure_dirs()
 
+    # 手動で追加された参照画像などをアセットマニフェストに取り込む
+    asset_manifest.refresh()
+    
     # デバッグテスト - ポール・ローゼンバウムの画像を生成
     scholar_id = "rosenbaum2025"
     avatar_path = debug_generate_from_photo(scholar_id)
+    photo_status_store.export_csv()
     
     if avatar_path:
         print(f"\nDebug test completed successfully. Avatar saved to {avatar_path}")
@@ -560,16 +636,14 @@ if __name__ == "__main__":
         # 成功した場合、JSONを更新するか尋ねる
         update_json = input("\nscholars_enhanced.jsonにアバターパスを更新しますか？ (y/n): ").strip().lower()
         if update_json == 'y':
-            with open("scholars_enhanced.json", "r", encoding="utf-8") as f:
-                scholars = json.load(f)
+            scholars = scholar_schema.load_scholars("scholars_enhanced.json")
                 
             for scholar in scholars:
                 if scholar["id"] == scholar_id:
                     scholar["avatar"] = str(avatar_path)
                     break
                     
-            with open("scholars_enhanced.json", "w", encoding="utf-8") as f:
-                json.dump(scholars, f, ensure_ascii=False, indent=2)
+            scholar_schema.save_scholars("scholars_enhanced.json", scholars)
             
             print(f"scholars_enhanced.jsonを更新しました")
     else:
@@ -15,31 +15,36 @@ GPT-image-1モデルを使用するには、OpenAIの組織認証が必要です
 
 import json
 import os
+import sys
 import time
 import base64
 from pathlib import Path
 import io
-import requests
-from bs4 import BeautifulSoup
-from PIL import Image
-from openai import OpenAI
+import threading
 
-# OpenAI APIクライアントの初期化
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    # APIキーが環境変数にない場合は、ここに直接入力してください
-    api_key = "your_api_key_here"
-    if api_key == "your_api_key_here":
-        print("警告: OpenAI APIキーが設定されていません。")
-        print("スクリプト内の'your_api_key_here'を実際のAPIキーに書き換えるか、")
-        print("環境変数OPENAI_API_KEYを設定してください。")
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import avatar_cache, reference_preprocess, asset_manifest, ingest_reference_photos, scholar_schema
+from scripts.lazy_import import lazy_import
+
+# 重いライブラリは使うときに読み込む
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
+Image = lazy_import("PIL.Image")
+openai = lazy_import("openai")
+
+# APIキーが環境変数にない場合は、ここに直接入力してください
+DEFAULT_API_KEY = "your_api_key_here"
 
 # Wikipediaリクエスト用のUser-Agentヘッダー
 USER_AGENT = 'Epi-Gacha/1.0 (https://github.com/SRWS-PSG/epi-gacha; youkiti@gmail.com) Python/3.x requests/2.x'
 
-client = OpenAI(api_key=api_key)
+# OpenAI APIクライアント（get_client() の初回の呼び出し時に作成）
+_client = None
+_client_lock = threading.Lock()
+
+# 出力ディレクトリ（書き込むときに作成）
 OUT_DIR = Path("avatars")
-OUT_DIR.mkdir(exist_ok=True)
 
 # イラスト生成用のプロンプトテンプレート
 PROMPT_TEMPLATE = (
@@ -49,6 +54,25 @@ PROMPT_TEMPLATE = (
     "but simplify into a stylized cartoon illustration. No text, no watermark."
 )
 
+def get_client():
+    """OpenAI APIクライアントを返す（初回の呼び出し時に環境変数のAPIキーで作成）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            api_key = os.getenv("OPENAI_API_KEY") or DEFAULT_API_KEY
+            if api_key == "your_api_key_here":
+                print("警告: OpenAI APIキーが設定されていません。")
+                print("スクリプト内の'your_api_key_here'を実際のAPIキーに書き換えるか、")
+                print("環境変数OPENAI_API_KEYを設定してください。")
+            _client = openai.OpenAI(api_key=api_key)
+        return _client
+
+def reset_client():
+    """APIキーを設定し直した場合に、次の get_client() でクライアントを作り直す"""
+    global _client
+    with _client_lock:
+        _client = None
+
 def get_scholar_by_id(scholar_id):
     """scholars_enhanced.jsonから指定IDの学者データを取得"""
     try:
@@ -71,7 +95,7 @@ def describe_person_from_url(url, name_en):
         response.raise_for_status()
         
         # HTMLからテキストを抽出
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = bs4.BeautifulSoup(response.content, 'html.parser')
         
         # タイトルとメタディスクリプションを取得
         title = soup.title.string if soup.title else ""
@@ -118,7 +142,7 @@ def describe_person_from_url(url, name_en):
         Content: {' '.join(first_paragraphs)[:1500]}
         """
         
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="gpt-4.1",
             messages=[
                 {"role": "system", "content": "You are a visual description assistant. Provide detailed visual descriptions of people based on text information."},
@@ -186,21 +210,8 @@ def get_scholar_description(scholar):
         return f"A portrait of {name_en}, a distinguished academic figure."
 
 def download_reference_image(url):
-    """URLから画像をダウンロードする"""
-    try:
-        headers = {'User-Agent': USER_AGENT}
-        response = requests.get(url, stream=True, timeout=10, headers=headers)
-        response.raise_for_status()
-        img = Image.open(io.BytesIO(response.content))
-        
-        if img.format == 'GIF' or img.mode == 'P':
-            img = img.convert('RGB')
-            
-        print(f"Reference image downloaded: {img.format} {img.size} (mode: {img.mode})")
-        return img
-    except Exception as e:
-        print(f"Error downloading reference image: {e}")
-        return None
+    """URLから画像をダウンロードする（上限サイズ付きのストリーミング、JPEGは縮小デコード）"""
+    return reference_preprocess.download_reference_image(url, USER_AGENT)
 
 def extract_image_from_webpage(url):
     """WebページからWikipediaの顔写真を抽出する"""
@@ -210,7 +221,7 @@ def extract_image_from_webpage(url):
         response = requests.get(url, timeout=10, headers=headers)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = bs4.BeautifulSoup(response.content, 'html.parser')
         
         # Wikipediaのinfoboxから画像を探す
         if "wikipedia" in url.lower():
@@ -263,24 +274,20 @@ def generate_avatar_from_reference_image(name_en, reference_image_path):
     """参照画像をもとにアバター画像を生成"""
     try:
         # プロンプトの作成
-        prompt = f"""
-        Create a flat pastel portrait of {name_en} based on the reference image.
-        
-        Style guidelines:
-        - Facing forward
-        - 4-colour palette
-        - Thick outline
-        - Solid background
-        - Simple, stylized cartoon illustration
-        - No text or watermarks
-        """
+        prompt = avatar_cache.build_avatar_prompt(name_en)
         
         print(f"Generating avatar with reference image using GPT-image-1")
         
+        # 参照画像を用意（取り込み済みなら正規化済みの画像、未取り込みならここで前処理）
+        image_bytes, mime_type = reference_preprocess.prepare_reference(
+            reference_image_path, avatar_cache.GPT_IMAGE_MODEL
+        )
+        print(f"参照画像を前処理しました: {len(image_bytes) // 1024}KB")
+        
         # GPT-image-1でイラストを生成（要組織認証）
-        response = client.images.edit(
-            model="gpt-image-1",
-            image=open(reference_image_path, "rb"),
+        response = get_client().images.edit(
+            model=avatar_cache.GPT_IMAGE_MODEL,
+            image=("reference.jpg", image_bytes, mime_type),
             prompt=prompt
         )
         
@@ -329,8 +336,8 @@ def generate_default_image(name_en, description=None):
         dummy_img.save(dummy_path)
         
         # GPT-image-1でイラストを生成（要組織認証）
-        response = client.images.edit(
-            model="gpt-image-1",
+        response = get_client().images.edit(
+            model=avatar_cache.GPT_IMAGE_MODEL,
             image=open(dummy_path, "rb"),
             prompt=prompt
         )
@@ -356,6 +363,12 @@ def debug_generate_from_photo(scholar_id):
     
     print(f"Processing scholar: {scholar['name']['en']} ({scholar_id})")
     
+    OUT_DIR.mkdir(exist_ok=True)
+    avatar_path = OUT_DIR / f"{scholar_id}.png"
+    prompt = avatar_cache.build_avatar_prompt(scholar['name']['en'])
+    # 参照画像から生成できた場合のみキャッシュのメタデータを記録する
+    reference_image_path = None
+    
     # 2. JSONデータから説明文を生成
     json_description = get_scholar_description(scholar)
     print(f"Generated description from JSON data: {json_description}")
@@ -394,11 +407,20 @@ def debug_generate_from_photo(scholar_id):
                 if img.mode != 'RGB':
                     img = img.convert('RGB')
                 img.save(temp_img_path)
+                asset_manifest.record_asset(scholar_id, asset_manifest.REFERENCE, temp_img_path)
+                ingest_reference_photos.ingest_file(scholar_id, temp_img_path)
                 print(f"Saved reference image to {temp_img_path}")
                 
+                # 参照画像・プロンプト・モデルが前回の生成時から変わっていなければ再生成しない
+                if avatar_cache.is_current(avatar_path, temp_img_path, prompt, avatar_cache.GPT_IMAGE_MODEL):
+                    print(f"入力に変更がないため生成をスキップ: {avatar_path}")
+                    return avatar_path
+                
                 # 参照画像をもとにイラスト生成
                 avatar_data = generate_avatar_from_reference_image(scholar['name']['en'], temp_img_path)
-                if not avatar_data:
+                if avatar_data:
+                    reference_image_path = temp_img_path
+                else:
                     print(f"Failed to generate avatar from reference. Using JSON description.")
                     avatar_data = generate_default_image(scholar['name']['en'], json_description)
                     if not avatar_data:
@@ -406,9 +428,13 @@ def debug_generate_from_photo(scholar_id):
                         return
     
     # 5. 結果を保存して表示
-    avatar_path = OUT_DIR / f"{scholar_id}.png"
     with open(avatar_path, "wb") as f:
         f.write(avatar_data)
+    asset_manifest.record_asset(scholar_id, asset_manifest.AVATAR, avatar_path)
+    if reference_image_path:
+        avatar_cache.write_meta(avatar_path, reference_image_path, prompt, avatar_cache.GPT_IMAGE_MODEL)
+    else:
+        avatar_cache.remove_meta(avatar_path)
     
     print(f"Successfully generated and saved avatar to {avatar_path}")
     return avatar_path
@@ -427,7 +453,7 @@ if __name__ == "__main__":
         print("OpenAI APIキーが設定されていません。")
         api_key = input("OpenAI APIキーを入力してください: ").strip()
         os.environ["OPENAI_API_KEY"] = api_key
-        client = OpenAI(api_key=api_key)
+        reset_client()
 
     # 実行するかどうか確認
     proceed = input("続行しますか？ (y/n): ").strip().lower()
@@ -445,16 +471,14 @@ if __name__ == "__main__":
         # 成功した場合、JSONを更新するか尋ねる
         update_json = input("\nscholars_enhanced.jsonにアバターパスを更新しますか？ (y/n): ").strip().lower()
         if update_json == 'y':
-            with open("scholars_enhanced.json", "r", encoding="utf-8") as f:
-                scholars = json.load(f)
+            scholars = scholar_schema.load_scholars("scholars_enhanced.json")
                 
             for scholar in scholars:
                 if scholar["id"] == scholar_id:
                     scholar["avatar"] = str(avatar_path)
                     break
                     
-            with open("scholars_enhanced.json", "w", encoding="utf-8") as f:
-                json.dump(scholars, f, ensure_ascii=False, indent=2)
+            scholar_schema.save_scholars("scholars_enhanced.json", scholars)
             
             print(f"scholars_enhanced.jsonを更新しました")
     else:
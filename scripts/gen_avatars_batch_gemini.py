@@ -6,19 +6,25 @@
 1. 必要なライブラリをインストール: pip install google-genai pillow requests beautifulsoup4
 2. 環境変数GOOGLE_API_KEYを設定するか、実行時に入力
 3. このスクリプトを実行: python scripts/gen_avatars_batch_gemini.py
+   並列モード: python scripts/gen_avatars_batch_gemini.py --workers 8
 
 特徴:
 - Gemini APIを使用してアバター画像を生成
 - 参照画像が見つからない場合はmissing_photos.csvに記録
 - すでに処理状態はCSVで管理（missing/manual_added/generated）
+- 参照画像・プロンプト・モデルが前回の生成時から変わった学者のみ再生成
+  （avatars/{id}.meta.json に記録したキャッシュキーで判定）
+- --workers 2以上で並列モード（Gemini同時リクエスト数を指定、
+  参照画像の取得・ダウンロードは生成と並行して実行）
 
 環境変数:
 - GOOGLE_API_KEY: Google Gemini APIキー
 """
 
-import json
+import argparse
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # カレントディレクトリをプロジェクトルートに設定
@@ -30,64 +36,135 @@ sys.path.insert(0, str(project_root))
 # モジュールをインポート
 from scripts.gen_avatar_from_photo import (
     get_scholar_by_id, debug_generate_from_photo, add_to_missing_photos_csv,
-    MISSING_PHOTOS_CSV
+    update_missing_photos_csv, resolve_reference_image, save_avatar_data,
+    generate_avatar_from_reference_image, ensure_dirs, reset_client, MISSING_PHOTOS_CSV
 )
-import google.genai as genai
+from scripts import photo_status_store, avatar_cache, asset_manifest, ingest_reference_photos, scholar_schema
+from scripts.lazy_import import load_all
 
-# Google Gemini APIキーの設定
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    print("Google APIキーが設定されていません。")
-    api_key = input("Google APIキーを入力してください: ").strip()
-    if not api_key:
-        print("APIキーが必要です。プログラムを終了します。")
-        sys.exit(1)
-    os.environ["GOOGLE_API_KEY"] = api_key
-
-# Geminiクライアントの初期化
-client = genai.Client(api_key=api_key)
-
-# 出力ディレクトリの確認
+# 出力ディレクトリ（process_scholar_batch の開始時に作成）
 OUT_DIR = Path("avatars")
-OUT_DIR.mkdir(exist_ok=True)
 REF_DIR = Path("reference_photos")
-REF_DIR.mkdir(exist_ok=True)
+
+# 並列モードで生成に失敗した場合の最大試行回数（レート制限などの一時的な失敗対策）
+MAX_GENERATION_ATTEMPTS = 3
 
 def load_missing_photos_csv():
-    """missing_photos.csvからステータス情報を読み込む"""
-    status_dict = {}
-    if MISSING_PHOTOS_CSV.exists():
-        try:
-            import csv
-            with open(MISSING_PHOTOS_CSV, 'r', encoding='utf-8', newline='') as f:
-                reader = csv.reader(f)
-                headers = next(reader)  # ヘッダー行をスキップ
-                
-                # ステータス列のインデックスを取得
-                status_index = headers.index('status') if 'status' in headers else None
-                
-                if status_index is not None:
-                    for row in reader:
-                        if len(row) > status_index:
-                            scholar_id = row[0]
-                            status = row[status_index]
-                            status_dict[scholar_id] = status
-        except Exception as e:
-            print(f"Warning: CSVファイルの読み込みエラー: {e}")
+    """処理状態ストア（missing_photos.csvの内容）からステータス情報を読み込む"""
+    try:
+        return photo_status_store.load_statuses()
+    except Exception as e:
+        print(f"Warning: 処理状態の読み込みエラー: {e}")
+        return {}
+
+def generate_avatars_parallel(targets, workers, prep_workers):
+    """参照画像の準備とアバター生成を並列に実行する
+    
+    参照画像の取得・ダウンロード（prep_workers並列）が終わった学者から順に
+    生成キューに投入し、Geminiへの同時リクエスト数はworkersで制限する。
+    CSVへの記録は行わず、反映すべき状態をまとめて返す。
+    
+    Returns:
+        (generated, status_entries, results)
+        - generated: scholar_id -> 生成したアバターのパス
+        - status_entries: update_missing_photos_csvに渡す状態のリスト
+        - results: 結果のカウント
+    """
+    generated = {}
+    status_entries = []
+    results = {"success": 0, "manual_added": 0, "missing": 0, "error": 0}
     
-    return status_dict
+    def generate(scholar, reference_image_path):
+        prompt = avatar_cache.build_avatar_prompt(scholar["name"]["en"])
+        avatar_path = OUT_DIR / f"{scholar['id']}.png"
+        if avatar_cache.is_current(avatar_path, reference_image_path, prompt, avatar_cache.GEMINI_IMAGE_MODEL):
+            print(f"入力に変更がないため生成をスキップ: {avatar_path}")
+            return avatar_path
+        for attempt in range(MAX_GENERATION_ATTEMPTS):
+            if attempt > 0:
+                time.sleep(2 ** attempt)
+                print(f"再試行 ({attempt + 1}/{MAX_GENERATION_ATTEMPTS}): {scholar['id']}")
+            avatar_data = generate_avatar_from_reference_image(scholar["name"]["en"], reference_image_path)
+            if avatar_data:
+                avatar_path = save_avatar_data(scholar["id"], avatar_data)
+                avatar_cache.write_meta(avatar_path, reference_image_path, prompt, avatar_cache.GEMINI_IMAGE_MODEL)
+                return avatar_path
+        return None
+    
+    # 遅延読み込みのライブラリ（requests・bs4・google.genaiなど）をスレッドの開始前に読み込んでおく
+    load_all()
+    
+    with ThreadPoolExecutor(max_workers=prep_workers) as prep_pool, \
+            ThreadPoolExecutor(max_workers=workers) as gen_pool:
+        prep_futures = {prep_pool.submit(resolve_reference_image, s): s for s in targets}
+        gen_futures = {}
+        
+        # 参照画像が用意できた学者から生成を開始
+        for future in as_completed(prep_futures):
+            scholar = prep_futures[future]
+            name = scholar["name"]
+            try:
+                reference_image_path, source_url, status = future.result()
+            except Exception as e:
+                print(f"エラー発生 ({scholar['id']}): {e}")
+                results["error"] += 1
+                continue
+            
+            if status:
+                status_entries.append((scholar["id"], name["en"], name.get("ja", ""), source_url, status))
+            if not reference_image_path:
+                print(f"❌ 参照画像なし: {scholar['id']}")
+                results["missing"] += 1
+                continue
+            
+            gen_future = gen_pool.submit(generate, scholar, reference_image_path)
+            gen_futures[gen_future] = (scholar, source_url, status)
+        
+        for future in as_completed(gen_futures):
+            scholar, source_url, status = gen_futures[future]
+            name = scholar["name"]
+            try:
+                avatar_path = future.result()
+            except Exception as e:
+                print(f"エラー発生 ({scholar['id']}): {e}")
+                results["error"] += 1
+                continue
+            
+            if avatar_path:
+                print(f"✅ 生成成功: {avatar_path}")
+                generated[scholar["id"]] = avatar_path
+                status_entries.append((scholar["id"], name["en"], name.get("ja", ""), source_url, "generated"))
+                results["success"] += 1
+                if status == "manual_added":
+                    results["manual_added"] += 1
+            else:
+                print(f"❌ 生成失敗: {scholar['id']}")
+                if status == "manual_added":
+                    print(f"⚠️ 手動参照画像があるのに生成に失敗しました: {scholar['id']}")
+                results["error"] += 1
+    
+    return generated, status_entries, results
 
-def process_scholar_batch():
-    """scholars_enhanced.jsonからすべての学者を処理する"""
+def process_scholar_batch(workers=1, prep_workers=None):
+    """scholars_enhanced.jsonからすべての学者を処理する
+    
+    workersが2以上の場合は並列モードで生成し、JSONとCSVは最後にまとめて更新する。
+    """
     print("学者データの読み込み開始")
+    ensure_dirs()
     
     try:
         # JSONファイルの読み込み
-        with open("scholars_enhanced.json", "r", encoding="utf-8") as f:
-            scholars = json.load(f)
+        scholars = scholar_schema.load_scholars("scholars_enhanced.json")
         
         print(f"データ読み込み完了: {len(scholars)}人の学者")
         
+        # アバター・参照画像の有無をアセットマニフェストに反映（変更のないファイルは再計算しない）
+        asset_manifest.refresh()
+        
+        # 手動で追加された参照画像などを正規化しておく（生成中には変換しない）
+        ingest_reference_photos.ingest_all()
+        
         # 既存の処理状態を読み込み
         status_dict = load_missing_photos_csv()
         print(f"既存の処理状態を読み込み: {len(status_dict)}件")
@@ -105,71 +182,101 @@ def process_scholar_batch():
             "skipped": 0
         }
         
-        # 各学者を処理
-        for idx, scholar in enumerate(scholars):
+        # 生成が必要な学者を選別
+        targets = []
+        for scholar in scholars:
             scholar_id = scholar["id"]
-            name_en = scholar["name"]["en"]
-            name_ja = scholar.get("ja", "")
-            
-            # 進捗表示
-            print(f"\n処理中 [{idx+1}/{len(scholars)}]: {name_en} ({scholar_id})")
+            # 参照画像・プロンプト・モデルが前回の生成時から変わっていないか
+            is_current = avatar_cache.is_scholar_avatar_current(scholar_id, scholar["name"]["en"])
+            avatar_path = asset_manifest.get_path(scholar_id, asset_manifest.AVATAR)
             
             # すでにアバターがある場合はスキップ
             if scholar.get("avatar"):
-                avatar_path = Path(scholar["avatar"])
-                if avatar_path.exists():
+                if avatar_path and is_current:
                     print(f"既存のアバターがあるためスキップ: {avatar_path}")
                     results["skipped"] += 1
                     continue
+                elif avatar_path:
+                    print(f"参照画像・プロンプト・モデルが変わったため再生成: {avatar_path}")
                 else:
-                    print(f"アバターパスは設定されていますが、ファイルが見つかりません: {avatar_path}")
+                    print(f"アバターパスは設定されていますが、ファイルが見つかりません: {scholar['avatar']}")
             
             # すでに処理済み（generatedフラグあり）の場合はスキップするオプション
             if scholar_id in status_dict and status_dict[scholar_id] == "generated":
-                avatar_path = OUT_DIR / f"{scholar_id}.png"
-                if avatar_path.exists():
+                if is_current:
                     print(f"生成済みフラグがあり、ファイルも存在するのでスキップ: {avatar_path}")
                     scholar["avatar"] = str(avatar_path)
                     results["success"] += 1
                     continue
             
-            # アバター生成を試みる
-            try:
-                avatar_path = debug_generate_from_photo(scholar_id)
+            targets.append(scholar)
+        
+        print(f"生成対象: {len(targets)}人")
+        
+        if workers > 1:
+            # 並列モード
+            prep_workers = prep_workers or workers * 2
+            print(f"並列モード: Gemini同時リクエスト {workers}件, 参照画像の準備 {prep_workers}件")
+            generated, status_entries, parallel_results = generate_avatars_parallel(
+                targets, workers, prep_workers
+            )
+            for key, value in parallel_results.items():
+                results[key] += value
+            for scholar in targets:
+                if scholar["id"] in generated:
+                    scholar["avatar"] = str(generated[scholar["id"]])
+            
+            # 処理状態をまとめてCSVに反映
+            update_missing_photos_csv(status_entries)
+        
+        else:
+            # 逐次モード：各学者を処理
+            for idx, scholar in enumerate(targets):
+                scholar_id = scholar["id"]
+                name_en = scholar["name"]["en"]
                 
-                if avatar_path:
-                    print(f"✅ 生成成功: {avatar_path}")
-                    scholar["avatar"] = str(avatar_path)
-                    results["success"] += 1
-                    
-                    # 状態に応じてカウント
-                    if scholar_id in status_dict:
-                        if status_dict[scholar_id] == "manual_added":
-                            results["manual_added"] += 1
+                # 進捗表示
+                print(f"\n処理中 [{idx+1}/{len(targets)}]: {name_en} ({scholar_id})")
+                
+                # アバター生成を試みる
+                try:
+                    avatar_path = debug_generate_from_photo(scholar_id)
                     
-                    # APIレート制限対策
-                    time.sleep(2)
-                else:
-                    print(f"❌ 生成失敗: {scholar_id}")
-                    # ステータスに基づいてカウント
-                    if scholar_id in status_dict:
-                        if status_dict[scholar_id] == "missing":
-                            results["missing"] += 1
-                        elif status_dict[scholar_id] == "manual_added":
-                            results["manual_added"] += 1
-                            print(f"⚠️ 手動参照画像があるのに生成に失敗しました: {scholar_id}")
+                    if avatar_path:
+                        print(f"✅ 生成成功: {avatar_path}")
+                        scholar["avatar"] = str(avatar_path)
+                        results["success"] += 1
+                        
+                        # 状態に応じてカウント
+                        if scholar_id in status_dict:
+                            if status_dict[scholar_id] == "manual_added":
+                                results["manual_added"] += 1
+                        
+                        # APIレート制限対策
+                        time.sleep(2)
                     else:
-                        results["missing"] += 1
+                        print(f"❌ 生成失敗: {scholar_id}")
+                        # ステータスに基づいてカウント
+                        if scholar_id in status_dict:
+                            if status_dict[scholar_id] == "missing":
+                                results["missing"] += 1
+                            elif status_dict[scholar_id] == "manual_added":
+                                results["manual_added"] += 1
+                                print(f"⚠️ 手動参照画像があるのに生成に失敗しました: {scholar_id}")
+                        else:
+                            results["missing"] += 1
+                
+                except Exception as e:
+                    print(f"エラー発生: {e}")
+                    results["error"] += 1
+                    continue
             
-            except Exception as e:
-                print(f"エラー発生: {e}")
-                results["error"] += 1
-                continue
+            # 処理状態をmissing_photos.csvに書き出す
+            photo_status_store.export_csv()
         
         # JSONファイルの更新
         print("\nJSONファイルを更新します")
-        with open("scholars_enhanced.json", "w", encoding="utf-8") as f:
-            json.dump(scholars, f, ensure_ascii=False, indent=2)
+        scholar_schema.save_scholars("scholars_enhanced.json", scholars)
         print("JSON更新完了")
         
         # 結果サマリーの表示
@@ -186,11 +293,28 @@ def process_scholar_batch():
         raise
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gemini APIによる学者アバターの一括生成")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Geminiへの同時リクエスト数（2以上で並列モード、既定: 1=逐次処理）")
+    parser.add_argument("--prep-workers", type=int, default=None,
+                        help="参照画像の取得・ダウンロードの並列数（既定: workersの2倍）")
+    args = parser.parse_args()
+    
+    # Google Gemini APIキーの設定（クライアントは最初の生成時に作成）
+    if not os.getenv("GOOGLE_API_KEY"):
+        print("Google APIキーが設定されていません。")
+        api_key = input("Google APIキーを入力してください: ").strip()
+        if not api_key:
+            print("APIキーが必要です。プログラムを終了します。")
+            sys.exit(1)
+        os.environ["GOOGLE_API_KEY"] = api_key
+        reset_client()
+    
     # 開始時間を記録
     start_time = time.time()
     
     # バッチ処理の実行
-    process_scholar_batch()
+    process_scholar_batch(workers=args.workers, prep_workers=args.prep_workers)
     
     # 終了時間と所要時間の表示
     end_time = time.time()
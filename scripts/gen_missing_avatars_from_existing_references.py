@@ -3,8 +3,11 @@
 既存の参照画像からアバター画像を生成するスクリプト
 
 このスクリプトは、avatarsディレクトリ内の_referenceファイルがあるが、
-対応する.pngファイルがない学者のアバター画像を生成します。
+対応する.pngファイルがない（または参照画像・プロンプト・モデルが前回の生成時から
+変わった）学者のアバター画像を生成します。
 Wikipediaからの画像取得は行わず、既存の参照画像のみを使用します。
+参照画像は生成前に references/ へ取り込み（scripts/ingest_reference_photos.py）、
+正規化済みの画像をそのままアップロードします。
 
 使い方:
 1. 必要なライブラリをインストール: pip install google-genai pillow
@@ -19,37 +22,41 @@ import os
 import json
 import time
 import base64
-import csv
 from pathlib import Path
 import sys
-import re
-from PIL import Image
-import google.genai as genai
-from google.genai import types
 
 # カレントディレクトリをプロジェクトルートに設定
 current_dir = Path(__file__).resolve().parent
 project_root = current_dir.parent
 sys.path.insert(0, str(project_root))
+from scripts import photo_status_store, avatar_cache, reference_preprocess, asset_manifest, ingest_reference_photos, scholar_schema
+from scripts.lazy_import import lazy_import
 
-# Google Gemini APIキーの設定
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    print("Google APIキーが設定されていません。")
-    api_key = input("Google APIキーを入力してください: ").strip()
-    if not api_key:
-        print("APIキーが必要です。プログラムを終了します。")
-        sys.exit(1)
+# google.genai は生成するときに読み込む
+genai = lazy_import("google.genai")
 
-# Geminiクライアントの初期化
-client = genai.Client(api_key=api_key)
+# Geminiクライアント（get_client() の初回の呼び出し時に作成）
+_client = None
 
-# ディレクトリの設定
+# ディレクトリの設定（generate_missing_avatars の開始時に作成）
 OUT_DIR = Path("avatars")
-OUT_DIR.mkdir(exist_ok=True)
 
-# 画像が見つからなかった学者の情報を記録するCSVファイル
-MISSING_PHOTOS_CSV = Path("missing_photos.csv")
+def get_client():
+    """Geminiクライアントを返す（初回の呼び出し時に環境変数のAPIキーで作成）"""
+    global _client
+    if _client is None:
+        _client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+    return _client
+
+def ensure_api_key():
+    """APIキーが設定されていなければ入力を求める（入力がなければ終了する）"""
+    if not os.getenv("GOOGLE_API_KEY"):
+        print("Google APIキーが設定されていません。")
+        api_key = input("Google APIキーを入力してください: ").strip()
+        if not api_key:
+            print("APIキーが必要です。プログラムを終了します。")
+            sys.exit(1)
+        os.environ["GOOGLE_API_KEY"] = api_key
 
 def get_scholar_by_id(scholar_id):
     """scholars_enhanced.jsonから指定IDの学者データを取得"""
@@ -67,112 +74,35 @@ def get_scholar_by_id(scholar_id):
 def get_all_scholars():
     """scholars_enhanced.jsonから全ての学者データを取得"""
     try:
-        with open("scholars_enhanced.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        return scholar_schema.load_scholars("scholars_enhanced.json")
     except Exception as e:
         print(f"Error loading all scholars data: {e}")
         return []
 
-def add_to_missing_photos_csv(scholar_id, name_en, name_ja, source_url=None, status="manual_added"):
-    """学者の情報をCSVに追記（処理状況も記録）
-    
-    status:
-    - "missing": 画像が見つからず、手動での追加が必要
-    - "manual_added": 手動で参照画像が追加済み
-    - "generated": アバター生成成功
-    """
-    # CSVファイルが存在するか確認
-    file_exists = MISSING_PHOTOS_CSV.exists()
-    
-    # ヘッダー情報の定義
-    headers = ['scholar_id', 'name_en', 'name_ja', 'search_url', 'status']
-    
-    # 既存のエントリとヘッダー情報を読み込む
-    existing_data = {}
-    existing_headers = None
-    if file_exists:
-        try:
-            with open(MISSING_PHOTOS_CSV, 'r', encoding='utf-8', newline='') as f:
-                reader = csv.reader(f)
-                # ヘッダー行を読み込む
-                existing_headers = next(reader, headers)
-                
-                # ヘッダーが古い形式の場合（statusがない）
-                if len(existing_headers) < len(headers):
-                    existing_headers = headers
-                
-                # データ行を読み込む
-                for row in reader:
-                    if row and len(row) > 0:
-                        # 古い形式のデータ行の場合、statusカラムを追加
-                        if len(row) < len(headers):
-                            row.append("missing")
-                        
-                        # 辞書に格納（IDをキーとして）
-                        existing_data[row[0]] = row
-        except Exception as e:
-            print(f"Warning: Error reading existing CSV: {e}")
-    
-    # データを準備
-    new_row = [scholar_id, name_en, name_ja, source_url or '', status]
-    
-    # CSVを更新（既存エントリの更新または新規追加）
-    try:
-        mode = 'w'  # 書き換えモード
-        with open(MISSING_PHOTOS_CSV, mode, encoding='utf-8', newline='') as f:
-            writer = csv.writer(f)
-            
-            # ヘッダー行を書き込む
-            writer.writerow(existing_headers if existing_headers else headers)
-            
-            # 既存データをアップデート
-            if scholar_id in existing_data:
-                existing_data[scholar_id] = new_row
-                print(f"Updated {name_en} ({scholar_id}) in {MISSING_PHOTOS_CSV.name} with status: {status}")
-            else:
-                existing_data[scholar_id] = new_row
-                print(f"Added {name_en} ({scholar_id}) to {MISSING_PHOTOS_CSV.name} with status: {status}")
-            
-            # 全データを書き込む
-            for row in existing_data.values():
-                writer.writerow(row)
-    except Exception as e:
-        print(f"Error updating {MISSING_PHOTOS_CSV.name}: {e}")
-
 def generate_avatar_from_reference_image(name_en, reference_image_path):
     """参照画像をもとにアバター画像を生成"""
     try:
         # プロンプトの作成
-        prompt = f"""
-        Create a flat pastel portrait of {name_en} based on the reference image.
-        
-        Style guidelines:
-        - Facing forward
-        - 4-colour palette
-        - Thick outline
-        - Solid background
-        - Simple, stylized cartoon illustration
-        - No text or watermarks
-        """
+        prompt = avatar_cache.build_avatar_prompt(name_en)
         
         print(f"Generating avatar with reference image using Gemini")
         
-        # 画像を開く（モードを強制的にRGBに変換）
+        # 参照画像を用意（取り込み済みなら正規化済みの画像、未取り込みならここで前処理）
         try:
-            image = Image.open(reference_image_path)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+            image_bytes, mime_type = reference_preprocess.prepare_reference(
+                reference_image_path, avatar_cache.GEMINI_IMAGE_MODEL
+            )
+            image = genai.types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
         except Exception as e:
             print(f"画像オープンエラー: {e}")
             return None
         
         # Geminiモデルを使用して画像生成
-        model = "gemini-2.0-flash-exp-image-generation"
         try:
-            response = client.models.generate_content(
-                model=model,
+            response = get_client().models.generate_content(
+                model=avatar_cache.GEMINI_IMAGE_MODEL,
                 contents=[prompt, image],
-                config=types.GenerateContentConfig(
+                config=genai.types.GenerateContentConfig(
                     response_modalities=['TEXT', 'IMAGE']
                 )
             )
@@ -204,49 +134,58 @@ def generate_avatar_from_reference_image(name_en, reference_image_path):
         print(f"Error generating avatar with Gemini: {e}")
         return None
 
-def find_missing_avatars():
-    """参照画像はあるが、アバター画像がない学者を見つける"""
+def find_missing_avatars(scholars_dict):
+    """参照画像はあるが、アバター画像がない（または入力が変わった）学者を見つける"""
     missing_avatars = []
     
-    # avatarsディレクトリ内のファイルを取得
-    files = list(OUT_DIR.glob('*'))
-    
-    # _referenceファイルを見つける
-    reference_files = [f for f in files if '_reference' in f.name]
-    
-    for ref_file in reference_files:
-        # ファイル名から学者IDを抽出
-        match = re.match(r'(.+)_reference\..+', ref_file.name)
-        if match:
-            scholar_id = match.group(1)
-            
-            # 対応するアバター画像（.png）が存在するか確認
-            avatar_path = OUT_DIR / f"{scholar_id}.png"
-            if not avatar_path.exists():
-                missing_avatars.append((scholar_id, ref_file))
-                print(f"Missing avatar for {scholar_id}, reference file exists: {ref_file.name}")
+    # avatarsディレクトリ内の_referenceファイルをアセットマニフェストから取得
+    asset_manifest.refresh()
+    for scholar_id, assets in sorted(asset_manifest.load().items()):
+        if asset_manifest.REFERENCE not in assets:
+            continue
+        ref_file = Path(assets[asset_manifest.REFERENCE]["path"])
+        
+        # 対応するアバター画像（.png）が存在するか確認
+        if asset_manifest.AVATAR not in assets:
+            missing_avatars.append((scholar_id, ref_file))
+            print(f"Missing avatar for {scholar_id}, reference file exists: {ref_file.name}")
+            continue
+        
+        # 参照画像・プロンプト・モデルが前回の生成時から変わっていないか確認
+        avatar_path = Path(assets[asset_manifest.AVATAR]["path"])
+        scholar = scholars_dict.get(scholar_id)
+        name_en = scholar['name']['en'] if scholar else scholar_id
+        prompt = avatar_cache.build_avatar_prompt(name_en)
+        if not avatar_cache.is_current(avatar_path, ref_file, prompt, avatar_cache.GEMINI_IMAGE_MODEL):
+            missing_avatars.append((scholar_id, ref_file))
+            print(f"Stale avatar for {scholar_id}, inputs changed since last generation: {ref_file.name}")
     
     return missing_avatars
 
 def generate_missing_avatars():
     """参照画像はあるが、アバター画像がない学者のアバターを生成"""
+    # APIキーがないと学者ごとの生成がすべて失敗するため、開始前に確認する
+    ensure_api_key()
+    OUT_DIR.mkdir(exist_ok=True)
+    # 全学者データの取得
+    all_scholars = get_all_scholars()
+    scholars_dict = {scholar['id']: scholar for scholar in all_scholars}
+    
     # 欠けているアバターを探す
-    missing_avatars = find_missing_avatars()
+    missing_avatars = find_missing_avatars(scholars_dict)
     print(f"\n参照画像はあるが、アバター画像がない学者: {len(missing_avatars)}人")
     
     if not missing_avatars:
         print("全ての参照画像に対応するアバター画像が存在します。処理は不要です。")
         return
     
-    # 全学者データの取得
-    all_scholars = get_all_scholars()
-    scholars_dict = {scholar['id']: scholar for scholar in all_scholars}
+    # 未取り込みの参照画像を正規化しておく（GIFなどの変換は生成中には行わない）
+    ingest_reference_photos.ingest_all()
     
     # 処理結果のカウント
     results = {
         "success": 0,
         "error": 0,
-        "gif_error": 0,
     }
     
     # APIレート制限対策の待機時間（秒）
@@ -266,24 +205,6 @@ def generate_missing_avatars():
             name_en = scholar['name']['en']
             name_ja = scholar['name'].get('ja', '')
         
-        # GIF形式の参照画像の特別処理
-        if ref_file.suffix.lower() == '.gif':
-            print(f"Warning: GIF形式の参照画像は処理が難しい場合があります: {ref_file.name}")
-            try:
-                # PILでGIFを開いてRGBに変換を試みる
-                with Image.open(ref_file) as img:
-                    # 最初のフレームのみ使用
-                    img.seek(0)
-                    rgb_img = img.convert('RGB')
-                    temp_path = OUT_DIR / f"{scholar_id}_temp.jpg"
-                    rgb_img.save(temp_path)
-                    ref_file = temp_path
-                    print(f"GIF画像をJPEGに変換しました: {temp_path}")
-            except Exception as e:
-                print(f"GIF画像の変換に失敗しました: {e}")
-                results["gif_error"] += 1
-                continue
-        
         try:
             # 参照画像からアバターを生成
             avatar_data = generate_avatar_from_reference_image(name_en, ref_file)
@@ -308,18 +229,23 @@ def generate_missing_avatars():
                 # バイナリデータとして書き込み
                 with open(avatar_path, "wb") as f:
                     f.write(avatar_data)
+                asset_manifest.record_asset(scholar_id, asset_manifest.AVATAR, avatar_path)
                 print(f"画像を保存しました：{avatar_path}")
             except Exception as e:
                 print(f"画像の保存中にエラーが発生しました: {e}")
                 results["error"] += 1
                 continue
             
+            # 生成時の入力を記録（次回以降、入力が変わらなければ再生成しない）
+            avatar_cache.write_meta(avatar_path, ref_file, avatar_cache.build_avatar_prompt(name_en),
+                                    avatar_cache.GEMINI_IMAGE_MODEL)
+            
             # scholars_enhanced.jsonを更新
             if scholar:
                 scholar["avatar"] = str(avatar_path)
             
             # 状態を更新
-            add_to_missing_photos_csv(scholar_id, name_en, name_ja, None, "generated")
+            photo_status_store.upsert_status(scholar_id, name_en, name_ja, None, "generated")
             
             print(f"✅ 生成成功: {avatar_path}")
             results["success"] += 1
@@ -334,18 +260,12 @@ def generate_missing_avatars():
             results["error"] += 1
             continue
     
-    # 一時ファイルのクリーンアップ
-    for temp_file in OUT_DIR.glob('*_temp.jpg'):
-        try:
-            temp_file.unlink()
-            print(f"一時ファイルを削除しました: {temp_file}")
-        except Exception as e:
-            print(f"一時ファイルの削除に失敗しました: {e}")
+    # 処理状態をmissing_photos.csvに書き出す
+    photo_status_store.export_csv()
     
     # scholars_enhanced.jsonの更新を保存
     try:
-        with open("scholars_enhanced.json", "w", encoding="utf-8") as f:
-            json.dump(all_scholars, f, ensure_ascii=False, indent=2)
+        scholar_schema.save_scholars("scholars_enhanced.json", all_scholars)
         print("\nscholars_enhanced.jsonを更新しました")
     except Exception as e:
         print(f"\nscholars_enhanced.jsonの更新に失敗しました: {e}")
@@ -355,7 +275,6 @@ def generate_missing_avatars():
     print(f"対象学者数: {len(missing_avatars)}")
     print(f"成功: {results['success']}")
     print(f"エラー: {results['error']}")
-    print(f"GIF変換エラー: {results['gif_error']}")
 
 if __name__ == "__main__":
     # 開始時間を記録
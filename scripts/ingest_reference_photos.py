@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""
+参照画像の取り込み（正規化済みの参照画像ストア references/ の作成）
+
+参照画像は reference_photos/ （手動追加、5種類の拡張子）と avatars/{id}_reference.*
+（Webから取得）の2か所にあり、形式もまちまち。取り込み時にすべての参照画像を
+reference_preprocess と同じ手順（向き補正・RGB化・切り抜き・縮小）で正規化し、
+モデルの実効入力サイズごとに、内容のハッシュとサイズを名前にしたJPEG
+（references/{sha256}-{size}.jpg）として保存する。
+元画像のハッシュと正規化後の画像の対応は references/index.json に記録する。
+
+- 同じ内容の参照画像は1回だけ正規化し、正規化後の画像もサイズごとに1つだけ保存する
+- 元画像のハッシュが記録済みの参照画像は処理しない（アセットマニフェストのハッシュを再利用）
+- 正規化はプロセスプールで並列に実行する
+
+生成時は reference_preprocess.prepare_reference() が元画像のハッシュとモデルから
+そのモデルの入力サイズの正規化済み画像を引き、そのままアップロードする（デコード・変換は行わない）。
+キャッシュキーは従来どおり元画像のハッシュで計算するため、取り込みで再生成は発生しない。
+
+使い方:
+python scripts/ingest_reference_photos.py            # 未処理の参照画像を取り込む
+python scripts/ingest_reference_photos.py --force    # すべて取り込み直す
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import asset_manifest, reference_preprocess
+from scripts.lazy_import import lazy_import
+
+# 正規化するとき（ワーカープロセス）に読み込む
+Image = lazy_import("PIL.Image")
+
+# 正規化済みの参照画像の保存先と対応表
+REFERENCE_STORE = Path("references")
+REFERENCE_INDEX = REFERENCE_STORE / "index.json"
+
+# 正規化後の長辺（モデルの実効入力サイズごとに1枚ずつ作る）
+CANONICAL_SIZES = sorted({*reference_preprocess.MODEL_INPUT_SIZES.values(), reference_preprocess.DEFAULT_INPUT_SIZE})
+
+# 正規化の手順を変えた場合に上げる（既存の正規化済み画像をすべて作り直す）
+NORMALIZE_VERSION = 2
+
+# 読み込んだ対応表（プロセス内で共有）
+_index = None
+_lock = threading.RLock()
+
+def canonical_path(canonical_sha256, size):
+    """正規化済みの参照画像のパス"""
+    return REFERENCE_STORE / f"{canonical_sha256}-{size}.jpg"
+
+def _stored(entry):
+    """対応表のエントリの正規化済み画像が、すべてのサイズについて保存されているか"""
+    return all(canonical_path(entry["sizes"][str(size)]["sha256"], size).exists() for size in CANONICAL_SIZES)
+
+def _empty_index():
+    return {"version": NORMALIZE_VERSION, "sizes": CANONICAL_SIZES, "sources": {}, "scholars": {}}
+
+def load_index():
+    """対応表を読み込む（正規化の設定が変わっていた場合は空の対応表）"""
+    global _index
+    with _lock:
+        if _index is None:
+            _index = _empty_index()
+            if REFERENCE_INDEX.exists():
+                try:
+                    with open(REFERENCE_INDEX, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data.get("version") == NORMALIZE_VERSION and data.get("sizes") == CANONICAL_SIZES:
+                        _index = data
+                    else:
+                        print("正規化の設定が変わったため、参照画像をすべて取り込み直します")
+                except Exception as e:
+                    print(f"Warning: 参照画像の対応表の読み込みエラー: {e}")
+        return _index
+
+def save_index():
+    """対応表を書き出す（一時ファイル経由で置き換え）"""
+    with _lock:
+        index = load_index()
+        REFERENCE_STORE.mkdir(parents=True, exist_ok=True)
+        data = dict(index, scholars=dict(sorted(index["scholars"].items())))
+        temp_path = REFERENCE_INDEX.with_name(f".{REFERENCE_INDEX.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, REFERENCE_INDEX)
+
+def normalize_reference(source):
+    """参照画像を正規化してサイズごとに保存し、対応表のエントリ
+    {"sizes": {サイズ: {"sha256", "width", "height"}}} を返す（ワーカープロセスで実行）"""
+    cropped = reference_preprocess.crop_to_subject(reference_preprocess.load_reference_image(source))
+
+    sizes = {}
+    for size in CANONICAL_SIZES:
+        img = cropped.copy()
+        if max(img.size) > size:
+            img.thumbnail((size, size), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=reference_preprocess.JPEG_QUALITY, optimize=True)
+        data = buffer.getvalue()
+        canonical_sha256 = hashlib.sha256(data).hexdigest()
+
+        # 同じ内容の画像がすでにあれば書き込まない
+        out_path = canonical_path(canonical_sha256, size)
+        if not out_path.exists():
+            temp_path = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, out_path)
+        sizes[str(size)] = {"sha256": canonical_sha256, "width": img.width, "height": img.height}
+    return {"sizes": sizes}
+
+def _record(scholar_id, source, source_sha256, entry):
+    """正規化の結果を対応表に記録"""
+    index = load_index()
+    index["sources"][source_sha256] = entry
+    index["scholars"][scholar_id] = {
+        "source": Path(source).as_posix(),
+        "source_sha256": source_sha256,
+    }
+
+def find_canonical(reference_path, model=None):
+    """元の参照画像に対応する、モデルの入力サイズの正規化済み参照画像のパス（未取り込みの場合はNone）"""
+    size = reference_preprocess.MODEL_INPUT_SIZES.get(model, reference_preprocess.DEFAULT_INPUT_SIZE)
+    with _lock:
+        entry = load_index()["sources"].get(asset_manifest.cached_sha256(reference_path))
+    if entry is None:
+        return None
+    path = canonical_path(entry["sizes"][str(size)]["sha256"], size)
+    return path if path.exists() else None
+
+def ingest_file(scholar_id, source):
+    """参照画像を1枚取り込む（Webから取得した直後など、プロセスプールを使わない場合）"""
+    source_sha256 = asset_manifest.cached_sha256(source)
+    with _lock:
+        entry = load_index()["sources"].get(source_sha256)
+    if not (entry and _stored(entry)):
+        REFERENCE_STORE.mkdir(parents=True, exist_ok=True)
+        entry = normalize_reference(source)
+    with _lock:
+        _record(scholar_id, source, source_sha256, entry)
+        save_index()
+    return entry
+
+def prune_store(index):
+    """どの参照画像からも参照されない正規化済みの画像を削除"""
+    used = {canonical_path(rendition["sha256"], size).name
+            for entry in index["sources"].values()
+            for size, rendition in entry["sizes"].items()}
+    removed = 0
+    for path in REFERENCE_STORE.glob("*.jpg"):
+        if path.name not in used:
+            path.unlink()
+            removed += 1
+    return removed
+
+def ingest_all(workers=None, force=False):
+    """すべての学者の参照画像を取り込む（同じ内容の画像は1回だけ正規化）"""
+    global _index
+    REFERENCE_STORE.mkdir(parents=True, exist_ok=True)
+    if force:
+        with _lock:
+            _index = _empty_index()
+
+    asset_manifest.refresh()
+    index = load_index()
+
+    # 学者ごとの参照画像（手動参照画像を優先）と、そのハッシュ
+    references = {}
+    for scholar_id in sorted(asset_manifest.load()):
+        source = asset_manifest.find_reference(scholar_id)
+        if source:
+            references[scholar_id] = (source, asset_manifest.cached_sha256(source))
+
+    # 未処理の参照画像を内容ごとに1回だけ正規化
+    pending = {}
+    for scholar_id, (source, source_sha256) in references.items():
+        entry = index["sources"].get(source_sha256)
+        if entry and _stored(entry):
+            continue
+        pending.setdefault(source_sha256, source)
+
+    print(f"参照画像: {len(references)}件（内容の種類: {len({h for _, h in references.values()})}件, "
+          f"正規化の対象: {len(pending)}件）")
+
+    results = {"success": 0, "error": 0, "duplicate": len(references) - len({h for _, h in references.values()})}
+    normalized = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(normalize_reference, str(source)): source_sha256
+                       for source_sha256, source in pending.items()}
+            for future in as_completed(futures):
+                source_sha256 = futures[future]
+                source = pending[source_sha256]
+                try:
+                    normalized[source_sha256] = future.result()
+                except Exception as e:
+                    print(f"参照画像の正規化エラー ({source}): {e}")
+                    results["error"] += 1
+                    continue
+                results["success"] += 1
+                print(f"取り込み完了: {source}")
+
+    with _lock:
+        # 学者と参照画像の対応を作り直す（参照画像がなくなった学者は除く）
+        index["scholars"] = {}
+        for scholar_id, (source, source_sha256) in references.items():
+            if source_sha256 in normalized:
+                _record(scholar_id, source, source_sha256, normalized[source_sha256])
+            elif source_sha256 in index["sources"]:
+                _record(scholar_id, source, source_sha256, index["sources"][source_sha256])
+        used = {entry["source_sha256"] for entry in index["scholars"].values()}
+        index["sources"] = {h: e for h, e in index["sources"].items() if h in used}
+        save_index()
+
+    results["pruned"] = prune_store(index)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="参照画像を正規化して references/ に取り込む")
+    parser.add_argument("--workers", type=int, default=None, help="並列プロセス数（既定: CPU数）")
+    parser.add_argument("--force", action="store_true", help="取り込み済みの参照画像も含めてすべて取り込み直す")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    results = ingest_all(args.workers, args.force)
+
+    elapsed_time = time.time() - start_time
+    print("\n===== 処理結果サマリー =====")
+    print(f"取り込み: {results['success']}")
+    print(f"重複（同じ内容の参照画像）: {results['duplicate']}")
+    print(f"エラー: {results['error']}")
+    print(f"削除した未使用の画像: {results['pruned']}")
+    print(f"所要時間: {elapsed_time:.1f}秒")
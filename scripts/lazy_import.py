@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+重いモジュールの遅延読み込み
+
+google.genai・openai・PIL・bs4・requests などは読み込むだけで数百ミリ秒かかる。
+スクリプトの先頭で lazy_import() しておくと、属性に初めてアクセスしたとき
+（関数の中で実際に使ったとき）に読み込まれるため、--help や状態の確認、
+他のスクリプトから関数を1つ使うだけの場合は読み込みの時間がかからない。
+
+    Image = lazy_import("PIL.Image")     # from PIL import Image の代わり
+    bs4 = lazy_import("bs4")             # BeautifulSoup は bs4.BeautifulSoup で参照
+
+- すでに読み込まれているモジュール（ベンチマークのスタブを含む）はそのまま返す
+- インストールされていないモジュールは、使ったときに ModuleNotFoundError を送出する
+- from X import Y の形（クラスや関数の取り出し）は読み込みが発生するため、モジュールのまま参照する
+- 複数のスレッドから同時に初めてアクセスしても、読み込みは1回だけ行い、他のスレッドは読み込みの完了を待つ
+  （importlib.util.LazyLoader は Python 3.11 ではスレッドセーフでなく、読み込み中の
+  モジュールにアクセスした他のスレッドで AttributeError になるため使わない）
+- スレッドプールを開始する前に load_all() を呼ぶと、まとめて読み込んでおける
+"""
+
+import importlib.util
+import sys
+import threading
+import types
+
+# 読み込みを直列化するロック（読み込み中のモジュールが別の遅延モジュールを参照するため再入可能）
+_load_lock = threading.RLock()
+
+# lazy_import() で作った、まだ読み込んでいないモジュール
+_pending = []
+
+# 読み込み中のモジュール（id）
+_loading = set()
+
+class _LazyModule(types.ModuleType):
+    """初めて属性にアクセスしたときに読み込むモジュール（読み込み後は通常のモジュールになる）"""
+
+    def __getattribute__(self, attr):
+        if type(self) is _LazyModule:
+            with _load_lock:
+                # ロックを待つ間に他のスレッドが読み込みを終えていれば何もしない
+                # （読み込み中のモジュール自身からのアクセスは、通常のimportと同じく途中の状態を返す）
+                if type(self) is _LazyModule and id(self) not in _loading:
+                    _load(self)
+        return types.ModuleType.__getattribute__(self, attr)
+
+class _MissingModule(types.ModuleType):
+    """インストールされていないモジュールの代わり（属性にアクセスすると ModuleNotFoundError）"""
+
+    def __init__(self, name, error):
+        super().__init__(name)
+        self._error = error
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        raise ModuleNotFoundError(f"{self._error}（pip install で必要なライブラリを追加してください）",
+                                  name=self.__name__)
+
+def _load(module):
+    """遅延モジュールを読み込む（_load_lock を取得した状態で呼ぶ）"""
+    _loading.add(id(module))
+    spec = types.ModuleType.__getattribute__(module, "__spec__")
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(spec.name, None)
+        raise
+    finally:
+        _loading.discard(id(module))
+    # 読み込みが終わってから通常のモジュールに戻す（途中の状態を他のスレッドに見せない）
+    module.__class__ = types.ModuleType
+
+def load_all():
+    """lazy_import() で作ったモジュールをすべて読み込む（スレッドプールの開始前に呼ぶ）"""
+    with _load_lock:
+        for module in _pending:
+            if type(module) is _LazyModule:
+                _load(module)
+        _pending.clear()
+
+def lazy_import(name):
+    """モジュールを遅延読み込みで取得する（初めて属性にアクセスしたときに読み込む）"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError as e:
+        return _MissingModule(name, e)
+    if spec is None:
+        return _MissingModule(name, f"No module named '{name}'")
+
+    module = importlib.util.module_from_spec(spec)
+    module.__class__ = _LazyModule
+    sys.modules[name] = module
+    _pending.append(module)
+
+    # 通常のimportと同じく、親パッケージの属性としても参照できるようにする
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+"""
+アバター画像（avatars/*.png）のサイズを削減する最適化スクリプト
+
+アバターは4色パレット・単色背景で生成しているが、24bitのRGB PNGとして保存されているため
+1枚数百KBになっている。各画像について以下を行う:
+
+1. 小さいパレットから順に減色を試し、元画像との色差（CIELAB空間のΔE）の平均と
+   99パーセンタイルがしきい値以下に収まる最小のパレットを採用する（収まらない場合は減色しない）
+2. zlibの最大圧縮（compress_level=9, optimize=True）で再エンコードする
+3. 元のファイルより小さくなった場合のみ置き換える
+
+最適化済みのファイルは avatars/.optimized.json にハッシュを記録し、次回以降はスキップする。
+
+使い方:
+1. 必要なライブラリをインストール: pip install pillow numpy
+2. このスクリプトを実行: python scripts/optimize_avatar_pngs.py
+   （--dry-run で置き換えずに削減量だけを表示）
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageCms
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import asset_manifest
+
+# アバター画像のディレクトリ
+AVATAR_DIR = Path("avatars")
+
+# 最適化済みファイルの記録
+OPTIMIZED_RECORD = AVATAR_DIR / ".optimized.json"
+
+# 試すパレットサイズ（小さい順）
+PALETTE_SIZES = (4, 8, 16, 32, 64, 128, 256)
+
+# 減色を許容する平均色差（ΔE76。2.0前後が見た目でほぼ区別できない目安）
+MAX_MEAN_DELTA_E = 2.0
+
+# 髪や肌など一部の領域だけ色が変わるのを防ぐため、上位1%の画素の色差にも上限を設ける
+MAX_P99_DELTA_E = 8.0
+
+# 色差の計算に使う色空間変換（プロセスごとに1回だけ作成）
+_rgb_to_lab = None
+
+def file_sha256(path):
+    """ファイルのSHA-256ハッシュを計算"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def to_lab(img):
+    """RGB画像をCIELABの配列（L: 0-100, a/b: -128-127）に変換"""
+    global _rgb_to_lab
+    if _rgb_to_lab is None:
+        _rgb_to_lab = ImageCms.buildTransformFromOpenProfiles(
+            ImageCms.createProfile("sRGB"), ImageCms.createProfile("LAB"), "RGB", "LAB"
+        )
+    lab = np.asarray(ImageCms.applyTransform(img, _rgb_to_lab), dtype=np.float32)
+    # PillowのLABはL: 0-255, a/b: 符号付き8bitを0-255に格納している
+    lab[..., 0] *= 100.0 / 255.0
+    lab[..., 1:] = np.where(lab[..., 1:] >= 128, lab[..., 1:] - 256, lab[..., 1:])
+    return lab
+
+def delta_e_stats(lab_a, lab_b):
+    """2つのLAB配列の色差（ΔE76）の平均と99パーセンタイル"""
+    delta_e = np.sqrt(((lab_a - lab_b) ** 2).sum(axis=-1))
+    return float(delta_e.mean()), float(np.percentile(delta_e, 99))
+
+def encode_png(img):
+    """最大圧縮でPNGにエンコード"""
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG", optimize=True, compress_level=9)
+    return buffer.getvalue()
+
+def quantize(img, colors):
+    """適応パレットで減色（平坦なイラストなのでディザリングはしない）"""
+    method = Image.Quantize.FASTOCTREE if img.mode == "RGBA" else Image.Quantize.MEDIANCUT
+    return img.quantize(colors=colors, method=method, dither=Image.Dither.NONE)
+
+def optimize_png(path, palette_sizes, max_delta_e, dry_run):
+    """1枚のPNGを最適化し、(元のサイズ, 最適化後のサイズ, パレットサイズ, 最適化後のハッシュ) を返す（ワーカープロセスで実行）"""
+    path = Path(path)
+    original_size = path.stat().st_size
+
+    with Image.open(path) as img:
+        img.load()
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+    # 色差はアルファを除いた色で比較する
+    reference_lab = to_lab(img.convert("RGB"))
+
+    best_data = encode_png(img)
+    best_colors = None
+    for colors in palette_sizes:
+        candidate = quantize(img, colors)
+        mean, p99 = delta_e_stats(reference_lab, to_lab(candidate.convert("RGB")))
+        if mean > max_delta_e or p99 > MAX_P99_DELTA_E:
+            continue
+        data = encode_png(candidate)
+        if len(data) < len(best_data):
+            best_data, best_colors = data, colors
+        break
+
+    if len(best_data) >= original_size:
+        return original_size, original_size, None, file_sha256(path)
+
+    if not dry_run:
+        temp_path = path.with_name(f".{path.name}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(best_data)
+        os.replace(temp_path, path)
+
+    return original_size, len(best_data), best_colors, hashlib.sha256(best_data).hexdigest()
+
+def load_record():
+    """最適化済みファイルの記録を読み込む（ファイル名 -> ハッシュ）"""
+    if not OPTIMIZED_RECORD.exists():
+        return {}
+    try:
+        with open(OPTIMIZED_RECORD, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: 最適化記録の読み込みエラー: {e}")
+        return {}
+
+def save_record(record):
+    """最適化済みファイルの記録を書き出す"""
+    with open(OPTIMIZED_RECORD, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(record.items())), f, ensure_ascii=False, indent=2)
+
+def optimize_all(workers=None, max_delta_e=MAX_MEAN_DELTA_E, force=False, dry_run=False):
+    """すべてのアバター画像を最適化（最適化済みのものはスキップ）"""
+    record = load_record()
+    sources = sorted(p for p in AVATAR_DIR.glob("*.png") if "_reference" not in p.name)
+
+    pending = []
+    for path in sources:
+        if not force and record.get(path.name) == file_sha256(path):
+            continue
+        pending.append(path)
+
+    print(f"アバター画像: {len(sources)}枚（最適化対象: {len(pending)}枚, 最適化済みのためスキップ: {len(sources) - len(pending)}枚）")
+
+    total_before = total_after = 0
+    errors = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(optimize_png, str(path), PALETTE_SIZES, max_delta_e, dry_run): path
+                for path in pending
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    before, after, colors, digest = future.result()
+                except Exception as e:
+                    print(f"最適化エラー ({path.name}): {e}")
+                    errors += 1
+                    continue
+
+                total_before += before
+                total_after += after
+                palette = f"{colors}色" if colors else "減色なし"
+                print(f"{path.name}: {before / 1024:.0f}KB -> {after / 1024:.0f}KB "
+                      f"(-{(before - after) / 1024:.0f}KB, {palette})")
+                if not dry_run:
+                    record[path.name] = digest
+                    if after < before:
+                        asset_manifest.record_asset(path.stem, asset_manifest.AVATAR, path)
+
+    # 削除されたファイルの記録を除く
+    source_names = {p.name for p in sources}
+    record = {name: digest for name, digest in record.items() if name in source_names}
+    if not dry_run:
+        save_record(record)
+
+    return total_before, total_after, errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="アバター画像のPNGを減色・再圧縮してサイズを削減")
+    parser.add_argument("--workers", type=int, default=None, help="並列プロセス数（既定: CPU数）")
+    parser.add_argument("--max-delta-e", type=float, default=MAX_MEAN_DELTA_E,
+                        help=f"減色を許容する平均色差ΔE（既定: {MAX_MEAN_DELTA_E}）")
+    parser.add_argument("--force", action="store_true", help="最適化済みのファイルも再処理")
+    parser.add_argument("--dry-run", action="store_true", help="ファイルを置き換えずに削減量のみ表示")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    total_before, total_after, errors = optimize_all(args.workers, args.max_delta_e, args.force, args.dry_run)
+
+    elapsed_time = time.time() - start_time
+    saved = total_before - total_after
+    ratio = saved / total_before * 100 if total_before else 0
+    print("\n===== 処理結果サマリー =====")
+    print(f"処理前: {total_before / 1024 / 1024:.1f}MB")
+    print(f"処理後: {total_after / 1024 / 1024:.1f}MB")
+    print(f"削減量: {saved / 1024 / 1024:.1f}MB ({ratio:.1f}%)")
+    print(f"エラー: {errors}")
+    print(f"所要時間: {elapsed_time:.1f}秒")
+    print("※ 画像を置き換えた場合は scripts/build_avatar_variants.py でバリアントも更新してください")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+参照画像・アバター生成の処理状態ストア（missing_photos.csvのバックエンド）
+
+処理状態（missing/manual_added/generated）をSQLiteに保持し、学者ごとの更新を
+1件ずつのupsertで行う。WALモードで複数プロセス・複数スレッドからの同時書き込みに対応し、
+既存のワークフロー向けにmissing_photos.csvへまとめて書き出す。
+
+missing_photos.csvが手動で編集された場合（最後の書き出し以降に更新されている場合）は、
+次回アクセス時にCSVの内容をストアへ取り込む。
+
+使い方:
+python scripts/photo_status_store.py            # missing_photos.csvへ書き出し
+python scripts/photo_status_store.py --summary  # 状態ごとの件数を表示
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# 既存ワークフロー用のCSVファイル
+MISSING_PHOTOS_CSV = Path("missing_photos.csv")
+
+# 処理状態を保持するSQLiteデータベース
+STATUS_DB = Path("missing_photos.db")
+
+# CSVのヘッダー
+CSV_HEADERS = ['scholar_id', 'name_en', 'name_ja', 'search_url', 'status']
+
+# 他プロセスが書き込み中の場合に待機する最大秒数
+BUSY_TIMEOUT = 30
+
+# スレッドごとの接続
+_local = threading.local()
+
+def _connect():
+    """スレッドごとのSQLite接続を取得（初回はテーブル作成とCSVの取り込みを行う）"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    conn = sqlite3.connect(STATUS_DB, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS photo_status (
+            scholar_id TEXT PRIMARY KEY,
+            name_en TEXT,
+            name_ja TEXT,
+            search_url TEXT,
+            status TEXT,
+            updated_at REAL
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    _local.conn = conn
+
+    _sync_from_csv(conn)
+    return conn
+
+def _csv_signature():
+    """CSVファイルの更新検知用シグネチャ（更新時刻とサイズ）"""
+    stat = MISSING_PHOTOS_CSV.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def _sync_from_csv(conn):
+    """最後の書き出し以降にCSVが更新されていればストアに取り込む（CSVの内容を優先）"""
+    if not MISSING_PHOTOS_CSV.exists():
+        return
+
+    signature = _csv_signature()
+    row = conn.execute("SELECT value FROM meta WHERE key = 'csv_signature'").fetchone()
+    if row and row[0] == signature:
+        return
+
+    entries = []
+    try:
+        with open(MISSING_PHOTOS_CSV, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)  # ヘッダー行をスキップ
+            for row in reader:
+                if not row:
+                    continue
+                # 古い形式のデータ行の場合（statusがない）はmissing扱い
+                if len(row) < len(CSV_HEADERS):
+                    row = row + [''] * (len(CSV_HEADERS) - 1 - len(row)) + ['missing']
+                entries.append(tuple(row[:len(CSV_HEADERS)]))
+    except Exception as e:
+        print(f"Warning: Error reading existing CSV: {e}")
+        return
+
+    upsert_statuses(entries, conn=conn, verbose=False)
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('csv_signature', ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (signature,)
+    )
+    print(f"{MISSING_PHOTOS_CSV.name}から{len(entries)}件の処理状態を取り込みました")
+
+def upsert_status(scholar_id, name_en, name_ja, source_url=None, status="missing"):
+    """学者1人分の処理状態を記録（既存エントリは上書き）"""
+    upsert_statuses([(scholar_id, name_en, name_ja, source_url, status)])
+
+def upsert_statuses(entries, conn=None, verbose=True):
+    """複数学者の処理状態を1トランザクションで記録
+
+    entries: (scholar_id, name_en, name_ja, source_url, status) のリスト
+    """
+    if not entries:
+        return
+    conn = conn or _connect()
+    now = time.time()
+    rows = [
+        (scholar_id, name_en or '', name_ja or '', source_url or '', status, now)
+        for scholar_id, name_en, name_ja, source_url, status in entries
+    ]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("""
+            INSERT INTO photo_status (scholar_id, name_en, name_ja, search_url, status, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(scholar_id) DO UPDATE SET
+                name_en = excluded.name_en,
+                name_ja = excluded.name_ja,
+                search_url = excluded.search_url,
+                status = excluded.status,
+                updated_at = excluded.updated_at
+        """, rows)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    if verbose:
+        for scholar_id, name_en, _, _, status, _ in rows:
+            print(f"Recorded {name_en} ({scholar_id}) with status: {status}")
+
+def load_statuses():
+    """学者ID -> 処理状態 の辞書を取得"""
+    conn = _connect()
+    return dict(conn.execute("SELECT scholar_id, status FROM photo_status"))
+
+def get_status(scholar_id):
+    """学者1人分の処理状態を取得（未記録の場合はNone）"""
+    conn = _connect()
+    row = conn.execute("SELECT status FROM photo_status WHERE scholar_id = ?", (scholar_id,)).fetchone()
+    return row[0] if row else None
+
+def export_csv(path=MISSING_PHOTOS_CSV):
+    """ストアの内容をCSVに書き出す（一時ファイル経由で置き換えるため途中状態は見えない）"""
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT scholar_id, name_en, name_ja, search_url, status FROM photo_status ORDER BY rowid"
+    ).fetchall()
+
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADERS)
+        writer.writerows(rows)
+    os.replace(temp_path, path)
+
+    # 自分で書き出したCSVを次回取り込まないよう記録
+    if path == MISSING_PHOTOS_CSV:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('csv_signature', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (_csv_signature(),)
+        )
+    print(f"{path.name}に{len(rows)}件の処理状態を書き出しました")
+    return path
+
+def summarize():
+    """状態ごとの件数を取得"""
+    conn = _connect()
+    return dict(conn.execute("SELECT status, COUNT(*) FROM photo_status GROUP BY status ORDER BY status"))
+
+def main():
+    parser = argparse.ArgumentParser(description="missing_photos処理状態ストアの操作")
+    parser.add_argument("--summary", action="store_true", help="状態ごとの件数を表示")
+    parser.add_argument("--output", default=str(MISSING_PHOTOS_CSV), help="書き出し先のCSVファイル")
+    args = parser.parse_args()
+
+    if args.summary:
+        for status, count in summarize().items():
+            print(f"{status}: {count}")
+        return
+
+    export_csv(args.output)
+
+if __name__ == "__main__":
+    main()
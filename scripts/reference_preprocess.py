@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""
+参照画像の前処理（画像生成モデルへのアップロード前の正規化）
+
+参照画像（reference_photos/ や avatars/*_reference.*）をそのまま送ると、
+数MBのPNGや向きの崩れた写真がアップロードされることがある。送信前に以下を行う:
+
+1. EXIFの回転情報を反映
+2. GIF・パレット・CMYK・透過画像をRGBに変換（透過部分は白背景で合成）
+3. 顔〜上半身の範囲に切り抜き（OpenCVがあれば顔検出、なければ縦長画像の下部を控えめに除去）
+4. モデルの実効入力サイズまで縮小（拡大はしない）してJPEGにエンコード
+
+Webからの参照画像のダウンロード（download_reference_image）もここで行う。
+上限サイズを超える画像や画像以外のレスポンスは本文を読み切る前に中止し、
+JPEGは必要な解像度で直接デコードする（数千万画素の原寸画像を全展開しない）。
+
+scripts/ingest_reference_photos.py で取り込み済みの参照画像は、モデルの入力サイズの
+正規化済みの画像（references/{sha256}-{size}.jpg）をそのまま返し、生成時にはデコード・変換を行わない。
+
+使い方:
+python scripts/reference_preprocess.py <参照画像> [--model gpt-image-1] [--output out.jpg]
+（前処理後のサイズと切り抜き範囲を確認するためのもの。生成スクリプトからは
+ prepare_reference() を呼び出す）
+"""
+
+import argparse
+import io
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加（scripts配下のモジュールを参照するため）
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import avatar_cache
+from scripts.lazy_import import lazy_import
+
+# 画像の変換・ダウンロードを行うときに読み込む
+requests = lazy_import("requests")
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+
+# モデルごとの実効入力サイズ（長辺のピクセル数。これより大きい画像はモデル側で縮小される）
+MODEL_INPUT_SIZES = {
+    avatar_cache.GEMINI_IMAGE_MODEL: 768,
+    avatar_cache.GPT_IMAGE_MODEL: 1024,
+}
+DEFAULT_INPUT_SIZE = 1024
+
+# アップロードするJPEGの品質
+JPEG_QUALITY = 90
+
+# 顔検出が使えない場合に残す縦横比（高さ/幅）。これより縦長の画像は下側を切り落とす
+MAX_PORTRAIT_ASPECT = 1.35
+
+# 顔検出で切り抜く範囲（顔の幅・高さに対する倍率）
+FACE_CROP_WIDTH = 3.0
+FACE_CROP_ABOVE = 0.8
+FACE_CROP_BELOW = 2.2
+
+# ダウンロードする参照画像の上限サイズ（バイト）
+MAX_DOWNLOAD_BYTES = 10 * 1024 * 1024
+# ダウンロード時の読み込み単位
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# ダウンロードのタイムアウト（秒）
+DOWNLOAD_TIMEOUT = 10
+
+# 顔検出器（OpenCVがインストールされている場合のみ使用）
+_face_cascade = None
+
+def load_reference_image(image_or_path):
+    """参照画像を読み込み、向きを補正してRGBに変換"""
+    if isinstance(image_or_path, Image.Image):
+        img = image_or_path
+    else:
+        img = Image.open(image_or_path)
+
+    # アニメーションGIFなどは最初のフレームのみ使用
+    if getattr(img, "is_animated", False):
+        img.seek(0)
+
+    img = ImageOps.exif_transpose(img)
+
+    # 透過画像は白背景に合成
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return img
+
+def download_reference_image(url, user_agent, max_bytes=MAX_DOWNLOAD_BYTES, target_size=None):
+    """URLから参照画像をストリーミングでダウンロードしてデコードする
+
+    Content-Lengthが上限を超える場合・画像以外のContent-Typeの場合は本文を読まずに中止し、
+    読み込み中に上限を超えた場合も中止する。JPEGは長辺がtarget_size（既定: 最大のモデル入力サイズ）
+    以上になる最小の解像度でデコードし、EXIFの回転情報を反映する。失敗した場合はNoneを返す。
+    """
+    target_size = target_size or max(MODEL_INPUT_SIZES.values())
+    headers = {'User-Agent': user_agent}
+    try:
+        with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as response:
+            response.raise_for_status()
+
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type and not content_type.startswith('image/'):
+                print(f"Not an image ({content_type}), skipping download: {url}")
+                return None
+
+            content_length = response.headers.get('Content-Length')
+            if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                print(f"Reference image too large ({int(content_length) // 1024}KB), skipping download: {url}")
+                return None
+
+            data = bytearray()
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                data.extend(chunk)
+                if len(data) > max_bytes:
+                    print(f"Reference image exceeded {max_bytes // 1024}KB, aborting download: {url}")
+                    return None
+
+        img = Image.open(io.BytesIO(data))
+        original_size = img.size
+        if img.format == 'JPEG':
+            # DCTの縮小デコード（1/2, 1/4, 1/8）で、長辺がtarget_size以上になる解像度だけ展開する
+            scale = target_size / max(original_size)
+            if scale < 1:
+                img.draft('RGB', (int(original_size[0] * scale), int(original_size[1] * scale)))
+        img.load()
+        image_format = img.format
+
+        # 保存するとEXIFが失われるため、ここで回転情報を反映しておく
+        img = ImageOps.exif_transpose(img)
+
+        if image_format == 'GIF' or img.mode == 'P':
+            img = img.convert('RGB')
+
+        print(f"Reference image downloaded: {image_format} {original_size} -> {img.size} "
+              f"(mode: {img.mode}, {len(data) // 1024}KB)")
+        return img
+    except Exception as e:
+        print(f"Error downloading reference image: {e}")
+        return None
+
+def _detect_face(img):
+    """最も大きい顔の矩形 (x, y, w, h) を返す（OpenCVがない・検出できない場合はNone）"""
+    global _face_cascade
+    try:
+        import cv2
+        import numpy as np
+    except ImportError:
+        return None
+
+    if _face_cascade is None:
+        _face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+
+    gray = cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2GRAY)
+    min_size = max(24, min(img.size) // 10)
+    faces = _face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_size, min_size))
+    if len(faces) == 0:
+        return None
+    return max(faces, key=lambda f: f[2] * f[3])
+
+def crop_to_subject(img):
+    """顔〜上半身の範囲に切り抜く"""
+    width, height = img.size
+
+    face = _detect_face(img)
+    if face is not None:
+        x, y, w, h = (int(v) for v in face)
+        center_x = x + w / 2
+        crop_width = w * FACE_CROP_WIDTH
+        left = max(0, int(center_x - crop_width / 2))
+        right = min(width, int(center_x + crop_width / 2))
+        top = max(0, int(y - h * FACE_CROP_ABOVE))
+        bottom = min(height, int(y + h + h * FACE_CROP_BELOW))
+        return img.crop((left, top, right, bottom))
+
+    # 顔検出が使えない場合は、縦長の肖像画・全身写真の下側だけを切り落とす
+    # （肖像写真は上部に顔があることが多いため。横長の画像は人物の位置が分からないので切り抜かない）
+    if height > width * MAX_PORTRAIT_ASPECT:
+        return img.crop((0, 0, width, int(width * MAX_PORTRAIT_ASPECT)))
+    return img
+
+def prepare_reference(image_or_path, model=None):
+    """参照画像を前処理してアップロード用のJPEGバイト列を返す
+
+    取り込み済みの参照画像は、モデルの入力サイズで正規化済みの画像をそのまま返す。
+    未取り込みの場合は、ここでデコード・切り抜き・縮小を行う。
+
+    Returns:
+        (data, mime_type)
+    """
+    if not isinstance(image_or_path, Image.Image):
+        # 循環importを避けるため関数内で読み込む
+        from scripts import ingest_reference_photos
+        canonical = ingest_reference_photos.find_canonical(image_or_path, model)
+        if canonical:
+            return canonical.read_bytes(), "image/jpeg"
+
+    max_side = MODEL_INPUT_SIZES.get(model, DEFAULT_INPUT_SIZE)
+    img = crop_to_subject(load_reference_image(image_or_path))
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue(), "image/jpeg"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="参照画像の前処理結果を確認")
+    parser.add_argument("image", help="参照画像のパス")
+    parser.add_argument("--model", default=avatar_cache.GEMINI_IMAGE_MODEL,
+                        help=f"入力サイズの基準にするモデル（既定: {avatar_cache.GEMINI_IMAGE_MODEL}）")
+    parser.add_argument("--output", help="前処理後の画像の保存先")
+    args = parser.parse_args()
+
+    original_size = Path(args.image).stat().st_size
+    data, mime_type = prepare_reference(args.image, args.model)
+    with Image.open(io.BytesIO(data)) as processed:
+        print(f"前処理後: {processed.size[0]}x{processed.size[1]} {mime_type}")
+    print(f"サイズ: {original_size / 1024:.0f}KB -> {len(data) / 1024:.0f}KB")
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(data)
+        print(f"保存しました: {args.output}")
@@ -26,7 +26,7 @@ echo.
 REM 確認
 set /p confirm=処理を開始しますか？(y/n): 
 if /i "%confirm%"=="y" (
-    python "%~dp0\gen_avatars_batch_gemini.py"
+    python "%~dp0\gen_avatars_batch_gemini.py" %*
 ) else (
     echo 処理をキャンセルしました。
 )
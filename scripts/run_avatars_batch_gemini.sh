@@ -45,7 +45,7 @@ echo ""
 # 確認
 read -p "処理を開始しますか？(y/n): " confirm
 if [[ $confirm == [yY] || $confirm == [yY][eE][sS] ]]; then
-    python "$SCRIPT_DIR/gen_avatars_batch_gemini.py"
+    python "$SCRIPT_DIR/gen_avatars_batch_gemini.py" "$@"
 else
     echo "処理をキャンセルしました。"
 fi
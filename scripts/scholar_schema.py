@@ -0,0 +1,333 @@
+#!/usr/bin/env python
+"""
+学者データ（scholars*.json）のスキーマと検証
+
+学者データの形（id / name.en・ja / tags / rarity / avatar / highlights / contribution /
+trivia / sources など）を SCHEMA に定義し、検証用のPython関数に変換（コンパイル）して使う。
+項目ごとに辞書をたどって解釈する代わりに、型・値のチェックを並べた関数を1回だけ作るため、
+1件あたり数マイクロ秒で検証できる。
+
+- 保存時（save_scholars）は、読み込み時・前回の保存時から内容が変わった学者だけを検証する
+  （書き出す文字列を比較するため、変更の検出に追加の処理はほとんどかからない）
+- ファイル全体の検証は validate_file() または CLI で行う
+
+使い方:
+python scripts/scholar_schema.py                                # scholars_enhanced_tavily.json を検証
+python scripts/scholar_schema.py scholars_enhanced.json originaldata/scholars_updated.json
+python scripts/scholar_schema.py --benchmark 100000             # 検証の速度を計測
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 検証するファイル（CLIの既定値）
+DEFAULT_FILES = ("scholars_enhanced_tavily.json",)
+
+# レア度
+RARITIES = ("N", "R", "SR", "SSR")
+
+# 学者データのスキーマ
+# type: string / integer / array / object、nullable: Noneを許す、required: 必須の項目
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "string", "min_length": 1},
+        "name": {
+            "type": "object",
+            "properties": {
+                "en": {"type": "string"},
+                "ja": {"type": "string", "min_length": 1},
+            },
+            "required": ("en", "ja"),
+        },
+        "affiliation": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string", "min_length": 1}},
+        "rarity": {"type": "string", "enum": RARITIES},
+        "avatar": {"type": "string", "nullable": True},
+        "highlights": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},  # 題名が不明な論文は空欄（typeとyearのみ）
+                    "type": {"type": "string"},
+                    "year": {"type": "integer", "nullable": True},
+                    "doi": {"type": "string", "nullable": True},
+                },
+                "required": ("title", "type"),
+            },
+        },
+        "contribution": {
+            "type": "object",
+            "properties": {
+                "text": {"type": "string"},
+                "source": {"type": "string"},
+            },
+            "required": ("text", "source"),
+        },
+        "trivia": {"type": "string"},
+        "triviaSource": {"type": "string"},
+        "sources": {"type": "array", "items": {"type": "string"}},
+        "created_at": {"type": "string", "pattern": r"\d{4}-\d{2}-\d{2}"},
+    },
+    "required": ("id", "name", "rarity", "sources"),
+}
+
+# 型ごとのPythonの型（boolはintとみなさない）
+_PYTHON_TYPES = {"string": "str", "integer": "int", "array": "list", "object": "dict"}
+_TYPE_NAMES = {"string": "文字列", "integer": "整数", "array": "配列", "object": "オブジェクト"}
+
+class SchemaError(ValueError):
+    """学者データがスキーマに合わない（errors に内容のリスト）"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        shown = "\n".join(f"  {error}" for error in errors[:20])
+        more = f"\n  ...ほか{len(errors) - 20}件" if len(errors) > 20 else ""
+        super().__init__(f"学者データの検証エラー（{len(errors)}件）:\n{shown}{more}")
+
+class _Compiler:
+    """スキーマから検証関数のソースコードを作る"""
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self.counter = 0
+
+    def name(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, value):
+        name = self.name("_c")
+        self.constants[name] = value
+        return name
+
+    def emit(self, indent, line):
+        self.lines.append("    " * indent + line)
+
+    def error(self, indent, path, message):
+        text = f"{path}: {message}" if path else message
+        self.emit(indent, f"errors.append(f{text!r})")
+
+    def node(self, schema, var, path, indent):
+        kind = schema["type"]
+        if schema.get("nullable"):
+            self.emit(indent, f"if {var} is not None:")
+            indent += 1
+        self.emit(indent, f"if {var}.__class__ is not {_PYTHON_TYPES[kind]}:")
+        self.error(indent + 1, path, f"{_TYPE_NAMES[kind]}ではありません（{{{var}!r:.40}}）")
+        self.emit(indent, "else:")
+        body_start = len(self.lines)
+        getattr(self, f"_{kind}")(schema, var, path, indent + 1)
+        if len(self.lines) == body_start:
+            self.emit(indent + 1, "pass")
+
+    def _string(self, schema, var, path, indent):
+        if "enum" in schema:
+            allowed = self.constant(frozenset(schema["enum"]))
+            self.emit(indent, f"if {var} not in {allowed}:")
+            self.error(indent + 1, path, f"{'・'.join(schema['enum'])} のいずれかではありません（{{{var}!r}}）")
+        if schema.get("min_length"):
+            self.emit(indent, f"if len({var}) < {schema['min_length']}:")
+            self.error(indent + 1, path, "空です")
+        if "pattern" in schema:
+            pattern = self.constant(re.compile(schema["pattern"]))
+            self.emit(indent, f"if {pattern}.fullmatch({var}) is None:")
+            self.error(indent + 1, path, f"形式が正しくありません（{{{var}!r}}）")
+
+    def _integer(self, schema, var, path, indent):
+        """整数は型の確認のみ"""
+
+    def _array(self, schema, var, path, indent):
+        index, item = self.name("i"), self.name("v")
+        self.emit(indent, f"for {index}, {item} in enumerate({var}):")
+        self.node(schema["items"], item, f"{path}[{{{index}}}]", indent + 1)
+
+    def _object(self, schema, var, path, indent):
+        properties = schema["properties"]
+        known = self.constant(frozenset(properties))
+        prefix = f"{path}." if path else ""
+        self.emit(indent, f"if not {var}.keys() <= {known}:")
+        self.emit(indent + 1, f"for key in sorted({var}.keys() - {known}):")
+        self.error(indent + 2, f"{prefix}{{key}}", "未知の項目です")
+        required = set(schema.get("required", ()))
+        for field, child in properties.items():
+            value = self.name("v")
+            self.emit(indent, f"{value} = {var}.get({field!r}, _MISSING)")
+            self.emit(indent, f"if {value} is _MISSING:")
+            if field in required:
+                self.error(indent + 1, f"{prefix}{field}", "必須の項目がありません")
+            else:
+                self.emit(indent + 1, "pass")
+            self.emit(indent, "else:")
+            self.node(child, value, f"{prefix}{field}", indent + 1)
+
+def compile_schema(schema):
+    """スキーマから検証関数（record -> エラーのリスト）を作る"""
+    compiler = _Compiler()
+    compiler.emit(0, "def validate(record):")
+    compiler.emit(1, "errors = []")
+    compiler.node(schema, "record", "", 1)
+    compiler.emit(1, "return errors")
+    source = "\n".join(compiler.lines)
+    namespace = dict(compiler.constants, _MISSING=object())
+    exec(compile(source, "<scholar_schema>", "exec"), namespace)
+    validate = namespace["validate"]
+    validate.source = source
+    return validate
+
+# スキーマから作った検証関数
+_validate = compile_schema(SCHEMA)
+
+def validate_record(record):
+    """学者1人分を検証し、エラーのリスト（問題がなければ空）を返す"""
+    return _validate(record)
+
+def validate_records(records):
+    """学者データを検証し、"学者ID: 項目: 内容" 形式のエラーのリストを返す（IDの重複も確認）"""
+    errors = []
+    seen = set()
+    for position, record in enumerate(records):
+        record_errors = _validate(record)
+        scholar_id = record.get("id") if isinstance(record, dict) else None
+        label = scholar_id or f"[{position}]"
+        errors.extend(f"{label}: {error}" for error in record_errors)
+        if scholar_id in seen:
+            errors.append(f"{label}: IDが重複しています")
+        seen.add(scholar_id)
+    return errors
+
+def validate_file(path):
+    """ファイル全体を検証し、(エラーのリスト, 学者数, 検証の所要時間[秒]) を返す"""
+    with open(path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    if not isinstance(records, list):
+        return [f"{path}: 学者データの配列ではありません"], 0, 0.0
+    start = time.perf_counter()
+    errors = validate_records(records)
+    return errors, len(records), time.perf_counter() - start
+
+# ---------------------------------------------------------------------------
+# 読み込み・保存（変更された学者だけを検証）
+# ---------------------------------------------------------------------------
+
+# ファイルごとの、読み込み時・前回の保存時の学者データ（学者ID -> 書き出した文字列）
+_snapshots = {}
+_lock = threading.Lock()
+
+def _dump_record(record):
+    """学者1人分を json.dump(indent=2) の配列の要素と同じ形の文字列にする"""
+    return json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+
+def load_scholars(path):
+    """学者データを読み込む（save_scholars で変更された学者を判定するため、内容を記録する）"""
+    with open(path, "r", encoding="utf-8") as f:
+        scholars = json.load(f)
+    snapshot = {scholar.get("id"): _dump_record(scholar) for scholar in scholars if isinstance(scholar, dict)}
+    with _lock:
+        _snapshots[os.path.abspath(path)] = snapshot
+    return scholars
+
+def save_scholars(path, scholars, validate_all=False):
+    """学者データを検証して書き出す（一時ファイル経由で置き換え）
+
+    load_scholars() で読み込んだ時点・前回の保存時から内容が変わった学者と、新しい学者だけを検証する。
+    記録がない場合（初めて保存するファイルなど）と validate_all=True の場合はすべて検証する。
+    検証エラーがあれば SchemaError を送出し、ファイルは書き換えない。
+
+    Returns:
+        検証した学者数
+    """
+    key = os.path.abspath(path)
+    with _lock:
+        snapshot = None if validate_all else _snapshots.get(key)
+
+    texts = [_dump_record(scholar) for scholar in scholars]
+    if snapshot is None:
+        changed = list(scholars)
+    else:
+        changed = [scholar for scholar, text in zip(scholars, texts)
+                   if snapshot.get(scholar.get("id")) != text]
+
+    errors = validate_records(changed)
+    # IDの重複は変更のない学者も含めて確認する
+    ids = [scholar.get("id") for scholar in scholars]
+    if len(set(ids)) != len(ids) and not any(error.endswith("IDが重複しています") for error in errors):
+        seen = set()
+        duplicates = sorted({i for i in ids if i in seen or seen.add(i)}, key=str)
+        errors.extend(f"{scholar_id}: IDが重複しています" for scholar_id in duplicates)
+    if errors:
+        raise SchemaError(errors)
+
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write("[\n  " + ",\n  ".join(texts) + "\n]" if texts else "[]")
+    os.replace(temp_path, path)
+
+    with _lock:
+        _snapshots[key] = {scholar.get("id"): text for scholar, text in zip(scholars, texts)}
+    return len(changed)
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def benchmark(rows, source):
+    """source の学者データを rows 件に増やして検証し、(件数, 秒) を返す"""
+    with open(source, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    records = [dict(base[i % len(base)], id=f"bench{i}") for i in range(rows)]
+    start = time.perf_counter()
+    validate_records(records)
+    return len(records), time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="学者データ（JSON）をスキーマで検証")
+    parser.add_argument("files", nargs="*", default=list(DEFAULT_FILES),
+                        help=f"検証するファイル（既定: {' '.join(DEFAULT_FILES)}）")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS",
+                        help="1つ目のファイルの学者データを指定した件数に増やして検証の速度を計測する")
+    parser.add_argument("--show-source", action="store_true", help="スキーマから作った検証関数を表示")
+    args = parser.parse_args()
+
+    if args.show_source:
+        print(_validate.source)
+        return
+
+    if args.benchmark:
+        rows, elapsed = benchmark(args.benchmark, args.files[0])
+        print(f"{rows}件を{elapsed:.3f}秒で検証しました（{rows / elapsed:,.0f}件/秒）")
+        return
+
+    total = 0
+    total_errors = 0
+    total_time = 0.0
+    for path in args.files:
+        if not Path(path).exists():
+            print(f"ファイル {path} が見つかりません。")
+            continue
+        errors, count, elapsed = validate_file(path)
+        total += count
+        total_errors += len(errors)
+        total_time += elapsed
+        print(f"{path}: {count}件, エラー {len(errors)}件")
+        for error in errors:
+            print(f"  {error}")
+
+    print("\n===== 処理結果サマリー =====")
+    print(f"学者数: {total}")
+    print(f"エラー: {total_errors}")
+    if total_time > 0:
+        print(f"検証の所要時間: {total_time * 1000:.1f}ms（{total / total_time:,.0f}件/秒）")
+    if total_errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+// サービスワーカー
+// precache-manifest.js（scripts/build_precache_manifest.pyで生成）のファイルを「URL + ハッシュ」の組でキャッシュし、
+// 2回目以降の訪問・ガチャではキャッシュから返す（オフラインでも表示できる）。
+// データを更新してもハッシュが変わっていないファイルは取得し直さない。
+importScripts('precache-manifest.js');
+
+const CACHE_NAME = 'epi-gacha-assets';
+const manifest = self.PRECACHE_MANIFEST;
+
+// 絶対URL -> マニフェストのファイル情報
+const assets = new Map(
+  manifest.assets.map(asset => [new URL(asset.url, self.registration.scope).href, asset])
+);
+
+// キャッシュのキー（ハッシュが変わるとキーも変わる）
+function cacheKey(url, asset) {
+  return `${url}?v=${asset.hash}`;
+}
+
+// 内容のハッシュがマニフェストと一致するか（デプロイの途中などで別の版を保存しないため）
+async function matchesHash(response, asset) {
+  const digest = await crypto.subtle.digest('SHA-256', await response.clone().arrayBuffer());
+  const hex = Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+  return hex.startsWith(asset.hash);
+}
+
+// ネットワークから取得し、ハッシュが一致すればキャッシュに入れる
+async function fetchAndCache(cache, url, asset) {
+  const response = await fetch(url, { cache: 'no-cache' });
+  if (response.ok && await matchesHash(response, asset)) {
+    await cache.put(cacheKey(url, asset), response.clone());
+  }
+  return response;
+}
+
+// インストール時：まだキャッシュにないファイル（新しいファイル・変わったファイル）だけを取得
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    await Promise.all(
+      Array.from(assets)
+        .filter(([, asset]) => asset.precache)
+        .map(async ([url, asset]) => {
+          if (!(await cache.match(cacheKey(url, asset)))) {
+            await fetchAndCache(cache, url, asset);
+          }
+        })
+    );
+    await self.skipWaiting();
+  })());
+});
+
+// 有効化時：今のマニフェストにないキャッシュ（古い版・削除されたファイル）を削除
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const current = new Set(Array.from(assets, ([url, asset]) => cacheKey(url, asset)));
+    const requests = await cache.keys();
+    await Promise.all(requests.filter(request => !current.has(request.url)).map(request => cache.delete(request)));
+    await self.clients.claim();
+  })());
+});
+
+// マニフェストにあるファイルはキャッシュから返し、なければ取得してキャッシュする
+// （マニフェストにないファイルはサービスワーカーを通さない）
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  if (request.method !== 'GET') return;
+
+  const url = new URL(request.url);
+  url.search = '';
+  url.hash = '';
+  // トップページ（/）は index.html として扱う
+  if (request.mode === 'navigate' && url.href === self.registration.scope) {
+    url.href = new URL('index.html', self.registration.scope).href;
+  }
+  const asset = assets.get(url.href);
+  if (!asset) return;
+
+  event.respondWith((async () => {
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(cacheKey(url.href, asset));
+    return cached || fetchAndCache(cache, url.href, asset);
+  })());
+});
@@ -0,0 +1,61 @@
+"""
+scripts/lazy_import.py のテスト
+
+python -m pytest tests
+"""
+
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.lazy_import import lazy_import, load_all
+
+THREADS = 8
+
+def make_slow_module(tmp_path, monkeypatch):
+    """読み込みに時間がかかる、まだ読み込まれていないモジュールを作る"""
+    name = f"slow_module_{uuid.uuid4().hex}"
+    (tmp_path / f"{name}.py").write_text("import time\ntime.sleep(0.2)\nVALUE = 42\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    return name
+
+def touch_from_threads(module):
+    """複数のスレッドから同時に初めて属性にアクセスし、発生した例外を返す"""
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def touch():
+        barrier.wait()
+        try:
+            assert module.VALUE == 42
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=touch) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+def test_concurrent_first_access(tmp_path, monkeypatch):
+    module = lazy_import(make_slow_module(tmp_path, monkeypatch))
+    assert touch_from_threads(module) == []
+
+def test_load_all_before_threads(tmp_path, monkeypatch):
+    module = lazy_import(make_slow_module(tmp_path, monkeypatch))
+    load_all()
+    assert type(module).__name__ == "module"
+    assert touch_from_threads(module) == []
+
+def test_missing_module_raises_on_use():
+    module = lazy_import(f"missing_module_{uuid.uuid4().hex}")
+    try:
+        module.anything
+    except ModuleNotFoundError:
+        pass
+    else:
+        raise AssertionError("ModuleNotFoundError が送出されていない")
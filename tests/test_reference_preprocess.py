@@ -0,0 +1,64 @@
+"""
+scripts/reference_preprocess.py のテスト
+
+python -m pytest tests
+"""
+
+import io
+import sys
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts import reference_preprocess
+
+# EXIFの向き（6: 時計回りに90度回転して表示する）
+ORIENTATION_TAG = 0x0112
+ROTATE_90_CW = 6
+
+def make_rotated_jpeg():
+    """横長（40x20）で、縦長に表示するよう Orientation=6 を付けたJPEG"""
+    img = Image.new("RGB", (40, 20), (200, 100, 50))
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = ROTATE_90_CW
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+class FakeResponse:
+    """requests.get(stream=True) のレスポンスの代わり"""
+
+    def __init__(self, data):
+        self.data = data
+        self.headers = {"Content-Type": "image/jpeg", "Content-Length": str(len(data))}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.data), chunk_size):
+            yield self.data[start:start + chunk_size]
+
+def test_download_applies_exif_orientation(tmp_path, monkeypatch):
+    data = make_rotated_jpeg()
+
+    class FakeRequests:
+        @staticmethod
+        def get(url, **kwargs):
+            return FakeResponse(data)
+
+    monkeypatch.setattr(reference_preprocess, "requests", FakeRequests)
+    img = reference_preprocess.download_reference_image("https://example.com/photo.jpg", "test")
+    assert img.size == (20, 40)
+
+    # 生成スクリプトと同じように保存して読み直しても縦長のまま
+    saved = tmp_path / "scholar_reference.jpg"
+    img.save(saved)
+    assert reference_preprocess.load_reference_image(saved).size == (20, 40)